@@ -59,6 +59,9 @@ permission_query_conditions = {
 	"Transfer": "yam_agri_core.yam_agri_core.site_permissions.transfer_query_conditions",
 	"StorageBin": "yam_agri_core.yam_agri_core.site_permissions.storage_bin_query_conditions",
 	"EvidencePack": "yam_agri_core.yam_agri_core.site_permissions.evidence_pack_query_conditions",
+	"Lot Genealogy Link": "yam_agri_core.yam_agri_core.site_permissions.lot_genealogy_link_query_conditions",
+	"Lot Quantity Ledger Entry": "yam_agri_core.yam_agri_core.site_permissions.lot_quantity_ledger_entry_query_conditions",
+	"Evidence Blob Reference": "yam_agri_core.yam_agri_core.site_permissions.evidence_blob_reference_query_conditions",
 	"Complaint": "yam_agri_core.yam_agri_core.site_permissions.complaint_query_conditions",
 	"Season Policy": "yam_agri_core.yam_agri_core.site_permissions.season_policy_query_conditions",
 	"Site Tolerance Policy": "yam_agri_core.yam_agri_core.site_permissions.site_tolerance_policy_query_conditions",
@@ -87,6 +90,9 @@ has_permission = {
 	"Transfer": "yam_agri_core.yam_agri_core.site_permissions.transfer_has_permission",
 	"StorageBin": "yam_agri_core.yam_agri_core.site_permissions.storage_bin_has_permission",
 	"EvidencePack": "yam_agri_core.yam_agri_core.site_permissions.evidence_pack_has_permission",
+	"Lot Genealogy Link": "yam_agri_core.yam_agri_core.site_permissions.lot_genealogy_link_has_permission",
+	"Lot Quantity Ledger Entry": "yam_agri_core.yam_agri_core.site_permissions.lot_quantity_ledger_entry_has_permission",
+	"Evidence Blob Reference": "yam_agri_core.yam_agri_core.site_permissions.evidence_blob_reference_has_permission",
 	"Complaint": "yam_agri_core.yam_agri_core.site_permissions.complaint_has_permission",
 	"Season Policy": "yam_agri_core.yam_agri_core.site_permissions.season_policy_has_permission",
 	"Site Tolerance Policy": "yam_agri_core.yam_agri_core.site_permissions.site_tolerance_policy_has_permission",
@@ -126,11 +132,65 @@ global_search_doctypes = {
 doc_events = {
 	"QCTest": {
 		"validate": "yam_agri_core.yam_agri_core.site_permissions.enforce_qc_test_site_consistency",
+		"on_update": "yam_agri_core.yam_agri_core.compliance.lot_status.on_lot_evidence_change",
+		"after_delete": "yam_agri_core.yam_agri_core.compliance.lot_status.on_lot_evidence_change",
 	},
 	"Certificate": {
 		"validate": "yam_agri_core.yam_agri_core.site_permissions.enforce_certificate_site_consistency",
+		"on_update": "yam_agri_core.yam_agri_core.compliance.lot_status.on_lot_evidence_change",
+		"after_delete": "yam_agri_core.yam_agri_core.compliance.lot_status.on_lot_evidence_change",
+	},
+	"Nonconformance": {
+		"on_update": "yam_agri_core.yam_agri_core.compliance.lot_status.on_lot_evidence_change",
+		"after_delete": "yam_agri_core.yam_agri_core.compliance.lot_status.on_lot_evidence_change",
+	},
+	"Lot": {
+		"after_insert": "yam_agri_core.yam_agri_core.inventory.ledger.on_lot_insert",
+		"on_update": "yam_agri_core.yam_agri_core.traceability.closure.on_lot_change",
+	},
+	"Transfer": {
+		"on_update": [
+			"yam_agri_core.yam_agri_core.traceability.closure.on_transfer_change",
+			"yam_agri_core.yam_agri_core.inventory.ledger.on_transfer_change",
+		],
+		"after_delete": [
+			"yam_agri_core.yam_agri_core.traceability.closure.on_transfer_change",
+			"yam_agri_core.yam_agri_core.inventory.ledger.on_transfer_change",
+		],
+	},
+	"ScaleTicket": {
+		"on_update": "yam_agri_core.yam_agri_core.inventory.ledger.on_scale_ticket_change",
+		"after_delete": "yam_agri_core.yam_agri_core.inventory.ledger.on_scale_ticket_change",
+	},
+	"Season Policy": {
+		"on_update": "yam_agri_core.yam_agri_core.compliance.lot_status.on_season_policy_change",
+		"after_delete": "yam_agri_core.yam_agri_core.compliance.lot_status.on_season_policy_change",
 	},
 	"Observation": {
 		"validate": "yam_agri_core.yam_agri_core.doctype.observation.observation.enforce_observation_validate",
 	},
+	"EvidencePack": {
+		"on_update": "yam_agri_core.yam_agri_core.api.evidence_pack.clear_auditor_portal_cache",
+		"on_trash": "yam_agri_core.yam_agri_core.evidence.blobs.release_pack_blobs",
+		"after_delete": "yam_agri_core.yam_agri_core.api.evidence_pack.clear_auditor_portal_cache",
+		"after_rename": "yam_agri_core.yam_agri_core.api.evidence_pack.clear_auditor_portal_cache",
+	},
+	"User Permission": {
+		"on_update": "yam_agri_core.yam_agri_core.api.evidence_pack.clear_auditor_portal_cache",
+		"after_delete": "yam_agri_core.yam_agri_core.api.evidence_pack.clear_auditor_portal_cache",
+	},
+}
+
+scheduler_events = {
+	"hourly": [
+		"yam_agri_core.yam_agri_core.inventory.mass_balance.schedule_mass_balance_reconciliation",
+	],
+	"daily": [
+		"yam_agri_core.yam_agri_core.compliance.lot_status.refresh_expiring_lot_compliance",
+		"yam_agri_core.yam_agri_core.compliance.certificate_expiry.sweep_certificate_expiry",
+		"yam_agri_core.yam_agri_core.evidence.blobs.collect_unreferenced_blobs",
+	],
+	"weekly": [
+		"yam_agri_core.yam_agri_core.inventory.mass_balance.schedule_full_mass_balance_reconciliation",
+	],
 }
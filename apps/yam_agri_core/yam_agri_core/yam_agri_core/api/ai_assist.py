@@ -11,6 +11,12 @@ from typing import Any
 import frappe
 from frappe import _
 
+from yam_agri_core.yam_agri_core.compliance.dispatch_gate import (
+	evaluate_dispatch_requirements,
+	find_expired_certificates,
+	get_lot_evidence,
+)
+from yam_agri_core.yam_agri_core.doctype.season_policy.season_policy import get_active_season_policy
 from yam_agri_core.yam_agri_core.site_permissions import assert_site_access
 
 PROMPT_TEMPLATES: list[dict[str, Any]] = [
@@ -142,51 +148,6 @@ def _safe_json_loads(raw: str | None, default: Any) -> Any:
 		return default
 
 
-def _parse_csv_values(raw: str | None) -> list[str]:
-	text = (raw or "").replace("\n", ",")
-	parts = [p.strip() for p in text.split(",")]
-	return [p for p in parts if p]
-
-
-def _get_active_season_policy(site: str, crop: str | None) -> dict[str, Any] | None:
-	filters: dict[str, Any] = {"site": site, "active": 1}
-	if crop:
-		filters["crop"] = crop
-
-	rows = frappe.get_all(
-		"Season Policy",
-		filters=filters,
-		fields=[
-			"name",
-			"mandatory_test_types",
-			"mandatory_certificate_types",
-			"max_test_age_days",
-		],
-		order_by="modified desc",
-		limit_page_length=1,
-	)
-	if rows:
-		return rows[0]
-
-	if crop:
-		fallback = frappe.get_all(
-			"Season Policy",
-			filters={"site": site, "active": 1},
-			fields=[
-				"name",
-				"mandatory_test_types",
-				"mandatory_certificate_types",
-				"max_test_age_days",
-			],
-			order_by="modified desc",
-			limit_page_length=1,
-		)
-		if fallback:
-			return fallback[0]
-
-	return None
-
-
 def _normalize_filters(filters: dict[str, Any] | None) -> dict[str, Any]:
 	filters = filters or {}
 	return {
@@ -215,63 +176,17 @@ def _collect_lot_compliance_findings(lot_doc: Any, filters: dict[str, Any] | Non
 	include_closed_nonconformance = bool(active_filters.get("include_closed_nonconformance"))
 	include_expired_certificates = bool(active_filters.get("include_expired_certificates"))
 
-	policy = _get_active_season_policy(site, crop)
-
-	required_tests = _parse_csv_values(policy.get("mandatory_test_types") if policy else "")
-	required_certs = _parse_csv_values(policy.get("mandatory_certificate_types") if policy else "")
-	max_age_days = int(policy.get("max_test_age_days") or 7) if policy else 7
-
-	missing_or_stale_tests: list[str] = []
-	for test_type in required_tests:
-		records = frappe.get_all(
-			"QCTest",
-			filters={
-				"lot": lot_doc.name,
-				"site": site,
-				"test_type": test_type,
-				"pass_fail": "Pass",
-			},
-			fields=["name", "test_date"],
-			order_by="test_date desc",
-			limit_page_length=1,
-		)
-		if not records:
-			missing_or_stale_tests.append(test_type)
-			continue
-
-		test_date = records[0].get("test_date")
-		if not test_date:
-			missing_or_stale_tests.append(test_type)
-			continue
-
-		days_old = (frappe.utils.getdate(frappe.utils.nowdate()) - frappe.utils.getdate(test_date)).days
-		if days_old > max_age_days:
-			missing_or_stale_tests.append(test_type)
-
-	missing_or_expired_certs: list[str] = []
-	for cert_type in required_certs:
-		records = frappe.get_all(
-			"Certificate",
-			filters={"lot": lot_doc.name, "site": site, "cert_type": cert_type},
-			fields=["name", "expiry_date"],
-			order_by="modified desc",
-			limit_page_length=1,
-		)
-		if not records:
-			missing_or_expired_certs.append(cert_type)
-			continue
-
-		expiry = records[0].get("expiry_date")
-		if expiry and frappe.utils.getdate(expiry) < frappe.utils.getdate(frappe.utils.nowdate()):
-			missing_or_expired_certs.append(cert_type)
-
-	expired_certificates = frappe.get_all(
-		"Certificate",
-		filters={"lot": lot_doc.name, "site": site, "expiry_date": ["<", frappe.utils.nowdate()]},
-		fields=["name", "cert_type", "expiry_date"],
-		order_by="expiry_date asc",
-		limit_page_length=100,
-	)
+	policy = get_active_season_policy(site, crop)
+	evidence = get_lot_evidence(lot_doc.name)
+	requirements = evaluate_dispatch_requirements(policy, evidence, site)
+	max_age_days = requirements["max_test_age_days"]
+	missing_or_stale_tests = requirements["missing_or_stale_tests"]
+	missing_or_expired_certs = requirements["missing_or_expired_certificates"]
+
+	expired_certificates = [
+		{"name": row.get("name"), "cert_type": row.get("cert_type"), "expiry_date": row.get("expiry_date")}
+		for row in find_expired_certificates(evidence["certificates"], site=site)[:100]
+	]
 	if not include_expired_certificates:
 		expired_certificates = []
 	elif from_date or to_date:
@@ -317,13 +232,13 @@ def _collect_lot_compliance_findings(lot_doc: Any, filters: dict[str, Any] | Non
 		"policy": policy or {},
 		"filters": active_filters,
 		"max_test_age_days": max_age_days,
-		"missing_or_stale_tests": sorted(set(missing_or_stale_tests)),
-		"missing_or_expired_required_certificates": sorted(set(missing_or_expired_certs)),
+		"missing_or_stale_tests": missing_or_stale_tests,
+		"missing_or_expired_required_certificates": missing_or_expired_certs,
 		"expired_certificates": expired_certificates,
 		"open_nonconformance": nonconformance,
 		"counts": {
-			"missing_or_stale_tests": len(set(missing_or_stale_tests)),
-			"missing_or_expired_required_certificates": len(set(missing_or_expired_certs)),
+			"missing_or_stale_tests": len(missing_or_stale_tests),
+			"missing_or_expired_required_certificates": len(missing_or_expired_certs),
 			"expired_certificates": len(expired_certificates),
 			"open_nonconformance": len(nonconformance),
 		},
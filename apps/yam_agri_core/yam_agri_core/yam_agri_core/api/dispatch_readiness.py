@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from typing import Any
+
+import frappe
+from frappe import _
+
+from yam_agri_core.yam_agri_core.compliance.dispatch_gate import (
+	_today,
+	get_dispatch_blockers,
+	get_lots_evidence,
+)
+from yam_agri_core.yam_agri_core.doctype.season_policy.season_policy import get_active_season_policy
+from yam_agri_core.yam_agri_core.request_params import parse_lot_names
+from yam_agri_core.yam_agri_core.site_permissions import assert_site_access, get_allowed_sites, resolve_site
+
+MAX_READINESS_LOTS = 10000
+ALLOWED_LOT_FILTERS = {"name", "lot_number", "crop", "status", "dispatch_ready"}
+
+
+def _has_global_site_access(user: str) -> bool:
+	if user == "Administrator":
+		return True
+	return "System Manager" in set(frappe.get_roles(user) or [])
+
+
+def _parse_filters(value: Any) -> dict[str, Any]:
+	if value in (None, ""):
+		return {}
+	if isinstance(value, str):
+		value = frappe.parse_json(value)
+	if not isinstance(value, dict):
+		frappe.throw(_("Filters must be an object"), frappe.ValidationError)
+
+	unsupported = sorted(set(value) - ALLOWED_LOT_FILTERS)
+	if unsupported:
+		frappe.throw(
+			_("Unsupported Lot filters: {0}").format(", ".join(unsupported)),
+			frappe.ValidationError,
+		)
+	return dict(value)
+
+
+def _load_lot_rows(lots: list[str], site: str | None, filters: dict[str, Any]) -> list[dict[str, Any]]:
+	lot_filters = dict(filters)
+	if lots:
+		lot_filters["name"] = ["in", lots]
+	elif site:
+		site_name = resolve_site(site)
+		assert_site_access(site_name)
+		lot_filters["site"] = site_name
+	else:
+		user = frappe.session.user
+		if not _has_global_site_access(user):
+			allowed_sites = get_allowed_sites(user=user)
+			if not allowed_sites:
+				return []
+			lot_filters["site"] = ["in", allowed_sites]
+
+	rows = frappe.get_all(
+		"Lot",
+		filters=lot_filters,
+		fields=["name", "lot_number", "site", "crop", "status"],
+		order_by="name asc",
+		limit_page_length=MAX_READINESS_LOTS + 1,
+	)
+	if len(rows) > MAX_READINESS_LOTS:
+		frappe.throw(
+			_("Dispatch readiness is limited to {0} lots per request").format(MAX_READINESS_LOTS),
+			frappe.ValidationError,
+		)
+
+	if lots:
+		for lot_site in sorted({str(row.get("site") or "") for row in rows}):
+			assert_site_access(lot_site)
+	return rows
+
+
+@frappe.whitelist()
+def get_dispatch_readiness(
+	lots: Any = None,
+	site: str | None = None,
+	filters: Any = None,
+) -> dict[str, Any]:
+	"""Evaluate the Lot dispatch gate for many lots at once.
+
+	Pass `lots` (a list of Lot names) or `site` plus optional `filters` on Lot
+	fields. Policies come from the Season Policy cache and QC tests/certificates
+	are fetched set-wise, so the cost does not grow with one query per lot.
+	Blocking reasons use the same messages as the per-lot gate.
+	"""
+	lot_names = parse_lot_names(lots)
+	if len(lot_names) > MAX_READINESS_LOTS:
+		frappe.throw(
+			_("Dispatch readiness is limited to {0} lots per request").format(MAX_READINESS_LOTS),
+			frappe.ValidationError,
+		)
+
+	rows = _load_lot_rows(lot_names, site, _parse_filters(filters))
+	evidence_by_lot = get_lots_evidence([str(row.get("name")) for row in rows])
+	today = _today()
+
+	results: list[dict[str, Any]] = []
+	ready_count = 0
+	for row in rows:
+		lot_site = row.get("site")
+		blockers = get_dispatch_blockers(
+			lot_site,
+			get_active_season_policy(lot_site, row.get("crop")),
+			evidence_by_lot[row.get("name")],
+			today,
+		)
+		if not blockers:
+			ready_count += 1
+		results.append(
+			{
+				"lot": row.get("name"),
+				"lot_number": row.get("lot_number"),
+				"site": lot_site,
+				"status": row.get("status"),
+				"dispatch_ready": not blockers,
+				"blocking_reasons": blockers,
+			}
+		)
+
+	found = {row.get("name") for row in rows}
+	return {
+		"status": "ok",
+		"lot_count": len(results),
+		"ready_count": ready_count,
+		"blocked_count": len(results) - ready_count,
+		"not_found": [name for name in lot_names if name not in found],
+		"lots": results,
+	}
@@ -1,16 +1,35 @@
 from __future__ import annotations
 
-import io
+import hashlib
+import heapq
 import json
+import os
+import tempfile
 import zipfile
+from collections.abc import Callable, Iterator
 from pathlib import Path
 from typing import Any
+from urllib.parse import urlencode
+
+from werkzeug.wrappers import Response
 
 import frappe
 from frappe import _
 from frappe.utils.file_manager import save_file
-from frappe.utils.pdf import get_pdf
 
+from yam_agri_core.yam_agri_core.evidence.attachments import copy_with_digest, iter_attachments
+from yam_agri_core.yam_agri_core.evidence.blobs import (
+	blob_response,
+	pack_references_blob,
+	store_blob,
+	sync_pack_blob_references,
+)
+from yam_agri_core.yam_agri_core.evidence.downloads import (
+	file_response,
+	signed_download_url,
+	verify_download_signature,
+)
+from yam_agri_core.yam_agri_core.evidence.pdf import pdf_template_version, render_evidence_pdf
 from yam_agri_core.yam_agri_core.site_permissions import (
 	assert_site_access,
 	get_allowed_sites,
@@ -18,8 +37,40 @@ from yam_agri_core.yam_agri_core.site_permissions import (
 )
 
 _ALLOWED_ROLES = {"QA Manager", "System Manager", "Administrator"}
-_MAX_ROWS_PER_SOURCE = 1000
+_SCOPE_PAGE_SIZE = 1000
 _MAX_PORTAL_ROWS = 200
+_AUDITOR_PORTAL_CACHE_PREFIX = "yam_agri_core:auditor_portal"
+_AUDITOR_PORTAL_GENERATION_KEY = "yam_agri_core:auditor_portal_generation"
+# Bounds how long a listing can lag behind Site permission changes made outside User Permission.
+_AUDITOR_PORTAL_CACHE_TTL = 300
+_ATTACHMENT_COUNT_CHUNK = 1000
+_LINKED_DOCTYPE = "EvidencePack Linked Document"
+_LINKED_FIELDS = (
+	"source_doctype",
+	"source_name",
+	"site",
+	"document_date",
+	"status",
+	"attachment_count",
+	"summary",
+)
+_ZIP_COPY_BLOCK_SIZE = 1024 * 1024
+_ZIP_PROGRESS_EVERY = 25
+# Bump when the rendering changes in a way that should invalidate cached exports.
+_EXPORT_FORMAT_VERSION = {"pdf": "2", "zip": "3"}
+_EXPORT_PROGRESS_EVENT = "yam_agri_evidence_export_progress"
+_ZIP_LAYOUTS = ("bundle", "referenced")
+_BLOB_DOWNLOAD_METHOD = "yam_agri_core.yam_agri_core.api.evidence_pack.download_evidence_blob"
+_EXPORT_HEADER_FIELDS = ("name", "title", "site", "lot", "from_date", "to_date", "status", "record_count")
+_ZIP_SOURCE_FIELDS = [
+	"name",
+	"file_name",
+	"file_url",
+	"attached_to_doctype",
+	"attached_to_name",
+	"content_hash",
+	"file_size",
+]
 
 
 def _safe_int(value: Any, default: int = 0) -> int:
@@ -153,58 +204,329 @@ def _source_configs(include_quarantine: bool) -> list[dict[str, Any]]:
 	]
 
 
-def _collect_scope_rows(evidence_doc: Any, include_quarantine: bool = True) -> tuple[list[dict[str, Any]], dict[str, int]]:
+def _attachment_counts(doctype: str, names: list[str]) -> dict[str, int]:
+	"""Count File attachments for many records of one DocType with a grouped query per chunk.
+
+	Served by the (attached_to_doctype, attached_to_name) index on File.
+	"""
+	counts: dict[str, int] = {}
+	for start in range(0, len(names), _ATTACHMENT_COUNT_CHUNK):
+		rows = frappe.db.sql(
+			"""
+			SELECT attached_to_name, COUNT(*) AS attachment_count
+			FROM `tabFile`
+			WHERE attached_to_doctype = %(doctype)s AND attached_to_name IN %(names)s
+			GROUP BY attached_to_doctype, attached_to_name
+			""",
+			{"doctype": doctype, "names": tuple(names[start : start + _ATTACHMENT_COUNT_CHUNK])},
+			as_dict=True,
+		)
+		for row in rows:
+			counts[str(row.get("attached_to_name"))] = _safe_int(row.get("attachment_count"), 0)
+	return counts
+
+
+def _attachments_changed_since(doctype: str, since: Any) -> list[str]:
+	"""Names of `doctype` records whose attachments were added, edited or deleted since `since`.
+
+	Deleted Files are found through their Deleted Document rows, so attachments
+	removed with a raw SQL delete (which leaves none) are only caught by a rebuild.
+	"""
+	names = set(
+		frappe.get_all(
+			"File",
+			filters={"attached_to_doctype": doctype, "modified": [">=", since]},
+			pluck="attached_to_name",
+			distinct=True,
+			limit_page_length=0,
+		)
+	)
+	for data in frappe.get_all(
+		"Deleted Document",
+		filters={"deleted_doctype": "File", "creation": [">=", since]},
+		pluck="data",
+		limit_page_length=0,
+	):
+		try:
+			deleted_file = json.loads(data or "{}")
+		except ValueError:
+			continue
+		if isinstance(deleted_file, dict) and deleted_file.get("attached_to_doctype") == doctype:
+			names.add(deleted_file.get("attached_to_name"))
+	return sorted(str(name) for name in names if name)
+
+
+def _iter_keyset_pages(
+	doctype: str,
+	filters: list[list[Any]],
+	or_filters: dict[str, Any] | None,
+	fields: list[str],
+	date_field: str,
+) -> Iterator[list[dict[str, Any]]]:
+	"""Yield pages of `doctype` rows ordered by (date_field, name) descending.
+
+	Each page continues from the last (date, name) seen instead of an OFFSET, so
+	with the (site, date_field, name) index each source DocType's
+	`on_doctype_update` adds, every page is an index range scan however deep into
+	the result it is: first the rest of the rows sharing the last date, then the
+	rows before it.
+	"""
+	order_by = f"{date_field} desc, name desc"
+	page = frappe.get_all(
+		doctype,
+		filters=filters,
+		or_filters=or_filters,
+		fields=fields,
+		order_by=order_by,
+		limit=_SCOPE_PAGE_SIZE,
+	)
+	while page:
+		yield page
+		if len(page) < _SCOPE_PAGE_SIZE:
+			return
+
+		last_date, last_name = page[-1].get(date_field), page[-1].get("name")
+		page = frappe.get_all(
+			doctype,
+			filters=[*filters, [date_field, "=", last_date], ["name", "<", last_name]],
+			or_filters=or_filters,
+			fields=fields,
+			order_by="name desc",
+			limit=_SCOPE_PAGE_SIZE,
+		)
+		if len(page) < _SCOPE_PAGE_SIZE:
+			page += frappe.get_all(
+				doctype,
+				filters=[*filters, [date_field, "<", last_date]],
+				or_filters=or_filters,
+				fields=fields,
+				order_by=order_by,
+				limit=_SCOPE_PAGE_SIZE - len(page),
+			)
+
+
+def _iter_source_rows(
+	evidence_doc: Any, config: dict[str, Any], modified_since: Any = None
+) -> Iterator[dict[str, Any]]:
+	"""Linked-document rows for one source DocType, newest first, fetched page by page."""
 	site = str(evidence_doc.get("site") or "")
 	lot_name = str(evidence_doc.get("lot") or "").strip()
 	from_date, to_date = _as_date_range(
 		str(evidence_doc.get("from_date") or ""),
 		str(evidence_doc.get("to_date") or ""),
 	)
+	doctype = config["doctype"]
+	date_field = config["date_field"]
+	filters: dict[str, Any] = {
+		"site": site,
+		**config.get("extra_filters", {}),
+		**_date_filter(date_field, from_date, to_date, include_time=bool(config.get("datetime_field"))),
+	}
+	if lot_name and frappe.get_meta(doctype).has_field("lot"):
+		filters["lot"] = lot_name
+
+	or_filters: dict[str, Any] = {}
+	if modified_since:
+		or_filters["modified"] = [">=", modified_since]
+		attached = _attachments_changed_since(doctype, modified_since)
+		if attached:
+			or_filters["name"] = ["in", attached]
+
+	filter_list = [
+		[fieldname, *condition] if isinstance(condition, list) else [fieldname, "=", condition]
+		for fieldname, condition in filters.items()
+	]
+	for page in _iter_keyset_pages(doctype, filter_list, or_filters or None, config["fields"], date_field):
+		attachment_counts = _attachment_counts(
+			doctype, [str(row.get("name")) for row in page if row.get("name")]
+		)
+		for row in page:
+			doc_name = str(row.get("name") or "")
+			yield {
+				"source_doctype": doctype,
+				"source_name": doc_name,
+				"site": str(row.get("site") or site),
+				"document_date": row.get(date_field),
+				"status": str(row.get(config["status_field"]) or "").strip(),
+				"attachment_count": attachment_counts.get(doc_name, 0),
+				"summary": str(config["summary_builder"](row) or "").strip(),
+			}
+
+
+def _document_date_key(row: dict[str, Any]) -> str:
+	return str(row.get("document_date") or "")
+
+
+def _collect_scope_rows(
+	evidence_doc: Any, include_quarantine: bool = True, modified_since: Any = None
+) -> tuple[list[dict[str, Any]], dict[str, int]]:
+	"""Linked-document rows for every in-scope source record, as one list.
 
+	With `modified_since`, only records modified since then, or whose attachments
+	changed since then, are returned. Full rebuilds stream through
+	`_rebuild_linked_rows` instead of holding every row in memory.
+	"""
 	rows: list[dict[str, Any]] = []
 	counts: dict[str, int] = {}
 	for config in _source_configs(include_quarantine=bool(include_quarantine)):
-		doctype = config["doctype"]
-		date_field = config["date_field"]
-		filters: dict[str, Any] = {
-			"site": site,
-			**config.get("extra_filters", {}),
-			**_date_filter(date_field, from_date, to_date, include_time=bool(config.get("datetime_field"))),
-		}
-		if lot_name and frappe.get_meta(doctype).has_field("lot"):
-			filters["lot"] = lot_name
+		doctype_rows = list(_iter_source_rows(evidence_doc, config, modified_since=modified_since))
+		counts[config["doctype"]] = len(doctype_rows)
+		rows.extend(doctype_rows)
 
-		doctype_rows = frappe.get_all(
-			doctype,
-			filters=filters,
-			fields=config["fields"],
-			order_by=f"{date_field} desc",
-			limit=_MAX_ROWS_PER_SOURCE,
-		)
-		counts[doctype] = len(doctype_rows)
+	rows.sort(key=_document_date_key, reverse=True)
+	return rows, counts
 
-		for row in doctype_rows:
-			doc_name = str(row.get("name") or "")
-			attachment_count = _safe_int(
-				frappe.db.count(
-					"File", {"attached_to_doctype": doctype, "attached_to_name": doc_name}
-				),
-				0,
+
+def _rebuild_linked_rows(evidence_doc: Any, include_quarantine: bool = True) -> dict[str, int]:
+	"""Replace the pack's linked_documents with every in-scope record, newest first.
+
+	Each source DocType is read with keyset pagination and the streams are merged
+	by document date, so only one page per DocType is held in memory. Rows are
+	written to the child table with bulk inserts.
+	"""
+	frappe.db.delete(_LINKED_DOCTYPE, {"parent": evidence_doc.name, "parenttype": "EvidencePack"})
+
+	counts: dict[str, int] = {
+		config["doctype"]: 0 for config in _source_configs(include_quarantine=bool(include_quarantine))
+	}
+	streams = [
+		_iter_source_rows(evidence_doc, config)
+		for config in _source_configs(include_quarantine=bool(include_quarantine))
+	]
+	written = 0
+	batch: list[dict[str, Any]] = []
+	for row in heapq.merge(*streams, key=_document_date_key, reverse=True):
+		counts[row["source_doctype"]] += 1
+		batch.append(row)
+		if len(batch) >= _SCOPE_PAGE_SIZE:
+			_insert_linked_rows(evidence_doc, batch, written)
+			written += len(batch)
+			batch = []
+	if batch:
+		_insert_linked_rows(evidence_doc, batch, written)
+	return counts
+
+
+def _generation_scope(evidence_doc: Any, include_quarantine: bool) -> str:
+	return json.dumps(
+		{
+			"site": evidence_doc.get("site"),
+			"lot": evidence_doc.get("lot"),
+			"from_date": evidence_doc.get("from_date"),
+			"to_date": evidence_doc.get("to_date"),
+			"include_quarantine": bool(include_quarantine),
+		},
+		sort_keys=True,
+		default=str,
+	)
+
+
+def _stale_link_names(doctype: str, names: list[str], since: Any) -> set[str]:
+	"""Linked records that were deleted, or modified since `since` (so out of scope if not re-collected)."""
+	since_dt = frappe.utils.get_datetime(since)
+	alive: dict[str, Any] = {}
+	for start in range(0, len(names), _ATTACHMENT_COUNT_CHUNK):
+		for row in frappe.get_all(
+			doctype,
+			filters={"name": ["in", names[start : start + _ATTACHMENT_COUNT_CHUNK]]},
+			fields=["name", "modified"],
+			limit_page_length=0,
+		):
+			alive[str(row.get("name"))] = row.get("modified")
+	return {name for name in names if name not in alive or frappe.utils.get_datetime(alive[name]) >= since_dt}
+
+
+def _link_changed(existing: Any, row: dict[str, Any]) -> bool:
+	for fieldname in _LINKED_FIELDS:
+		old_value, new_value = existing.get(fieldname), row.get(fieldname)
+		if fieldname == "document_date" and old_value and new_value:
+			if frappe.utils.get_datetime(old_value) != frappe.utils.get_datetime(new_value):
+				return True
+		elif fieldname == "attachment_count":
+			if _safe_int(old_value, 0) != _safe_int(new_value, 0):
+				return True
+		elif str(old_value or "") != str(new_value or ""):
+			return True
+	return False
+
+
+def _insert_linked_rows(evidence_doc: Any, rows: list[dict[str, Any]], start_idx: int) -> None:
+	now = frappe.utils.now_datetime()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		_LINKED_DOCTYPE,
+		[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			*_LINKED_FIELDS,
+		],
+		[
+			(
+				frappe.generate_hash(length=10),
+				now,
+				now,
+				user,
+				user,
+				evidence_doc.name,
+				"EvidencePack",
+				"linked_documents",
+				start_idx + offset,
+				*(row.get(fieldname) for fieldname in _LINKED_FIELDS),
 			)
-			rows.append(
-				{
-					"source_doctype": doctype,
-					"source_name": doc_name,
-					"site": str(row.get("site") or site),
-					"document_date": row.get(date_field),
-					"status": str(row.get(config["status_field"]) or "").strip(),
-					"attachment_count": attachment_count,
-					"summary": str(config["summary_builder"](row) or "").strip(),
-				}
+			for offset, row in enumerate(rows, start=1)
+		],
+	)
+
+
+def _apply_link_delta(evidence_doc: Any, changed_rows: list[dict[str, Any]], since: Any) -> dict[str, int]:
+	"""Bring the stored linked_documents in line with `changed_rows` by writing only the difference.
+
+	Rows are inserted, updated and deleted directly in the child table, so the
+	untouched rows of a large pack are never rewritten.
+	"""
+	existing = {
+		(str(row.get("source_doctype")), str(row.get("source_name"))): row
+		for row in evidence_doc.get("linked_documents") or []
+	}
+	changed = {(str(row["source_doctype"]), str(row["source_name"])): row for row in changed_rows}
+
+	names_by_doctype: dict[str, list[str]] = {}
+	for doctype, name in existing:
+		if (doctype, name) not in changed:
+			names_by_doctype.setdefault(doctype, []).append(name)
+	deleted = [
+		existing[(doctype, name)].name
+		for doctype, names in names_by_doctype.items()
+		for name in sorted(_stale_link_names(doctype, names, since))
+	]
+
+	inserts = [row for key, row in changed.items() if key not in existing]
+	updated = 0
+	for key, row in changed.items():
+		current = existing.get(key)
+		if current is not None and _link_changed(current, row):
+			frappe.db.set_value(
+				_LINKED_DOCTYPE,
+				current.name,
+				{fieldname: row.get(fieldname) for fieldname in _LINKED_FIELDS},
+				update_modified=False,
 			)
+			updated += 1
 
-	rows.sort(key=lambda row: str(row.get("document_date") or ""), reverse=True)
-	return rows, counts
+	if deleted:
+		frappe.db.delete(_LINKED_DOCTYPE, {"name": ["in", deleted]})
+	if inserts:
+		max_idx = max((_safe_int(row.get("idx"), 0) for row in existing.values()), default=0)
+		_insert_linked_rows(evidence_doc, inserts, max_idx)
+
+	return {"inserted": len(inserts), "updated": updated, "deleted": len(deleted)}
 
 
 def _accepted_ai_narrative(evidence_doc: Any) -> str:
@@ -229,118 +551,487 @@ def _accepted_ai_narrative(evidence_doc: Any) -> str:
 	return narrative
 
 
-def _render_pdf_html(evidence_doc: Any, linked_rows: list[dict[str, Any]], counts: dict[str, int]) -> str:
-	template_path = Path(
-		frappe.get_app_path(
-			"yam_agri_core",
-			"yam_agri_core",
-			"templates",
-			"includes",
-			"evidence_pack_pdf.html",
-		)
-	)
-	template_text = template_path.read_text(encoding="utf-8")
-	context = {
-		"doc": evidence_doc,
-		"linked_documents": linked_rows,
-		"counts": counts,
-		"generated_on": frappe.utils.now_datetime(),
-		"narrative": _accepted_ai_narrative(evidence_doc),
-	}
-	return frappe.render_template(template_text, context)
-
-
 def _collect_zip_sources(evidence_doc: Any) -> list[dict[str, Any]]:
-	files: list[dict[str, Any]] = []
-	seen: set[str] = set()
+	"""File attachments of the linked records and of the EvidencePack, fetched per source DocType."""
+	names_by_doctype: dict[str, list[str]] = {}
 	for row in evidence_doc.get("linked_documents") or []:
 		doctype = str(row.get("source_doctype") or "").strip()
 		docname = str(row.get("source_name") or "").strip()
-		if not doctype or not docname:
-			continue
-		for file_row in frappe.get_all(
-			"File",
-			filters={"attached_to_doctype": doctype, "attached_to_name": docname},
-			fields=["name", "file_name", "file_url", "attached_to_doctype", "attached_to_name"],
-			limit=500,
-		):
+		if doctype and docname:
+			names_by_doctype.setdefault(doctype, []).append(docname)
+
+	files: list[dict[str, Any]] = []
+	seen: set[str] = set()
+
+	def _add(file_rows: list[dict[str, Any]]) -> None:
+		for file_row in file_rows:
 			file_name = str(file_row.get("name") or "")
 			if file_name in seen:
 				continue
 			seen.add(file_name)
 			files.append(file_row)
 
-	for file_row in frappe.get_all(
-		"File",
-		filters={"attached_to_doctype": "EvidencePack", "attached_to_name": evidence_doc.name},
-		fields=["name", "file_name", "file_url", "attached_to_doctype", "attached_to_name"],
-		limit=200,
-	):
-		file_name = str(file_row.get("name") or "")
-		if file_name in seen:
-			continue
-		seen.add(file_name)
-		files.append(file_row)
+	for doctype, names in names_by_doctype.items():
+		for start in range(0, len(names), _ATTACHMENT_COUNT_CHUNK):
+			_add(
+				frappe.get_all(
+					"File",
+					filters={
+						"attached_to_doctype": doctype,
+						"attached_to_name": ["in", names[start : start + _ATTACHMENT_COUNT_CHUNK]],
+					},
+					fields=_ZIP_SOURCE_FIELDS,
+					order_by="attached_to_name asc, creation asc",
+					limit_page_length=0,
+				)
+			)
 
+	# Earlier ZIP exports are attached to the pack too; never bundle them into the next one.
+	export_prefix = f"{_safe_zip_segment(evidence_doc.name)}-evidence-pack-"
+	_add(
+		[
+			file_row
+			for file_row in frappe.get_all(
+				"File",
+				filters={"attached_to_doctype": "EvidencePack", "attached_to_name": evidence_doc.name},
+				fields=_ZIP_SOURCE_FIELDS,
+				order_by="creation asc",
+				limit=200,
+			)
+			if not (
+				str(file_row.get("file_name") or "").startswith(export_prefix)
+				and str(file_row.get("file_name") or "").endswith(".zip")
+			)
+		]
+	)
 	return files
 
 
-def _build_zip_bytes(evidence_doc: Any, files: list[dict[str, Any]], counts: dict[str, int]) -> bytes:
-	buffer = io.BytesIO()
+def _local_file_path(file_url: str) -> Path | None:
+	"""Resolve a /files or /private/files URL to its path on disk, or None for remote/unknown files."""
+	url = (file_url or "").strip()
+	if url.startswith("/private/files/"):
+		root = Path(frappe.get_site_path("private", "files")).resolve()
+		relative = url[len("/private/files/") :]
+	elif url.startswith("/files/"):
+		root = Path(frappe.get_site_path("public", "files")).resolve()
+		relative = url[len("/files/") :]
+	else:
+		return None
+
+	path = (root / relative).resolve()
+	try:
+		path.relative_to(root)
+	except ValueError:
+		return None
+	return path if path.is_file() else None
+
+
+def _zip_entry_name(file_row: dict[str, Any], written_names: set[str]) -> str:
+	file_name = str(file_row.get("name") or "").strip()
+	doctype_segment = _safe_zip_segment(str(file_row.get("attached_to_doctype") or "Record"))
+	docname_segment = _safe_zip_segment(str(file_row.get("attached_to_name") or "Item"))
+	base_name = _safe_zip_segment(str(file_row.get("file_name") or file_row.get("file_url") or file_name))
+	zip_name = f"records/{doctype_segment}/{docname_segment}/{base_name}"
+
+	suffix = 1
+	candidate = zip_name
+	while candidate in written_names:
+		suffix += 1
+		candidate = f"records/{doctype_segment}/{docname_segment}/{suffix}_{base_name}"
+	written_names.add(candidate)
+	return candidate
+
+
+def _write_zip_archive(
+	evidence_doc: Any,
+	files: list[dict[str, Any]],
+	counts: dict[str, int],
+	target: Path,
+	progress: Callable[[int, int], None] | None = None,
+	blob_refs: dict[str, int] | None = None,
+) -> int:
+	"""Write the evidence ZIP to `target` with per-file size and SHA-256 in manifest.json.
+
+	A thread pool reads and hashes attachments ahead of the writer, which adds them
+	in order. Large attachments are copied and hashed in fixed-size blocks, so
+	memory stays bounded however large the pack is. `progress(done, total)` is
+	called every few attachments. Returns the number of attachments written.
+
+	With `blob_refs` (the "referenced" layout) attachments go to the shared blob
+	store instead of the archive; the manifest points at them by SHA-256 and
+	`blob_refs` is filled with sha256 -> size.
+	"""
 	written_names: set[str] = set()
+	manifest_files: list[dict[str, Any]] = []
+	rows = [file_row for file_row in files if str(file_row.get("name") or "").strip()]
+	paths = [_local_file_path(str(file_row.get("file_url") or "")) for file_row in rows]
+
+	with zipfile.ZipFile(target, mode="w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as bundle:
+		for index, (file_row, attachment) in enumerate(zip(rows, iter_attachments(paths), strict=True)):
+			if progress and index % _ZIP_PROGRESS_EVERY == 0:
+				progress(index, len(rows))
+			if not attachment["ok"]:
+				continue
+
+			zip_name = _zip_entry_name(file_row, written_names)
+			try:
+				if blob_refs is not None:
+					sha256, size = store_blob(attachment["path"], attachment["sha256"])
+					blob_refs[sha256] = size
+				elif attachment["content"] is not None:
+					bundle.writestr(zip_name, attachment["content"])
+					size, sha256 = attachment["size"], attachment["sha256"]
+				else:
+					with (
+						attachment["path"].open("rb") as source,
+						bundle.open(zip_name, mode="w", force_zip64=True) as entry,
+					):
+						size, sha256 = copy_with_digest(source, entry)
+			except OSError:
+				continue
+
+			manifest_entry = {
+				"path": zip_name,
+				"file": file_row.get("name"),
+				"attached_to_doctype": file_row.get("attached_to_doctype"),
+				"attached_to_name": file_row.get("attached_to_name"),
+				"size": size,
+				"sha256": sha256,
+			}
+			if blob_refs is not None:
+				query = urlencode(
+					{
+						"evidence_pack": evidence_doc.name,
+						"sha256": sha256,
+						"filename": zip_name.rsplit("/", 1)[-1],
+					}
+				)
+				manifest_entry["download"] = f"/api/method/{_BLOB_DOWNLOAD_METHOD}?{query}"
+			manifest_files.append(manifest_entry)
+
+		if not files:
+			bundle.writestr(
+				"README.txt",
+				"No linked file attachments were found. Generate/upload files on linked records and re-export.",
+			)
+		elif blob_refs is not None:
+			bundle.writestr(
+				"README.txt",
+				"Attachments are not embedded in this archive. Each entry in manifest.json lists the file's "
+				"SHA-256 and a download link; verify downloads against the SHA-256.",
+			)
 
-	with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as bundle:
 		manifest = {
 			"evidence_pack": evidence_doc.name,
+			"layout": "referenced" if blob_refs is not None else "bundle",
 			"site": evidence_doc.get("site"),
 			"from_date": evidence_doc.get("from_date"),
 			"to_date": evidence_doc.get("to_date"),
 			"generated_at": frappe.utils.now_datetime().isoformat(),
 			"record_count": _safe_int(evidence_doc.get("record_count"), 0),
 			"source_counts": counts,
-			"file_count": len(files),
+			"file_count": len(manifest_files),
+			"files": manifest_files,
 		}
 		bundle.writestr(
 			"manifest.json",
 			json.dumps(manifest, ensure_ascii=False, indent=2, default=str),
 		)
 
-		for file_row in files:
-			file_name = str(file_row.get("name") or "").strip()
-			if not file_name:
-				continue
-			try:
-				file_doc = frappe.get_doc("File", file_name)
-				content = file_doc.get_content()
-			except Exception:
-				continue
+	return len(manifest_files)
 
-			if content is None:
-				continue
-			if isinstance(content, str):
-				content = content.encode("utf-8")
-
-			doctype_segment = _safe_zip_segment(str(file_row.get("attached_to_doctype") or "Record"))
-			docname_segment = _safe_zip_segment(str(file_row.get("attached_to_name") or "Item"))
-			base_name = _safe_zip_segment(str(file_row.get("file_name") or file_row.get("file_url") or file_name))
-			zip_name = f"records/{doctype_segment}/{docname_segment}/{base_name}"
-
-			suffix = 1
-			candidate = zip_name
-			while candidate in written_names:
-				suffix += 1
-				candidate = f"records/{doctype_segment}/{docname_segment}/{suffix}_{base_name}"
-			zip_name = candidate
-			written_names.add(zip_name)
-			bundle.writestr(zip_name, content)
 
-		if not files:
-			bundle.writestr(
-				"README.txt",
-				"No linked file attachments were found. Generate/upload files on linked records and re-export.",
-			)
+def _file_md5(path: Path) -> str:
+	digest = hashlib.md5(usedforsecurity=False)
+	with path.open("rb") as handle:
+		for block in iter(lambda: handle.read(_ZIP_COPY_BLOCK_SIZE), b""):
+			digest.update(block)
+	return digest.hexdigest()
+
+
+def _register_private_file(path: Path, attached_to_doctype: str, attached_to_name: str) -> Any:
+	"""Create a File record for a file already written to the private files directory.
+
+	`content_hash` and `file_size` are filled in up front so Frappe does not read
+	the whole file back into memory to compute them.
+	"""
+	file_doc = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": path.name,
+			"file_url": f"/private/files/{path.name}",
+			"is_private": 1,
+			"attached_to_doctype": attached_to_doctype,
+			"attached_to_name": attached_to_name,
+			"file_size": path.stat().st_size,
+			"content_hash": _file_md5(path),
+		}
+	)
+	file_doc.insert(ignore_permissions=True)
+	return file_doc
+
+
+def _build_zip_file(
+	evidence_doc: Any,
+	files: list[dict[str, Any]],
+	counts: dict[str, int],
+	progress: Callable[[int, int], None] | None = None,
+	blob_refs: dict[str, int] | None = None,
+) -> Any:
+	"""Spool the evidence ZIP to the private files directory and register it as a File."""
+	files_dir = Path(frappe.get_site_path("private", "files"))
+	files_dir.mkdir(parents=True, exist_ok=True)
+	file_name = f"{_safe_zip_segment(evidence_doc.name)}-evidence-pack-{frappe.generate_hash(length=8)}.zip"
+	target = files_dir / file_name
+
+	handle, temp_name = tempfile.mkstemp(prefix=f".{file_name}.", suffix=".tmp", dir=files_dir)
+	os.close(handle)
+	temp_path = Path(temp_name)
+	try:
+		_write_zip_archive(evidence_doc, files, counts, temp_path, progress=progress, blob_refs=blob_refs)
+		os.replace(temp_path, target)
+	finally:
+		temp_path.unlink(missing_ok=True)
+
+	return _register_private_file(target, "EvidencePack", evidence_doc.name)
+
 
-	return buffer.getvalue()
+def _linked_rows(evidence_doc: Any) -> list[dict[str, Any]]:
+	return [
+		{
+			"source_doctype": row.get("source_doctype"),
+			"source_name": row.get("source_name"),
+			"site": row.get("site"),
+			"document_date": row.get("document_date"),
+			"status": row.get("status"),
+			"attachment_count": row.get("attachment_count"),
+			"summary": row.get("summary"),
+		}
+		for row in evidence_doc.get("linked_documents") or []
+	]
+
+
+def _source_counts(linked_rows: list[dict[str, Any]]) -> dict[str, int]:
+	counts: dict[str, int] = {}
+	for row in linked_rows:
+		doctype = str(row.get("source_doctype") or "")
+		if doctype:
+			counts[doctype] = counts.get(doctype, 0) + 1
+	return counts
+
+
+def _export_fingerprint(
+	evidence_doc: Any,
+	export_format: str,
+	linked_rows: list[dict[str, Any]],
+	files: list[dict[str, Any]] | None = None,
+	layout: str = "bundle",
+) -> str:
+	"""SHA-256 over everything an export is rendered from.
+
+	PDF: pack header, linked rows, template text and accepted narrative. ZIP: pack
+	header, linked rows, layout and the attachments' names, URLs, content hashes
+	and sizes.
+	"""
+	payload: dict[str, Any] = {
+		"format": export_format,
+		"version": _EXPORT_FORMAT_VERSION[export_format],
+		"pack": {fieldname: evidence_doc.get(fieldname) for fieldname in _EXPORT_HEADER_FIELDS},
+		"linked_documents": linked_rows,
+	}
+	if export_format == "pdf":
+		payload["template"] = pdf_template_version()
+		payload["narrative"] = _accepted_ai_narrative(evidence_doc)
+	else:
+		payload["layout"] = layout
+		payload["files"] = [
+			[
+				file_row.get("name"),
+				file_row.get("file_url"),
+				file_row.get("content_hash"),
+				file_row.get("file_size"),
+				file_row.get("attached_to_doctype"),
+				file_row.get("attached_to_name"),
+			]
+			for file_row in files or []
+		]
+	encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+	return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _cached_export_url(evidence_doc: Any, export_format: str, fingerprint: str) -> str:
+	"""URL of the previous export when it was rendered from identical inputs and is still on disk."""
+	file_url = str(evidence_doc.get(f"{export_format}_file") or "").strip()
+	if not file_url or evidence_doc.get(f"{export_format}_export_hash") != fingerprint:
+		return ""
+	if _local_file_path(file_url) is None:
+		return ""
+	return file_url
+
+
+def _mark_ready(evidence_doc: Any) -> None:
+	"""Move a Draft/Prepared pack to Ready before fingerprinting, so the status matches the output."""
+	if str(evidence_doc.get("status") or "").strip() in {"Draft", "Prepared"}:
+		evidence_doc.status = "Ready"
+
+
+def _export_pdf(evidence_doc: Any, progress: Callable[[int, int], None] | None = None) -> dict[str, Any]:
+	_mark_ready(evidence_doc)
+	linked_rows = _linked_rows(evidence_doc)
+	fingerprint = _export_fingerprint(evidence_doc, "pdf", linked_rows)
+	cached_url = _cached_export_url(evidence_doc, "pdf", fingerprint)
+	if cached_url:
+		return {
+			"ok": True,
+			"evidence_pack": evidence_doc.name,
+			"status": evidence_doc.status,
+			"pdf_file": cached_url,
+			"narrative_included": bool(_accepted_ai_narrative(evidence_doc)),
+			"cached": True,
+		}
+
+	context = {
+		"doc": evidence_doc,
+		"counts": _source_counts(linked_rows),
+		"generated_on": frappe.utils.now_datetime(),
+		"narrative": _accepted_ai_narrative(evidence_doc),
+	}
+	pdf_content = render_evidence_pdf(context, linked_rows, progress=progress)
+
+	file_doc = save_file(
+		f"{evidence_doc.name}-evidence-pack.pdf",
+		pdf_content,
+		"EvidencePack",
+		evidence_doc.name,
+		is_private=1,
+	)
+	# db_set rather than save(): save() would rewrite every linked_documents row.
+	evidence_doc.db_set(
+		{
+			"pdf_file": str(file_doc.file_url or ""),
+			"pdf_export_hash": fingerprint,
+			"status": evidence_doc.status,
+		}
+	)
+	clear_auditor_portal_cache()
+
+	return {
+		"ok": True,
+		"evidence_pack": evidence_doc.name,
+		"status": evidence_doc.status,
+		"pdf_file": evidence_doc.pdf_file,
+		"narrative_included": bool(_accepted_ai_narrative(evidence_doc)),
+		"cached": False,
+	}
+
+
+def _zip_layout(layout: str | None) -> str:
+	value = str(layout or "bundle").strip().lower()
+	if value not in _ZIP_LAYOUTS:
+		frappe.throw(
+			_("ZIP layout must be one of: {0}").format(", ".join(_ZIP_LAYOUTS)), frappe.ValidationError
+		)
+	return value
+
+
+def _export_zip(
+	evidence_doc: Any,
+	progress: Callable[[int, int], None] | None = None,
+	layout: str = "bundle",
+) -> dict[str, Any]:
+	_mark_ready(evidence_doc)
+	linked_rows = _linked_rows(evidence_doc)
+	files = _collect_zip_sources(evidence_doc)
+	fingerprint = _export_fingerprint(evidence_doc, "zip", linked_rows, files, layout=layout)
+	cached_url = _cached_export_url(evidence_doc, "zip", fingerprint)
+	if cached_url:
+		return {
+			"ok": True,
+			"evidence_pack": evidence_doc.name,
+			"status": evidence_doc.status,
+			"zip_file": cached_url,
+			"file_count": len(files),
+			"layout": layout,
+			"cached": True,
+		}
+
+	blob_refs: dict[str, int] | None = {} if layout == "referenced" else None
+	file_doc = _build_zip_file(
+		evidence_doc, files, _source_counts(linked_rows), progress=progress, blob_refs=blob_refs
+	)
+	if blob_refs is not None:
+		sync_pack_blob_references(evidence_doc.name, evidence_doc.get("site"), blob_refs)
+	evidence_doc.db_set(
+		{
+			"zip_file": str(file_doc.file_url or ""),
+			"zip_export_hash": fingerprint,
+			"status": evidence_doc.status,
+		}
+	)
+	clear_auditor_portal_cache()
+
+	return {
+		"ok": True,
+		"evidence_pack": evidence_doc.name,
+		"status": evidence_doc.status,
+		"zip_file": evidence_doc.zip_file,
+		"file_count": len(files),
+		"layout": layout,
+		"cached": False,
+	}
+
+
+_EXPORTERS = {"pdf": _export_pdf, "zip": _export_zip}
+
+
+def _export_job_layout(export_format: str, layout: str) -> str:
+	# Only ZIP exports have layouts; PDF jobs and events carry "".
+	return layout if export_format == "zip" else ""
+
+
+def _publish_export_progress(
+	user: str, evidence_pack: str, export_format: str, layout: str, **payload: Any
+) -> None:
+	frappe.publish_realtime(
+		_EXPORT_PROGRESS_EVENT,
+		{"evidence_pack": evidence_pack, "export_format": export_format, "layout": layout, **payload},
+		user=user,
+		doctype="EvidencePack",
+		docname=evidence_pack,
+	)
+
+
+def run_evidence_pack_export(
+	evidence_pack: str, export_format: str, user: str, layout: str = "bundle"
+) -> dict[str, Any]:
+	"""Background job for `enqueue_evidence_pack_export`; reports progress to `user` over realtime."""
+	evidence_doc = frappe.get_doc("EvidencePack", evidence_pack)
+	options = {"layout": layout} if export_format == "zip" else {}
+	job_layout = _export_job_layout(export_format, layout)
+
+	def _progress(done: int, total: int) -> None:
+		_publish_export_progress(
+			user, evidence_pack, export_format, job_layout, state="running", done=done, total=total
+		)
+
+	try:
+		result = _EXPORTERS[export_format](evidence_doc, progress=_progress, **options)
+	except Exception:
+		frappe.log_error(title=f"EvidencePack {export_format.upper()} export failed: {evidence_pack}")
+		_publish_export_progress(user, evidence_pack, export_format, job_layout, state="failed")
+		raise
+
+	_publish_export_progress(
+		user,
+		evidence_pack,
+		export_format,
+		job_layout,
+		state="done",
+		file_url=result.get(f"{export_format}_file"),
+		cached=result.get("cached"),
+	)
+	return result
 
 
 @frappe.whitelist()
@@ -349,123 +1040,215 @@ def generate_evidence_pack_links(
 	rebuild: int = 1,
 	include_quarantine: int = 1,
 ) -> dict[str, Any]:
-	"""Build EvidencePack linked-document rows for scoped records."""
+	"""Build EvidencePack linked-document rows for scoped records.
+
+	`rebuild=0` applies only what changed since `generated_at`. It falls back to a
+	full rebuild when the pack was never generated or its scope has changed since.
+	"""
 	_assert_role_gate(_("generate evidence packs"))
 	evidence_doc = _resolve_evidence_pack_doc(evidence_pack, permission_type="write")
 
-	rows, counts = _collect_scope_rows(
-		evidence_doc,
-		include_quarantine=bool(_safe_int(include_quarantine, 1)),
-	)
-	if _safe_int(rebuild, 1) == 1:
-		evidence_doc.set("linked_documents", [])
+	quarantine = bool(_safe_int(include_quarantine, 1))
+	scope = _generation_scope(evidence_doc, quarantine)
+	since = evidence_doc.get("generated_at")
+	incremental = _safe_int(rebuild, 1) == 0 and bool(since) and evidence_doc.get("generated_scope") == scope
+	values: dict[str, Any] = {
+		"generated_at": frappe.utils.now_datetime(),
+		"generated_by": frappe.session.user,
+	}
 
-	for row in rows:
-		evidence_doc.append("linked_documents", row)
+	if incremental:
+		changed_rows, _changed_counts = _collect_scope_rows(
+			evidence_doc, include_quarantine=quarantine, modified_since=since
+		)
+		delta = _apply_link_delta(evidence_doc, changed_rows, since)
+		counts: dict[str, int] = {}
+		for row in frappe.get_all(
+			_LINKED_DOCTYPE,
+			filters={"parent": evidence_doc.name, "parenttype": "EvidencePack"},
+			fields=["source_doctype", "count(name) as row_count"],
+			group_by="source_doctype",
+		):
+			counts[str(row.get("source_doctype"))] = _safe_int(row.get("row_count"), 0)
+		record_count = sum(counts.values())
+	else:
+		counts = _rebuild_linked_rows(evidence_doc, include_quarantine=quarantine)
+		record_count = sum(counts.values())
+		delta = {"inserted": record_count, "updated": 0, "deleted": 0}
+		values["generated_scope"] = scope
 
-	evidence_doc.generated_at = frappe.utils.now_datetime()
-	evidence_doc.generated_by = frappe.session.user
-	evidence_doc.record_count = len(rows)
+	values["record_count"] = record_count
 	if str(evidence_doc.get("status") or "").strip() in {"Draft", "Prepared"}:
-		evidence_doc.status = "Ready"
-	evidence_doc.save()
+		values["status"] = "Ready"
+	evidence_doc.db_set(values)
+	clear_auditor_portal_cache()
 
 	return {
 		"ok": True,
 		"evidence_pack": evidence_doc.name,
 		"site": evidence_doc.site,
 		"status": evidence_doc.status,
-		"record_count": len(rows),
+		"record_count": record_count,
 		"counts": counts,
+		"mode": "incremental" if incremental else "rebuild",
+		**delta,
 	}
 
 
 @frappe.whitelist()
 def export_evidence_pack_pdf(evidence_pack: str) -> dict[str, Any]:
-	"""Render and attach a PDF export for the EvidencePack."""
+	"""Render and attach a PDF export for the EvidencePack, reusing an unchanged one."""
 	_assert_role_gate(_("export EvidencePack PDF"))
 	evidence_doc = _resolve_evidence_pack_doc(evidence_pack, permission_type="write")
+	return _export_pdf(evidence_doc)
 
-	linked_rows = []
-	for row in evidence_doc.get("linked_documents") or []:
-		linked_rows.append(
-			{
-				"source_doctype": row.get("source_doctype"),
-				"source_name": row.get("source_name"),
-				"site": row.get("site"),
-				"document_date": row.get("document_date"),
-				"status": row.get("status"),
-				"attachment_count": row.get("attachment_count"),
-				"summary": row.get("summary"),
-			}
-		)
-	counts: dict[str, int] = {}
-	for row in linked_rows:
-		doctype = str(row.get("source_doctype") or "")
-		if doctype:
-			counts[doctype] = counts.get(doctype, 0) + 1
 
-	html = _render_pdf_html(evidence_doc, linked_rows, counts)
-	pdf_content = get_pdf(html)
-	if isinstance(pdf_content, str):
-		pdf_content = pdf_content.encode("utf-8")
+@frappe.whitelist()
+def export_evidence_pack_zip(evidence_pack: str, layout: str = "bundle") -> dict[str, Any]:
+	"""Bundle linked file attachments into a ZIP and attach it to EvidencePack, reusing an unchanged one.
 
-	file_doc = save_file(
-		f"{evidence_doc.name}-evidence-pack.pdf",
-		pdf_content,
-		"EvidencePack",
-		evidence_doc.name,
-		is_private=1,
-	)
-	evidence_doc.pdf_file = str(file_doc.file_url or "")
-	if str(evidence_doc.get("status") or "").strip() in {"Draft", "Prepared"}:
-		evidence_doc.status = "Ready"
-	evidence_doc.save()
+	`layout="referenced"` keeps attachments in the shared blob store and lists them
+	in the manifest instead of copying them into every pack's archive.
+	"""
+	_assert_role_gate(_("export EvidencePack ZIP"))
+	zip_layout = _zip_layout(layout)
+	evidence_doc = _resolve_evidence_pack_doc(evidence_pack, permission_type="write")
+	return _export_zip(evidence_doc, layout=zip_layout)
+
+
+@frappe.whitelist()
+def enqueue_evidence_pack_export(
+	evidence_pack: str, export_format: str = "pdf", layout: str = "bundle"
+) -> dict[str, Any]:
+	"""Queue a PDF or ZIP export; an unchanged pack returns its existing file without queueing.
+
+	Progress is published to the caller as `yam_agri_evidence_export_progress` realtime events.
+	"""
+	fmt = str(export_format or "").strip().lower()
+	if fmt not in _EXPORTERS:
+		frappe.throw(_("Export format must be PDF or ZIP"), frappe.ValidationError)
+	zip_layout = _zip_layout(layout)
+	_assert_role_gate(_("export EvidencePack {0}").format(fmt.upper()))
+	evidence_doc = _resolve_evidence_pack_doc(evidence_pack, permission_type="write")
+
+	_mark_ready(evidence_doc)
+	linked_rows = _linked_rows(evidence_doc)
+	files = _collect_zip_sources(evidence_doc) if fmt == "zip" else None
+	fingerprint = _export_fingerprint(evidence_doc, fmt, linked_rows, files, layout=zip_layout)
+	cached_url = _cached_export_url(evidence_doc, fmt, fingerprint)
+	if cached_url:
+		return {
+			"ok": True,
+			"evidence_pack": evidence_doc.name,
+			"export_format": fmt,
+			"queued": False,
+			"cached": True,
+			"file_url": cached_url,
+		}
 
+	job_layout = _export_job_layout(fmt, zip_layout)
+	# The layout is part of the job id, so a "referenced" ZIP requested while a
+	# "bundle" one is queued is not dropped as a duplicate (and vice versa).
+	job_id = "::".join(filter(None, ("evidence-pack-export", evidence_doc.name, fmt, job_layout)))
+	frappe.enqueue(
+		"yam_agri_core.yam_agri_core.api.evidence_pack.run_evidence_pack_export",
+		queue="long",
+		timeout=3600,
+		job_id=job_id,
+		deduplicate=True,
+		enqueue_after_commit=True,
+		evidence_pack=evidence_doc.name,
+		export_format=fmt,
+		user=frappe.session.user,
+		layout=zip_layout,
+	)
 	return {
 		"ok": True,
 		"evidence_pack": evidence_doc.name,
-		"status": evidence_doc.status,
-		"pdf_file": evidence_doc.pdf_file,
-		"narrative_included": bool(_accepted_ai_narrative(evidence_doc)),
+		"export_format": fmt,
+		"layout": job_layout,
+		"queued": True,
+		"cached": False,
+		"job_id": job_id,
+		"progress_event": _EXPORT_PROGRESS_EVENT,
 	}
 
 
 @frappe.whitelist()
-def export_evidence_pack_zip(evidence_pack: str) -> dict[str, Any]:
-	"""Bundle linked file attachments into a ZIP and attach it to EvidencePack."""
-	_assert_role_gate(_("export EvidencePack ZIP"))
-	evidence_doc = _resolve_evidence_pack_doc(evidence_pack, permission_type="write")
+def download_evidence_blob(evidence_pack: str, sha256: str, filename: str | None = None) -> Response:
+	"""Download one attachment of a referenced-layout ZIP export by its SHA-256."""
+	evidence_doc = _resolve_evidence_pack_doc(evidence_pack, permission_type="read")
+	digest = str(sha256 or "").strip().lower()
+	if not pack_references_blob(evidence_doc.name, digest):
+		frappe.throw(_("This file is not part of the EvidencePack"), frappe.PermissionError)
+	return blob_response(digest, filename=_safe_zip_segment(filename) if filename else None)
 
-	counts: dict[str, int] = {}
-	for row in evidence_doc.get("linked_documents") or []:
-		doctype = str(row.get("source_doctype") or "")
-		if doctype:
-			counts[doctype] = counts.get(doctype, 0) + 1
 
-	files = _collect_zip_sources(evidence_doc)
-	zip_bytes = _build_zip_bytes(evidence_doc, files, counts)
-	file_doc = save_file(
-		f"{evidence_doc.name}-evidence-pack.zip",
-		zip_bytes,
-		"EvidencePack",
-		evidence_doc.name,
-		is_private=1,
-	)
-	evidence_doc.zip_file = str(file_doc.file_url or "")
-	if str(evidence_doc.get("status") or "").strip() in {"Draft", "Prepared"}:
-		evidence_doc.status = "Ready"
-	evidence_doc.save()
+def _download_format(export_format: str | None) -> str:
+	fmt = str(export_format or "").strip().lower()
+	if fmt not in _EXPORTERS:
+		frappe.throw(_("Export format must be PDF or ZIP"), frappe.ValidationError)
+	return fmt
+
 
+def with_download_links(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+	"""Copies of portal listing rows with signed `pdf_download`/`zip_download` URLs.
+
+	The listing is filtered by Site only, and a signed link bypasses File
+	permissions, so links are signed only for packs the session user can read.
+	"""
+	linked = []
+	for row in rows:
+		name = str(row.get("name") or "")
+		readable = bool(name) and frappe.has_permission("EvidencePack", "read", doc=name)
+		downloads = {}
+		for fmt in ("pdf", "zip"):
+			file_url = row.get(f"{fmt}_file") if readable else None
+			downloads[f"{fmt}_download"] = (
+				signed_download_url(name, fmt, str(file_url))[0] if file_url else ""
+			)
+		linked.append({**row, **downloads})
+	return linked
+
+
+@frappe.whitelist()
+def get_evidence_download_url(evidence_pack: str, export_format: str = "pdf") -> dict[str, Any]:
+	"""Issue a signed link to the pack's PDF or ZIP export, valid for DOWNLOAD_TOKEN_TTL seconds."""
+	fmt = _download_format(export_format)
+	evidence_doc = _resolve_evidence_pack_doc(evidence_pack, permission_type="read")
+	file_url = str(evidence_doc.get(f"{fmt}_file") or "")
+	if not file_url:
+		frappe.throw(
+			_("EvidencePack {0} has no {1} export yet").format(evidence_doc.name, fmt.upper()),
+			frappe.DoesNotExistError,
+		)
+	url, expires = signed_download_url(evidence_doc.name, fmt, file_url)
 	return {
 		"ok": True,
 		"evidence_pack": evidence_doc.name,
-		"status": evidence_doc.status,
-		"zip_file": evidence_doc.zip_file,
-		"file_count": len(files),
+		"export_format": fmt,
+		"url": url,
+		"expires": expires,
 	}
 
 
+@frappe.whitelist(allow_guest=True)
+def download_evidence_file(evidence_pack: str, export_format: str, expires: str, signature: str) -> Response:
+	"""Serve an EvidencePack PDF/ZIP export for a signed link from get_evidence_download_url.
+
+	The signature is the authorisation, so links work for auditors without a
+	session. Behind nginx the file itself is sent by nginx, with Range support.
+	"""
+	fmt = _download_format(export_format)
+	evidence_name = str(evidence_pack or "").strip()
+	file_url = str(frappe.db.get_value("EvidencePack", evidence_name, f"{fmt}_file") or "")
+	verify_download_signature(evidence_name, fmt, file_url, expires, signature)
+	path = _local_file_path(file_url)
+	if not path:
+		frappe.throw(_("Evidence file is no longer available"), frappe.DoesNotExistError)
+	return file_response(path, path.name)
+
+
 @frappe.whitelist()
 def mark_evidence_pack_sent(evidence_pack: str) -> dict[str, Any]:
 	"""Set EvidencePack status to Sent using server-side role gates."""
@@ -480,25 +1263,24 @@ def mark_evidence_pack_sent(evidence_pack: str) -> dict[str, Any]:
 	}
 
 
-@frappe.whitelist(allow_guest=True)
-def get_auditor_evidence_pack_stub(
-	site: str | None = None,
-	from_date: str | None = None,
-	to_date: str | None = None,
-	limit: int = 50,
-) -> dict[str, Any]:
-	"""Read-only EvidencePack list stub for V1.2 auditor portal flow."""
-	if frappe.session.user == "Guest":
-		return {
-			"ok": True,
-			"enabled": False,
-			"portal": "stub",
-			"message": _(
-				"Auditor guest portal token access is planned for V1.2. Sign in for internal read-only preview."
-			),
-			"records": [],
-		}
+def _guest_portal_stub() -> dict[str, Any]:
+	return {
+		"ok": True,
+		"enabled": False,
+		"portal": "stub",
+		"message": _(
+			"Auditor guest portal token access is planned for V1.2. Sign in for internal read-only preview."
+		),
+		"records": [],
+	}
+
 
+def _load_auditor_portal_listing(
+	site: str | None,
+	from_date: str | None,
+	to_date: str | None,
+	limit: int,
+) -> dict[str, Any]:
 	filters: dict[str, Any] = {
 		"status": ["in", ["Ready", "Sent", "Approved"]],
 	}
@@ -530,7 +1312,6 @@ def get_auditor_evidence_pack_stub(
 	elif to_value:
 		filters["from_date"] = ["<=", to_value]
 
-	safe_limit = max(1, min(_safe_int(limit, 50), _MAX_PORTAL_ROWS))
 	rows = frappe.get_all(
 		"EvidencePack",
 		filters=filters,
@@ -548,7 +1329,7 @@ def get_auditor_evidence_pack_stub(
 			"modified",
 		],
 		order_by="modified desc",
-		limit=safe_limit,
+		limit=limit,
 	)
 
 	return {
@@ -560,3 +1341,90 @@ def get_auditor_evidence_pack_stub(
 		),
 		"records": rows,
 	}
+
+
+def _payload_etag(payload: dict[str, Any]) -> str:
+	return '"{}"'.format(hashlib.sha256(frappe.as_json(payload).encode("utf-8")).hexdigest()[:32])
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+	for candidate in str(if_none_match or "").split(","):
+		candidate = candidate.strip()
+		if candidate.startswith("W/"):
+			candidate = candidate[2:]
+		if candidate in {"*", etag}:
+			return True
+	return False
+
+
+def _auditor_portal_generation() -> str:
+	generation = frappe.cache.get_value(_AUDITOR_PORTAL_GENERATION_KEY)
+	if not generation:
+		generation = frappe.generate_hash(length=10)
+		frappe.cache.set_value(_AUDITOR_PORTAL_GENERATION_KEY, generation)
+	return str(generation)
+
+
+def clear_auditor_portal_cache(doc=None, method=None) -> None:
+	"""Invalidate every cached auditor portal listing.
+
+	Listings are cached per user and filter set, so rather than finding each
+	key this starts a new generation; old entries expire on their own.
+	"""
+	frappe.cache.set_value(_AUDITOR_PORTAL_GENERATION_KEY, frappe.generate_hash(length=10))
+
+
+def get_auditor_portal_listing(
+	site: str | None = None,
+	from_date: str | None = None,
+	to_date: str | None = None,
+	limit: int = 50,
+) -> tuple[dict[str, Any], str]:
+	"""The auditor portal listing for the session user and its ETag.
+
+	Listings are cached in Redis per (user, site, date range, limit) until an
+	EvidencePack or User Permission changes, or _AUDITOR_PORTAL_CACHE_TTL passes.
+	"""
+	user = frappe.session.user
+	if user == "Guest":
+		payload = _guest_portal_stub()
+		return payload, _payload_etag(payload)
+
+	safe_limit = max(1, min(_safe_int(limit, 50), _MAX_PORTAL_ROWS))
+	params = [user, (site or "").strip(), (from_date or "").strip(), (to_date or "").strip(), safe_limit]
+	key_hash = hashlib.sha256(json.dumps(params).encode("utf-8")).hexdigest()
+	cache_key = f"{_AUDITOR_PORTAL_CACHE_PREFIX}:{_auditor_portal_generation()}:{key_hash}"
+	cached = frappe.cache.get_value(cache_key)
+	if cached:
+		return cached["payload"], cached["etag"]
+
+	payload = _load_auditor_portal_listing(site, from_date, to_date, safe_limit)
+	etag = _payload_etag(payload)
+	frappe.cache.set_value(
+		cache_key, {"payload": payload, "etag": etag}, expires_in_sec=_AUDITOR_PORTAL_CACHE_TTL
+	)
+	return payload, etag
+
+
+@frappe.whitelist(allow_guest=True)
+def get_auditor_evidence_pack_stub(
+	site: str | None = None,
+	from_date: str | None = None,
+	to_date: str | None = None,
+	limit: int = 50,
+) -> dict[str, Any]:
+	"""Read-only EvidencePack list stub for V1.2 auditor portal flow.
+
+	Responses carry an ETag; a client that sends it back in If-None-Match
+	gets 304 Not Modified while the listing is unchanged.
+	"""
+	if frappe.session.user == "Guest":
+		return _guest_portal_stub()
+
+	payload, etag = get_auditor_portal_listing(site, from_date, to_date, limit)
+	frappe.local.response_headers.set("ETag", etag)
+	frappe.local.response_headers.set("Cache-Control", "private, no-cache")
+	if _etag_matches(frappe.get_request_header("If-None-Match"), etag):
+		frappe.local.response["http_status_code"] = 304
+		return {"ok": True, "not_modified": True}
+	return payload
@@ -6,6 +6,7 @@ from typing import Any
 import frappe
 from frappe import _
 
+from yam_agri_core.yam_agri_core.doctype.device.device import get_device_registry
 from yam_agri_core.yam_agri_core.site_permissions import assert_site_access, get_allowed_sites, resolve_site
 
 MAX_SUMMARY_LIMIT = 500
@@ -108,3 +109,30 @@ def get_observation_alert_channels() -> dict[str, Any]:
 		"message": _("Phase 5 alert channels configured"),
 		"channels": channels,
 	}
+
+
+@frappe.whitelist()
+def get_device_registry_snapshot(site: str | None = None) -> dict[str, Any]:
+	"""Return the cached Device registry for IoT gateway device ownership checks.
+
+	Rows are limited to the caller's Sites; gateway integration users normally
+	hold System Manager and receive every Device.
+	"""
+
+	devices = list((get_device_registry().get("devices") or {}).values())
+	if site:
+		site_name = resolve_site(site)
+		assert_site_access(site_name)
+		devices = [row for row in devices if row.get("site") == site_name]
+	else:
+		user = frappe.session.user
+		if not _has_global_site_access(user):
+			allowed_sites = set(get_allowed_sites(user=user))
+			devices = [row for row in devices if row.get("site") in allowed_sites]
+
+	devices.sort(key=lambda row: str(row.get("name") or ""))
+	return {
+		"status": "ok",
+		"device_count": len(devices),
+		"devices": devices,
+	}
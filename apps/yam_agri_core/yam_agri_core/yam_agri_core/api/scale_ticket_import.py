@@ -9,6 +9,8 @@ from typing import Any
 import frappe
 from frappe import _
 
+from yam_agri_core.yam_agri_core.doctype.device.device import resolve_device_for_site
+from yam_agri_core.yam_agri_core.inventory.tolerance import get_site_tolerance_pct
 from yam_agri_core.yam_agri_core.site_permissions import assert_site_access, resolve_site
 
 QA_MANAGER_ROLE = "QA Manager"
@@ -65,39 +67,6 @@ def _safe_float(value: Any) -> float | None:
 		return None
 
 
-def _fetch_site_tolerance_pct(site_name: str, override_policy: str | None = None) -> float:
-	if frappe.db.exists("DocType", "Site Tolerance Policy"):
-		filters: dict[str, Any] = {"site": site_name, "active": 1}
-		if override_policy:
-			filters["name"] = override_policy
-		policy_row = frappe.get_all(
-			"Site Tolerance Policy",
-			filters=filters,
-			fields=["name", "tolerance_pct", "from_date", "to_date"],
-			order_by="modified desc",
-			limit_page_length=20,
-		)
-		today = frappe.utils.nowdate()
-		for row in policy_row:
-			from_date = row.get("from_date")
-			to_date = row.get("to_date")
-			if from_date and str(from_date) > str(today):
-				continue
-			if to_date and str(to_date) < str(today):
-				continue
-			pct = _safe_float(row.get("tolerance_pct"))
-			if pct and pct > 0:
-				return float(pct)
-
-	season_policy_pct = frappe.db.get_value(
-		"Season Policy", {"site": site_name, "active": 1}, "max_test_age_days"
-	)
-	if season_policy_pct:
-		_ = season_policy_pct
-
-	return 2.5
-
-
 def _resolve_lot_for_site(site_name: str, lot_ref: str) -> str | None:
 	lot_ref = (lot_ref or "").strip()
 	if not lot_ref:
@@ -115,19 +84,7 @@ def _resolve_lot_for_site(site_name: str, lot_ref: str) -> str | None:
 
 
 def _resolve_device_for_site(site_name: str, device_ref: str | None) -> str | None:
-	device_ref = (device_ref or "").strip()
-	if device_ref:
-		device_name = frappe.db.get_value("Device", {"name": device_ref, "site": site_name}, "name")
-		if device_name:
-			return str(device_name)
-		by_label = frappe.db.get_value("Device", {"device_name": device_ref, "site": site_name}, "name")
-		if by_label:
-			return str(by_label)
-
-	fallback = frappe.db.get_value("Device", {"site": site_name, "status": "Active"}, "name")
-	if fallback:
-		return str(fallback)
-	return None
+	return resolve_device_for_site(site_name, device_ref)
 
 
 def _compute_mismatch_pct(declared_net_kg: float, measured_net_kg: float) -> float:
@@ -260,7 +217,7 @@ def import_scale_tickets_csv(
 	assert_site_access(site_name)
 	_assert_role_gate(allowed_roles=SCALE_IMPORT_ALLOWED_ROLES, action_label=_("import scale tickets"))
 
-	tolerance_pct = _fetch_site_tolerance_pct(site_name, override_policy=tolerance_policy)
+	tolerance_pct = get_site_tolerance_pct(site_name, override_policy=tolerance_policy)
 	rows = _parse_csv_rows(csv_content)
 
 	required_columns = ["ticket_number", "lot", "gross_kg", "tare_kg", "declared_net_kg"]
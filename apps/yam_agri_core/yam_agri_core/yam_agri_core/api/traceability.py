@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from typing import Any
+
+import frappe
+from frappe import _, utils
+
+from yam_agri_core.yam_agri_core.request_params import parse_lot_names
+from yam_agri_core.yam_agri_core.site_permissions import assert_site_access, get_allowed_sites, resolve_site
+from yam_agri_core.yam_agri_core.traceability.closure import (
+	get_descendants_of_lots,
+	get_lot_ancestors,
+	get_lot_descendants,
+)
+from yam_agri_core.yam_agri_core.traceability.genealogy import DEFAULT_GENEALOGY_DEPTH, trace_lot_genealogy
+from yam_agri_core.yam_agri_core.traceability.recall import simulate_recall
+
+GENEALOGY_DIRECTIONS = {"forward", "backward", "both"}
+LINEAGE_DIRECTIONS = {"upstream", "downstream"}
+MAX_IMPACT_SEED_LOTS = 500
+
+
+def _has_global_site_access(user: str) -> bool:
+	if user == "Administrator":
+		return True
+	return "System Manager" in set(frappe.get_roles(user) or [])
+
+
+def _resolve_trace_sites(lot_site: str, site: str | None) -> list[str] | None:
+	"""Sites whose Transfers the trace may follow: the requested Site, else all the caller may read."""
+	if site:
+		site_name = resolve_site(site)
+		assert_site_access(site_name)
+		return [site_name]
+
+	user = frappe.session.user
+	if _has_global_site_access(user):
+		return None
+	return sorted(set(get_allowed_sites(user=user)) | {lot_site})
+
+
+def _visible_sites() -> list[str] | None:
+	user = frappe.session.user
+	if _has_global_site_access(user):
+		return None
+	return sorted(get_allowed_sites(user=user))
+
+
+def _resolve_seed_lots(lots: Any) -> list[str]:
+	"""Parse seed Lots, check they exist and that the caller can access their Sites."""
+	seeds = parse_lot_names(lots)
+	if not seeds:
+		frappe.throw(_("At least one Lot is required"), frappe.ValidationError)
+	if len(seeds) > MAX_IMPACT_SEED_LOTS:
+		frappe.throw(
+			_("Impact queries are limited to {0} lots per request").format(MAX_IMPACT_SEED_LOTS),
+			frappe.ValidationError,
+		)
+
+	seed_sites = {
+		row.get("name"): row.get("site")
+		for row in frappe.get_all(
+			"Lot", filters={"name": ["in", seeds]}, fields=["name", "site"], limit_page_length=0
+		)
+	}
+	missing = [seed for seed in seeds if seed not in seed_sites]
+	if missing:
+		frappe.throw(_("Lot {0} not found").format(", ".join(missing)), frappe.DoesNotExistError)
+	for site in sorted(set(seed_sites.values())):
+		assert_site_access(site)
+
+	return seeds
+
+
+@frappe.whitelist()
+def get_lot_genealogy(
+	lot: str,
+	direction: str = "both",
+	max_depth: int = DEFAULT_GENEALOGY_DEPTH,
+	site: str | None = None,
+) -> dict[str, Any]:
+	"""Return the multi-hop Split/Merge/Blend genealogy of a Lot.
+
+	`direction` is forward (where the lot went), backward (what it came from) or
+	both. Transfers are followed only at `site` when given, otherwise at every
+	Site the caller can access.
+	"""
+	lot_name = (lot or "").strip()
+	if not lot_name:
+		frappe.throw(_("Lot is required"), frappe.ValidationError)
+
+	direction = (direction or "both").strip().lower()
+	if direction not in GENEALOGY_DIRECTIONS:
+		frappe.throw(_("Direction must be forward, backward or both"), frappe.ValidationError)
+
+	lot_site = frappe.db.get_value("Lot", lot_name, "site")
+	if not lot_site:
+		frappe.throw(_("Lot {0} not found").format(lot_name), frappe.DoesNotExistError)
+	assert_site_access(lot_site)
+
+	try:
+		depth = int(max_depth)
+	except (TypeError, ValueError):
+		depth = DEFAULT_GENEALOGY_DEPTH
+
+	trace = trace_lot_genealogy(lot_name, direction, depth, sites=_resolve_trace_sites(lot_site, site))
+	return {"status": "ok", **trace}
+
+
+@frappe.whitelist()
+def get_lot_lineage(lot: str, direction: str = "downstream", max_depth: int | None = None) -> dict[str, Any]:
+	"""Return every upstream or downstream Lot of a Lot from the genealogy closure table.
+
+	Each row carries the hop distance and `qty_fraction`, the share of the
+	descendant's quantity that came from the ancestor.
+	"""
+	lot_name = (lot or "").strip()
+	if not lot_name:
+		frappe.throw(_("Lot is required"), frappe.ValidationError)
+
+	direction = (direction or "downstream").strip().lower()
+	if direction not in LINEAGE_DIRECTIONS:
+		frappe.throw(_("Direction must be upstream or downstream"), frappe.ValidationError)
+
+	lot_site = frappe.db.get_value("Lot", lot_name, "site")
+	if not lot_site:
+		frappe.throw(_("Lot {0} not found").format(lot_name), frappe.DoesNotExistError)
+	assert_site_access(lot_site)
+
+	depth = None if max_depth in (None, "") else int(max_depth)
+	lookup = get_lot_ancestors if direction == "upstream" else get_lot_descendants
+	rows = lookup(lot_name, max_depth=depth, sites=_visible_sites())
+	key = "ancestor" if direction == "upstream" else "descendant"
+	return {
+		"status": "ok",
+		"lot": lot_name,
+		"direction": direction,
+		"lots": [
+			{
+				"lot": row.get(key),
+				"depth": int(row.get("depth") or 0),
+				"site": row.get("site"),
+				"qty_fraction": float(row.get("qty_fraction") or 0),
+			}
+			for row in rows
+		],
+	}
+
+
+@frappe.whitelist()
+def get_downstream_lots(lots: Any) -> dict[str, Any]:
+	"""Bulk downstream lookup for recall impact: every Lot fed by any of the given Lots.
+
+	`affected` merges the seeds' descendants, keeping the shortest distance and the
+	largest share any single seed contributed.
+	"""
+	seeds = _resolve_seed_lots(lots)
+	by_seed = get_descendants_of_lots(seeds, sites=_visible_sites())
+	affected: dict[str, dict[str, Any]] = {}
+	for seed, rows in by_seed.items():
+		for row in rows:
+			name = row.get("descendant")
+			entry = affected.setdefault(
+				name,
+				{"lot": name, "site": row.get("site"), "depth": None, "qty_fraction": 0.0, "sources": []},
+			)
+			depth = int(row.get("depth") or 0)
+			entry["depth"] = depth if entry["depth"] is None else min(entry["depth"], depth)
+			entry["qty_fraction"] = max(entry["qty_fraction"], float(row.get("qty_fraction") or 0))
+			entry["sources"].append(seed)
+
+	return {
+		"status": "ok",
+		"lots": seeds,
+		"affected": sorted(affected.values(), key=lambda entry: (entry["depth"], entry["lot"])),
+	}
+
+
+@frappe.whitelist()
+def simulate_recall_impact(
+	lots: Any, from_datetime: str | None = None, to_datetime: str | None = None
+) -> dict[str, Any]:
+	"""Simulate a recall of the given Lots and return the ranked impact report.
+
+	`from_datetime`/`to_datetime` bound the Transfers out of the seed Lots that
+	are considered contaminated; leave both empty to follow every Transfer.
+	"""
+	seeds = _resolve_seed_lots(lots)
+	start = utils.get_datetime(from_datetime) if from_datetime else None
+	end = utils.get_datetime(to_datetime) if to_datetime else None
+	if start and end and start > end:
+		frappe.throw(_("From datetime must be before To datetime"), frappe.ValidationError)
+
+	return {"status": "ok", **simulate_recall(seeds, start, end, sites=_visible_sites())}
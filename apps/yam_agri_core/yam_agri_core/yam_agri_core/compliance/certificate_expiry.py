@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+from datetime import date, timedelta
+from typing import Any
+
+import frappe
+from frappe import _, utils
+
+from yam_agri_core.yam_agri_core.compliance.dispatch_gate import _today
+from yam_agri_core.yam_agri_core.compliance.lot_status import refresh_lots_compliance
+
+CERTIFICATE_EXPIRY_WATERMARK_KEY = "yam_agri_certificate_expiry_watermark"
+DEFAULT_EXPIRY_WARNING_DAYS = 30
+DIGEST_RECIPIENT_ROLE = "QA Manager"
+CERTIFICATE_FIELDS = ["name", "cert_type", "lot", "site", "expiry_date"]
+
+
+def _warning_days() -> int:
+	return int(frappe.conf.get("certificate_expiry_warning_days") or DEFAULT_EXPIRY_WARNING_DAYS)
+
+
+def _load_watermark() -> dict[str, Any]:
+	raw = frappe.db.get_default(CERTIFICATE_EXPIRY_WATERMARK_KEY)
+	try:
+		watermark = json.loads(raw) if raw else {}
+	except ValueError:
+		watermark = {}
+	return watermark if isinstance(watermark, dict) else {}
+
+
+def _save_watermark(horizon: date, scanned_at: Any) -> None:
+	frappe.db.set_default(
+		CERTIFICATE_EXPIRY_WATERMARK_KEY,
+		json.dumps({"horizon": str(horizon), "scanned_at": str(scanned_at)}),
+	)
+
+
+def find_newly_expiring_certificates(
+	today: date, horizon: date, watermark: dict[str, Any]
+) -> list[dict[str, Any]]:
+	"""Certificates that entered the [today, horizon] expiry window since the last sweep.
+
+	Uses an `expiry_date` range scan above the previous horizon, plus certificates
+	created or edited since the previous sweep whose expiry falls inside the window
+	already covered. The first sweep starts at `today`.
+	"""
+	previous_horizon = utils.getdate(watermark["horizon"]) if watermark.get("horizon") else None
+	lower = previous_horizon if previous_horizon else today - timedelta(days=1)
+
+	rows = frappe.get_all(
+		"Certificate",
+		filters=[["expiry_date", ">", lower], ["expiry_date", "<=", horizon]],
+		fields=CERTIFICATE_FIELDS,
+		order_by="expiry_date asc",
+		limit_page_length=0,
+	)
+
+	if previous_horizon and watermark.get("scanned_at") and lower >= today:
+		rows.extend(
+			frappe.get_all(
+				"Certificate",
+				filters=[
+					["modified", ">", watermark["scanned_at"]],
+					["expiry_date", ">=", today],
+					["expiry_date", "<=", lower],
+				],
+				fields=CERTIFICATE_FIELDS,
+				order_by="expiry_date asc",
+				limit_page_length=0,
+			)
+		)
+
+	unique = {row.get("name"): row for row in rows}
+	return sorted(unique.values(), key=lambda row: (utils.getdate(row.get("expiry_date")), row.get("name")))
+
+
+def _digest_recipients(site: str) -> list[str]:
+	site_users = set(
+		frappe.get_all("User Permission", filters={"allow": "Site", "for_value": site}, pluck="user")
+	)
+	role_users = set(
+		frappe.get_all(
+			"Has Role",
+			filters={"role": DIGEST_RECIPIENT_ROLE, "parenttype": "User"},
+			pluck="parent",
+		)
+	)
+	return sorted(site_users & role_users)
+
+
+def _send_site_digest(site: str, certificates: list[dict[str, Any]], horizon: date) -> None:
+	payload = {
+		"site": site,
+		"horizon": str(horizon),
+		"certificates": [
+			{
+				"name": row.get("name"),
+				"cert_type": row.get("cert_type"),
+				"lot": row.get("lot"),
+				"expiry_date": str(row.get("expiry_date")),
+			}
+			for row in certificates
+		],
+	}
+	frappe.publish_realtime("yam_agri_certificate_expiry_digest", payload)
+
+	recipients = _digest_recipients(site)
+	if not recipients:
+		return
+
+	from frappe.desk.doctype.notification_log.notification_log import enqueue_create_notification
+
+	lines = "".join(
+		f"<li>{frappe.utils.escape_html(str(row.get('name')))} "
+		f"({frappe.utils.escape_html(str(row.get('cert_type') or ''))}, "
+		f"{_('Lot')} {frappe.utils.escape_html(str(row.get('lot') or '-'))}): {row.get('expiry_date')}</li>"
+		for row in certificates
+	)
+	enqueue_create_notification(
+		recipients,
+		{
+			"type": "Alert",
+			"document_type": "Site",
+			"document_name": site,
+			"subject": _("{0} certificate(s) at {1} expire by {2}").format(len(certificates), site, horizon),
+			"email_content": f"<ul>{lines}</ul>",
+		},
+	)
+
+
+def sweep_certificate_expiry(days: int | None = None) -> dict[str, Any]:
+	"""Daily job: flag certificates crossing expiry within `days` and notify each Site once.
+
+	Affected Lots have their stored compliance state refreshed. A watermark (last
+	horizon and sweep time) is kept in Default Values so each run only reads
+	certificates that are new to the window.
+	"""
+	today = _today()
+	horizon = today + timedelta(days=int(days or _warning_days()))
+	scanned_at = utils.now_datetime()
+	certificates = find_newly_expiring_certificates(today, horizon, _load_watermark())
+
+	by_site: dict[str, list[dict[str, Any]]] = {}
+	for row in certificates:
+		by_site.setdefault(str(row.get("site") or ""), []).append(row)
+	for site, rows in sorted(by_site.items()):
+		if site:
+			_send_site_digest(site, rows, horizon)
+
+	lot_names = sorted({str(row.get("lot")) for row in certificates if row.get("lot")})
+	refresh_lots_compliance(lot_names)
+	_save_watermark(horizon, scanned_at)
+
+	return {
+		"horizon": str(horizon),
+		"certificate_count": len(certificates),
+		"site_count": len([site for site in by_site if site]),
+		"lot_count": len(lot_names),
+	}
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any
+
+import frappe
+from frappe import _, utils
+
+DISPATCH_STATUSES = {"for dispatch", "ready for dispatch", "dispatch"}
+EVIDENCE_CHUNK_SIZE = 5000
+
+
+def is_dispatch_status(status: str | None) -> bool:
+	return (status or "").strip().lower() in DISPATCH_STATUSES
+
+
+def _parse_csv_values(raw: str | None) -> list[str]:
+	text = (raw or "").replace("\n", ",")
+	parts = [p.strip() for p in text.split(",")]
+	return [p for p in parts if p]
+
+
+def _today() -> date:
+	return utils.getdate(utils.nowdate())
+
+
+def get_lot_evidence(lot_name: str | None) -> dict[str, list[dict[str, Any]]]:
+	"""Fetch every QC test and certificate linked to a Lot, one query per DocType.
+
+	Rows are returned for all sites; callers filter by site in memory so the same
+	fetch serves both the site-scoped policy gate and the lot-wide expiry check.
+	"""
+	if not lot_name:
+		return {"qc_tests": [], "certificates": []}
+
+	qc_tests = frappe.get_all(
+		"QCTest",
+		filters={"lot": lot_name},
+		fields=["name", "site", "test_type", "pass_fail", "test_date"],
+		order_by="test_date desc",
+		limit_page_length=0,
+	)
+	certificates = frappe.get_all(
+		"Certificate",
+		filters={"lot": lot_name},
+		fields=["name", "site", "cert_type", "expiry_date", "modified"],
+		order_by="modified desc",
+		limit_page_length=0,
+	)
+	return {"qc_tests": list(qc_tests or []), "certificates": list(certificates or [])}
+
+
+def get_lots_evidence(lot_names: list[str]) -> dict[str, dict[str, list[dict[str, Any]]]]:
+	"""Set-wise `get_lot_evidence` for many Lots, keyed by Lot name.
+
+	Only passing QC tests are loaded since failed tests never satisfy the gate.
+	Lots are queried in chunks of EVIDENCE_CHUNK_SIZE, so 10k Lots cost four queries.
+	"""
+	evidence: dict[str, dict[str, list[dict[str, Any]]]] = {
+		lot_name: {"qc_tests": [], "certificates": []} for lot_name in lot_names if lot_name
+	}
+	names = list(evidence)
+	for start in range(0, len(names), EVIDENCE_CHUNK_SIZE):
+		chunk = names[start : start + EVIDENCE_CHUNK_SIZE]
+		for row in frappe.get_all(
+			"QCTest",
+			filters={"lot": ["in", chunk], "pass_fail": "Pass"},
+			fields=["name", "lot", "site", "test_type", "pass_fail", "test_date"],
+			order_by="test_date desc",
+			limit_page_length=0,
+		):
+			evidence[row.get("lot")]["qc_tests"].append(row)
+		for row in frappe.get_all(
+			"Certificate",
+			filters={"lot": ["in", chunk]},
+			fields=["name", "lot", "site", "cert_type", "expiry_date", "modified"],
+			order_by="modified desc",
+			limit_page_length=0,
+		):
+			evidence[row.get("lot")]["certificates"].append(row)
+	return evidence
+
+
+def find_expired_certificates(
+	certificates: list[dict[str, Any]], site: str | None = None, today: date | None = None
+) -> list[dict[str, Any]]:
+	"""Certificates past their expiry date, oldest expiry first; optionally scoped to a site."""
+	today = today or _today()
+	expired = [
+		row
+		for row in certificates
+		if row.get("expiry_date")
+		and utils.getdate(row.get("expiry_date")) < today
+		and (site is None or row.get("site") == site)
+	]
+	return sorted(expired, key=lambda row: utils.getdate(row.get("expiry_date")))
+
+
+def evaluate_dispatch_requirements(
+	policy: dict[str, Any] | None,
+	evidence: dict[str, list[dict[str, Any]]],
+	site: str | None,
+	today: date | None = None,
+) -> dict[str, Any]:
+	"""Evaluate a Season Policy's mandatory tests and certificates against Lot evidence.
+
+	Uses the pre-parsed `required_tests`/`required_certificates` of a cached policy
+	when present, otherwise parses the raw mandatory lists.
+
+	A required test is satisfied by the most recent passing QC test of that type at
+	the site, if it is no older than `max_test_age_days`. A required certificate is
+	satisfied by the most recently modified certificate of that type at the site,
+	unless it has expired. `next_expiry` is the first date on which a currently
+	satisfied requirement stops being satisfied.
+	"""
+	today = today or _today()
+	policy = policy or {}
+	max_age_days = int(policy.get("max_test_age_days") or 7)
+	required_tests = policy.get("required_tests")
+	if required_tests is None:
+		required_tests = _parse_csv_values(policy.get("mandatory_test_types"))
+	required_certs = policy.get("required_certificates")
+	if required_certs is None:
+		required_certs = _parse_csv_values(policy.get("mandatory_certificate_types"))
+
+	latest_pass_by_type: dict[str, dict[str, Any]] = {}
+	for row in evidence.get("qc_tests") or []:
+		if row.get("site") != site or row.get("pass_fail") != "Pass":
+			continue
+		test_type = row.get("test_type")
+		current = latest_pass_by_type.get(test_type)
+		if current is None or _sort_date(row.get("test_date")) > _sort_date(current.get("test_date")):
+			latest_pass_by_type[test_type] = row
+
+	missing_tests: set[str] = set()
+	expiries: list[date] = []
+	for test_type in required_tests:
+		record = latest_pass_by_type.get(test_type)
+		test_date = record.get("test_date") if record else None
+		if not test_date or (today - utils.getdate(test_date)).days > max_age_days:
+			missing_tests.add(test_type)
+			continue
+		expiries.append(utils.getdate(test_date) + timedelta(days=max_age_days + 1))
+
+	latest_cert_by_type: dict[str, dict[str, Any]] = {}
+	for row in evidence.get("certificates") or []:
+		if row.get("site") != site:
+			continue
+		# Rows arrive newest-modified first, so the first row per type wins.
+		latest_cert_by_type.setdefault(row.get("cert_type"), row)
+
+	missing_certs: set[str] = set()
+	for cert_type in required_certs:
+		record = latest_cert_by_type.get(cert_type)
+		if not record:
+			missing_certs.add(cert_type)
+			continue
+		expiry = record.get("expiry_date")
+		if expiry and utils.getdate(expiry) < today:
+			missing_certs.add(cert_type)
+		elif expiry:
+			expiries.append(utils.getdate(expiry) + timedelta(days=1))
+
+	return {
+		"max_test_age_days": max_age_days,
+		"missing_or_stale_tests": sorted(missing_tests),
+		"missing_or_expired_certificates": sorted(missing_certs),
+		"next_expiry": min(expiries) if expiries else None,
+	}
+
+
+def _sort_date(value: Any) -> date:
+	return utils.getdate(value) if value else date.min
+
+
+def get_dispatch_blockers(
+	site: str | None,
+	policy: dict[str, Any] | None,
+	evidence: dict[str, list[dict[str, Any]]],
+	today: date | None = None,
+) -> list[dict[str, Any]]:
+	"""All reasons a Lot would fail the dispatch gate, in the order the gate checks them.
+
+	Messages match `check_certificates_for_dispatch` and
+	`_validate_season_policy_for_dispatch`; an empty list means dispatch is allowed.
+	"""
+	today = today or _today()
+	blockers: list[dict[str, Any]] = []
+
+	for row in find_expired_certificates(evidence.get("certificates") or [], today=today):
+		blockers.append(
+			{
+				"code": "expired_certificate",
+				"items": [row.get("name")],
+				"message": _("Cannot dispatch: Certificate {0} is expired").format(row.get("name")),
+			}
+		)
+
+	if not policy:
+		blockers.append(
+			{
+				"code": "no_active_policy",
+				"items": [],
+				"message": _("Cannot dispatch: no active Season Policy found for this Site/Crop"),
+			}
+		)
+		return blockers
+
+	if not int(policy.get("enforce_dispatch_gate") or 0):
+		return blockers
+
+	result = evaluate_dispatch_requirements(policy, evidence, site, today)
+	if result["missing_or_stale_tests"]:
+		blockers.append(
+			{
+				"code": "missing_or_stale_tests",
+				"items": result["missing_or_stale_tests"],
+				"message": _("Cannot dispatch: missing or stale required QC tests: {0}").format(
+					", ".join(result["missing_or_stale_tests"])
+				),
+			}
+		)
+	if result["missing_or_expired_certificates"]:
+		blockers.append(
+			{
+				"code": "missing_or_expired_certificates",
+				"items": result["missing_or_expired_certificates"],
+				"message": _("Cannot dispatch: missing or expired required certificates: {0}").format(
+					", ".join(result["missing_or_expired_certificates"])
+				),
+			}
+		)
+	return blockers
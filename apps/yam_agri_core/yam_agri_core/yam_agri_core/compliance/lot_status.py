@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any
+
+import frappe
+from frappe import utils
+
+from yam_agri_core.yam_agri_core.compliance.dispatch_gate import (
+	EVIDENCE_CHUNK_SIZE,
+	_today,
+	evaluate_dispatch_requirements,
+	find_expired_certificates,
+	get_lot_evidence,
+	get_lots_evidence,
+)
+from yam_agri_core.yam_agri_core.doctype.season_policy.season_policy import get_active_season_policy
+
+LOT_COMPLIANCE_FIELDS = (
+	"dispatch_ready",
+	"missing_required_tests",
+	"missing_required_certificates",
+	"open_nonconformance_count",
+	"compliance_next_expiry",
+	"compliance_updated_at",
+)
+
+
+def count_open_nonconformance(lot_name: str | None) -> int:
+	if not lot_name:
+		return 0
+	return int(frappe.db.count("Nonconformance", {"lot": lot_name, "status": ["!=", "Closed"]}) or 0)
+
+
+def compute_lot_compliance(
+	site: str | None,
+	policy: dict[str, Any] | None,
+	evidence: dict[str, list[dict[str, Any]]],
+	open_nonconformance_count: int = 0,
+	today: date | None = None,
+) -> dict[str, Any]:
+	"""Persisted compliance state for a Lot, mirroring the dispatch gate.
+
+	A Lot is dispatch-ready when an active Season Policy exists, no certificate on
+	the Lot has expired and, if the policy enforces the gate, every mandatory test
+	and certificate is satisfied.
+	"""
+	today = today or _today()
+	requirements = evaluate_dispatch_requirements(policy, evidence, site, today)
+	missing_tests = requirements["missing_or_stale_tests"]
+	missing_certs = requirements["missing_or_expired_certificates"]
+	certificates = evidence.get("certificates") or []
+
+	dispatch_ready = bool(policy) and not find_expired_certificates(certificates, today=today)
+	if dispatch_ready and int(policy.get("enforce_dispatch_gate") or 0):
+		dispatch_ready = not missing_tests and not missing_certs
+
+	expiries = [
+		utils.getdate(row.get("expiry_date")) + timedelta(days=1)
+		for row in certificates
+		if row.get("expiry_date") and utils.getdate(row.get("expiry_date")) >= today
+	]
+	if requirements["next_expiry"]:
+		expiries.append(requirements["next_expiry"])
+
+	return {
+		"dispatch_ready": 1 if dispatch_ready else 0,
+		"missing_required_tests": ", ".join(missing_tests),
+		"missing_required_certificates": ", ".join(missing_certs),
+		"open_nonconformance_count": int(open_nonconformance_count or 0),
+		"compliance_next_expiry": min(expiries) if expiries else None,
+		"compliance_updated_at": utils.now_datetime(),
+	}
+
+
+def refresh_lot_compliance(lot_name: str | None) -> dict[str, Any] | None:
+	"""Recompute and store the compliance state of one Lot without touching `modified`."""
+	if not lot_name:
+		return None
+
+	lot = frappe.db.get_value("Lot", lot_name, ["name", "site", "crop"], as_dict=True)
+	if not lot:
+		return None
+
+	values = compute_lot_compliance(
+		lot.get("site"),
+		get_active_season_policy(lot.get("site"), lot.get("crop")),
+		get_lot_evidence(lot_name),
+		count_open_nonconformance(lot_name),
+	)
+	frappe.db.set_value("Lot", lot_name, values, update_modified=False)
+	return values
+
+
+def on_lot_evidence_change(doc, method=None) -> None:
+	"""doc_events hook for QCTest, Certificate and Nonconformance.
+
+	Refreshes the linked Lot, and the previously linked Lot when the link changed.
+	"""
+	lots = {doc.get("lot")}
+	if method == "on_update":
+		previous = doc.get_doc_before_save()
+		if previous:
+			lots.add(previous.get("lot"))
+
+	for lot_name in sorted(lot for lot in lots if lot):
+		refresh_lot_compliance(lot_name)
+
+
+def on_season_policy_change(doc, method=None) -> None:
+	"""doc_events hook for Season Policy: refresh every Lot at the affected Site(s) in the background."""
+	sites = {doc.get("site")}
+	if method == "on_update":
+		previous = doc.get_doc_before_save()
+		if previous:
+			sites.add(previous.get("site"))
+
+	for site in sorted(site for site in sites if site):
+		frappe.enqueue(
+			"yam_agri_core.yam_agri_core.compliance.lot_status.refresh_site_lot_compliance",
+			queue="long",
+			site_name=site,
+			enqueue_after_commit=True,
+		)
+
+
+def refresh_lots_compliance(lot_names: list[str]) -> int:
+	"""Bulk `refresh_lot_compliance`: evidence and open NCs are fetched set-wise."""
+	if not lot_names:
+		return 0
+
+	lots = frappe.get_all(
+		"Lot",
+		filters={"name": ["in", lot_names]},
+		fields=["name", "site", "crop"],
+		limit_page_length=0,
+	)
+	if not lots:
+		return 0
+
+	names = [str(lot.get("name")) for lot in lots]
+	evidence_by_lot = get_lots_evidence(names)
+	open_nc: dict[str, int] = {}
+	for start in range(0, len(names), EVIDENCE_CHUNK_SIZE):
+		for row in frappe.get_all(
+			"Nonconformance",
+			filters={"lot": ["in", names[start : start + EVIDENCE_CHUNK_SIZE]], "status": ["!=", "Closed"]},
+			fields=["lot"],
+			limit_page_length=0,
+		):
+			open_nc[row.get("lot")] = open_nc.get(row.get("lot"), 0) + 1
+
+	today = _today()
+	for lot in lots:
+		values = compute_lot_compliance(
+			lot.get("site"),
+			get_active_season_policy(lot.get("site"), lot.get("crop")),
+			evidence_by_lot[lot.get("name")],
+			open_nc.get(lot.get("name"), 0),
+			today,
+		)
+		frappe.db.set_value("Lot", lot.get("name"), values, update_modified=False)
+	return len(lots)
+
+
+def refresh_site_lot_compliance(site_name: str) -> int:
+	return refresh_lots_compliance(frappe.get_all("Lot", filters={"site": site_name}, pluck="name"))
+
+
+def refresh_expiring_lot_compliance() -> int:
+	"""Daily job: refresh Lots whose QC tests went stale or certificates expired since the last update."""
+	lot_names = frappe.get_all(
+		"Lot",
+		filters={"compliance_next_expiry": ["<=", utils.nowdate()]},
+		pluck="name",
+	)
+	return refresh_lots_compliance(lot_names)
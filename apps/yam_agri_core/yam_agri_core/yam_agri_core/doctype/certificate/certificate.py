@@ -17,3 +17,8 @@ class Certificate(Document):
 		if not expiry:
 			return False
 		return utils.getdate(expiry) < utils.getdate(utils.nowdate())
+
+
+def on_doctype_update():
+	# Keyset paging of EvidencePack scope by (date, name) within a Site.
+	frappe.db.add_index("Certificate", ["site", "expiry_date", "name"])
@@ -1,9 +1,15 @@
+from __future__ import annotations
+
+from typing import Any
+
 import frappe
 from frappe import _
 from frappe.model.document import Document
 
 from yam_agri_core.yam_agri_core.site_permissions import assert_site_access
 
+DEVICE_REGISTRY_CACHE_KEY = "yam_agri_core:device_registry"
+
 
 class Device(Document):
 	def validate(self):
@@ -12,3 +18,102 @@ class Device(Document):
 			frappe.throw(_("Every record must belong to a Site"), frappe.ValidationError)
 
 		assert_site_access(self.get("site"))
+
+	def on_update(self):
+		clear_device_registry_cache()
+
+	def on_trash(self):
+		clear_device_registry_cache()
+
+	def after_rename(self, old_name, new_name, merge=False):
+		clear_device_registry_cache()
+
+
+def _label_key(site: str, label: str) -> str:
+	return f"{site}\x1f{label}"
+
+
+def _load_device_registry() -> dict[str, Any]:
+	"""Build the Device registry from the database.
+
+	Rows are ordered newest first so the per-site Active fallback matches the
+	previous `frappe.db.get_value` default ordering.
+	"""
+	rows = frappe.get_all(
+		"Device",
+		fields=["name", "device_name", "site", "status"],
+		order_by="modified desc",
+		limit_page_length=0,
+	)
+
+	devices: dict[str, dict[str, Any]] = {}
+	by_label: dict[str, str] = {}
+	active_by_site: dict[str, str] = {}
+	for row in rows:
+		name = str(row.get("name") or "")
+		if not name:
+			continue
+		site = str(row.get("site") or "")
+		label = str(row.get("device_name") or "").strip()
+		status = str(row.get("status") or "")
+		devices[name] = {"name": name, "device_name": label, "site": site, "status": status}
+		if label:
+			by_label.setdefault(_label_key(site, label), name)
+		if status == "Active":
+			active_by_site.setdefault(site, name)
+
+	return {"devices": devices, "by_label": by_label, "active_by_site": active_by_site}
+
+
+def get_device_registry() -> dict[str, Any]:
+	"""Return the cached Device registry (name, label, site, status).
+
+	The registry is cached in Redis and per-request in `frappe.local`, and is
+	dropped whenever a Device is saved, renamed or deleted.
+	"""
+	return frappe.cache.get_value(DEVICE_REGISTRY_CACHE_KEY, generator=_load_device_registry) or {}
+
+
+def clear_device_registry_cache(doc=None, method=None) -> None:
+	frappe.cache.delete_value(DEVICE_REGISTRY_CACHE_KEY)
+
+
+def get_cached_device(device: str | None) -> dict[str, Any] | None:
+	device = (device or "").strip()
+	if not device:
+		return None
+	return (get_device_registry().get("devices") or {}).get(device)
+
+
+def get_device_site(device: str | None) -> str | None:
+	record = get_cached_device(device)
+	if not record:
+		return None
+	return record.get("site") or None
+
+
+def resolve_device_for_site(site: str, device_ref: str | None, fallback_to_active: bool = True) -> str | None:
+	"""Resolve a Device name or label to a Device owned by `site`.
+
+	Lookup order: exact name, then device label, then (optionally) the most
+	recently modified Active device at the site.
+	"""
+	registry = get_device_registry()
+	devices = registry.get("devices") or {}
+
+	device_ref = (device_ref or "").strip()
+	if device_ref:
+		record = devices.get(device_ref)
+		if record and record.get("site") == site:
+			return str(record.get("name"))
+		by_label = (registry.get("by_label") or {}).get(_label_key(site, device_ref))
+		if by_label:
+			return str(by_label)
+
+	if not fallback_to_active:
+		return None
+
+	fallback = (registry.get("active_by_site") or {}).get(site)
+	if fallback:
+		return str(fallback)
+	return None
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+import frappe
+from frappe.model.document import Document
+
+
+class EvidenceBlob(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Evidence Blob", ["ref_count", "last_referenced"])
@@ -78,10 +78,10 @@ function yamOpenFileIfAvailable(fileUrl, label) {
 	window.open(fileUrl, "_blank");
 }
 
-function yamGenerateEvidencePack(frm) {
+function yamGenerateEvidencePack(frm, rebuild = 1) {
 	frappe.call({
 		method: "yam_agri_core.yam_agri_core.api.evidence_pack.generate_evidence_pack_links",
-		args: { evidence_pack: frm.doc.name, rebuild: 1, include_quarantine: 1 },
+		args: { evidence_pack: frm.doc.name, rebuild, include_quarantine: 1 },
 		freeze: true,
 		freeze_message: __("Building EvidencePack links..."),
 		callback(r) {
@@ -101,6 +101,7 @@ function yamGenerateEvidencePack(frm) {
 				message:
 					`<div><strong>${__("Status")}</strong>: ${frappe.utils.escape_html(msg.status || "")}</div>` +
 					`<div><strong>${__("Linked Records")}</strong>: ${msg.record_count || 0}</div>` +
+					`<div>${__("Added")}: ${msg.inserted || 0} | ${__("Updated")}: ${msg.updated || 0} | ${__("Removed")}: ${msg.deleted || 0}</div>` +
 					`<div style="margin-top:8px;">${__("QCTest")}: ${counts.QCTest || 0}</div>` +
 					`<div>${__("Certificate")}: ${counts.Certificate || 0}</div>` +
 					`<div>${__("ScaleTicket")}: ${counts.ScaleTicket || 0}</div>` +
@@ -113,52 +114,77 @@ function yamGenerateEvidencePack(frm) {
 	});
 }
 
-function yamExportEvidencePdf(frm) {
-	frappe.call({
-		method: "yam_agri_core.yam_agri_core.api.evidence_pack.export_evidence_pack_pdf",
-		args: { evidence_pack: frm.doc.name },
-		freeze: true,
-		freeze_message: __("Rendering EvidencePack PDF..."),
-		callback(r) {
-			const msg = (r && r.message) || {};
-			if (!msg.ok) {
-				frappe.msgprint({
-					title: __("EvidencePack PDF"),
-					message: __("PDF export failed."),
-					indicator: "red",
-				});
-				return;
-			}
+const YAM_EP_EXPORT_EVENT = "yam_agri_evidence_export_progress";
 
-			yamOpenFileIfAvailable(msg.pdf_file, __("EvidencePack PDF"));
+function yamWatchEvidenceExport(frm, exportFormat, label, layout = "") {
+	const handler = (data) => {
+		if (
+			!data ||
+			data.evidence_pack !== frm.doc.name ||
+			data.export_format !== exportFormat ||
+			(data.layout || "") !== layout
+		) {
+			return;
+		}
+
+		if (data.state === "running") {
+			frappe.show_progress(label, data.done || 0, data.total || 1, __("Exporting..."));
+			return;
+		}
+
+		frappe.realtime.off(YAM_EP_EXPORT_EVENT, handler);
+		frappe.hide_progress();
+		if (data.state === "done") {
+			yamOpenFileIfAvailable(data.file_url, label);
 			frm.reload_doc();
-		},
-	});
+			return;
+		}
+		frappe.msgprint({
+			title: label,
+			message: __("Export failed. See the Error Log for details."),
+			indicator: "red",
+		});
+	};
+	frappe.realtime.on(YAM_EP_EXPORT_EVENT, handler);
 }
 
-function yamExportEvidenceZip(frm) {
+function yamExportEvidencePack(frm, exportFormat, label, extraArgs = {}) {
 	frappe.call({
-		method: "yam_agri_core.yam_agri_core.api.evidence_pack.export_evidence_pack_zip",
-		args: { evidence_pack: frm.doc.name },
-		freeze: true,
-		freeze_message: __("Building EvidencePack ZIP..."),
+		method: "yam_agri_core.yam_agri_core.api.evidence_pack.enqueue_evidence_pack_export",
+		args: { evidence_pack: frm.doc.name, export_format: exportFormat, ...extraArgs },
 		callback(r) {
 			const msg = (r && r.message) || {};
 			if (!msg.ok) {
 				frappe.msgprint({
-					title: __("EvidencePack ZIP"),
-					message: __("ZIP export failed."),
+					title: label,
+					message: __("Export could not be started."),
 					indicator: "red",
 				});
 				return;
 			}
 
-			yamOpenFileIfAvailable(msg.zip_file, __("EvidencePack ZIP"));
-			frm.reload_doc();
+			if (msg.cached) {
+				yamOpenFileIfAvailable(msg.file_url, label);
+				return;
+			}
+
+			yamWatchEvidenceExport(frm, exportFormat, label, msg.layout || "");
+			frappe.show_alert({
+				message: __("{0} export queued. It will open when ready.", [label]),
+				indicator: "blue",
+			});
 		},
 	});
 }
 
+function yamExportEvidencePdf(frm) {
+	yamExportEvidencePack(frm, "pdf", __("EvidencePack PDF"));
+}
+
+function yamExportEvidenceZip(frm, layout = "bundle") {
+	yamExportEvidencePack(frm, "zip", __("EvidencePack ZIP"), { layout });
+}
+
 function yamMarkEvidencePackSent(frm) {
 	frappe.confirm(
 		__("Mark this EvidencePack as Sent?"),
@@ -202,6 +228,16 @@ frappe.ui.form.on("EvidencePack", {
 			__("Evidence")
 		);
 
+		if (frm.doc.generated_at) {
+			frm.add_custom_button(
+				__("Refresh Linked Evidence"),
+				() => {
+					yamGenerateEvidencePack(frm, 0);
+				},
+				__("Evidence")
+			);
+		}
+
 		frm.add_custom_button(
 			__("Export PDF"),
 			() => {
@@ -218,6 +254,14 @@ frappe.ui.form.on("EvidencePack", {
 			__("Evidence")
 		);
 
+		frm.add_custom_button(
+			__("Export ZIP (Linked Files)"),
+			() => {
+				yamExportEvidenceZip(frm, "referenced");
+			},
+			__("Evidence")
+		);
+
 		if (["Ready", "Prepared"].includes(frm.doc.status)) {
 			frm.add_custom_button(
 				__("Mark Sent"),
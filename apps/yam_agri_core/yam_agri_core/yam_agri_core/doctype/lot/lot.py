@@ -1,88 +1,47 @@
 import frappe
-from frappe import _, utils
+from frappe import _
 from frappe.model.document import Document
 
+from yam_agri_core.yam_agri_core.compliance.dispatch_gate import (
+	evaluate_dispatch_requirements,
+	find_expired_certificates,
+	get_lot_evidence,
+	is_dispatch_status,
+)
+from yam_agri_core.yam_agri_core.compliance.lot_status import (
+	compute_lot_compliance,
+	count_open_nonconformance,
+)
+from yam_agri_core.yam_agri_core.doctype.season_policy.season_policy import get_active_season_policy
 from yam_agri_core.yam_agri_core.site_permissions import assert_site_access
 
-DISPATCH_STATUSES = {"for dispatch", "ready for dispatch", "dispatch"}
 
-
-def check_certificates_for_dispatch(lot_name, status):
+def check_certificates_for_dispatch(lot_name, status, evidence=None):
 	"""Helper used by tests and controllers: ensure no expired Certificate blocks dispatch.
 
+	`evidence` is the result of `get_lot_evidence`; it is fetched when not given.
+
 	Raises: frappe.ValidationError when an expired certificate exists for the lot and
 	the lot is being moved to a dispatch-like status.
 	"""
-	if not status:
+	if not is_dispatch_status(status):
 		return
 
-	if status.lower() not in DISPATCH_STATUSES:
-		return
+	if evidence is None:
+		evidence = get_lot_evidence(lot_name)
 
-	certs = frappe.get_all("Certificate", filters={"lot": lot_name}, fields=["name", "expiry_date"])
-	for c in certs:
-		expiry = c.get("expiry_date")
-		if expiry:
-			if utils.getdate(expiry) < utils.getdate(utils.nowdate()):
-				frappe.throw(
-					_("Cannot dispatch: Certificate {0} is expired").format(c.get("name")),
-					frappe.ValidationError,
-				)
-
-
-def _parse_csv_values(raw: str | None) -> list[str]:
-	text = (raw or "").replace("\n", ",")
-	parts = [p.strip() for p in text.split(",")]
-	return [p for p in parts if p]
-
-
-def _get_active_season_policy(site: str, crop: str | None) -> dict | None:
-	filters = {"site": site, "active": 1}
-	if crop:
-		filters["crop"] = crop
-
-	policies = frappe.get_all(
-		"Season Policy",
-		filters=filters,
-		fields=[
-			"name",
-			"mandatory_test_types",
-			"mandatory_certificate_types",
-			"max_test_age_days",
-			"enforce_dispatch_gate",
-		],
-		order_by="modified desc",
-		limit_page_length=1,
-	)
-	if policies:
-		return policies[0]
-
-	if crop:
-		fallback = frappe.get_all(
-			"Season Policy",
-			filters={"site": site, "active": 1},
-			fields=[
-				"name",
-				"mandatory_test_types",
-				"mandatory_certificate_types",
-				"max_test_age_days",
-				"enforce_dispatch_gate",
-			],
-			order_by="modified desc",
-			limit_page_length=1,
+	for c in find_expired_certificates(evidence.get("certificates") or []):
+		frappe.throw(
+			_("Cannot dispatch: Certificate {0} is expired").format(c.get("name")),
+			frappe.ValidationError,
 		)
-		if fallback:
-			return fallback[0]
-
-	return None
 
 
-def _validate_season_policy_for_dispatch(lot_doc):
-	status = (lot_doc.get("status") or "").strip().lower()
-	if status not in DISPATCH_STATUSES:
+def _validate_season_policy_for_dispatch(lot_doc, evidence=None):
+	if not is_dispatch_status(lot_doc.get("status")):
 		return
 
-	policy = _get_active_season_policy(lot_doc.get("site"), lot_doc.get("crop"))
+	policy = get_active_season_policy(lot_doc.get("site"), lot_doc.get("crop"))
 	if not policy:
 		frappe.throw(
 			_("Cannot dispatch: no active Season Policy found for this Site/Crop"), frappe.ValidationError
@@ -91,70 +50,22 @@ def _validate_season_policy_for_dispatch(lot_doc):
 	if not int(policy.get("enforce_dispatch_gate") or 0):
 		return
 
-	max_age_days = int(policy.get("max_test_age_days") or 7)
-	required_tests = _parse_csv_values(policy.get("mandatory_test_types"))
-	required_certs = _parse_csv_values(policy.get("mandatory_certificate_types"))
-
-	missing_tests: list[str] = []
-	for test_type in required_tests:
-		records = frappe.get_all(
-			"QCTest",
-			filters={
-				"lot": lot_doc.name,
-				"site": lot_doc.get("site"),
-				"test_type": test_type,
-				"pass_fail": "Pass",
-			},
-			fields=["name", "test_date"],
-			order_by="test_date desc",
-			limit_page_length=1,
-		)
-		if not records:
-			missing_tests.append(test_type)
-			continue
-
-		test_date = records[0].get("test_date")
-		if not test_date:
-			missing_tests.append(test_type)
-			continue
+	if evidence is None:
+		evidence = get_lot_evidence(lot_doc.name)
+	result = evaluate_dispatch_requirements(policy, evidence, lot_doc.get("site"))
 
-		days_old = (utils.getdate(utils.nowdate()) - utils.getdate(test_date)).days
-		if days_old > max_age_days:
-			missing_tests.append(test_type)
-
-	if missing_tests:
+	if result["missing_or_stale_tests"]:
 		frappe.throw(
 			_("Cannot dispatch: missing or stale required QC tests: {0}").format(
-				", ".join(sorted(set(missing_tests)))
+				", ".join(result["missing_or_stale_tests"])
 			),
 			frappe.ValidationError,
 		)
 
-	missing_certs: list[str] = []
-	for cert_type in required_certs:
-		records = frappe.get_all(
-			"Certificate",
-			filters={
-				"lot": lot_doc.name,
-				"site": lot_doc.get("site"),
-				"cert_type": cert_type,
-			},
-			fields=["name", "expiry_date"],
-			order_by="modified desc",
-			limit_page_length=1,
-		)
-		if not records:
-			missing_certs.append(cert_type)
-			continue
-
-		expiry = records[0].get("expiry_date")
-		if expiry and utils.getdate(expiry) < utils.getdate(utils.nowdate()):
-			missing_certs.append(cert_type)
-
-	if missing_certs:
+	if result["missing_or_expired_certificates"]:
 		frappe.throw(
 			_("Cannot dispatch: missing or expired required certificates: {0}").format(
-				", ".join(sorted(set(missing_certs)))
+				", ".join(result["missing_or_expired_certificates"])
 			),
 			frappe.ValidationError,
 		)
@@ -179,14 +90,29 @@ class Lot(Document):
 				else:
 					frappe.throw(_("Crop must be a valid Crop record"), frappe.ValidationError)
 
-		# Enforce certificate expiry check when moving to a dispatch-like status
-		try:
-			check_certificates_for_dispatch(self.name, self.get("status"))
-		except frappe.ValidationError:
-			raise
+		# The stored compliance state only depends on Site, crop and status here; QCTest,
+		# Certificate and Nonconformance doc_events and the daily job keep it current
+		# otherwise, so unrelated saves skip the evidence queries.
+		dispatching = is_dispatch_status(self.get("status"))
+		recompute = (
+			self.is_new()
+			or dispatching
+			or any(self.has_value_changed(fieldname) for fieldname in ("site", "crop", "status"))
+		)
+		if not recompute:
+			evidence = None
+		elif self.is_new():
+			evidence = {"qc_tests": [], "certificates": []}
+		else:
+			# Fetched once and shared by the dispatch checks and the stored compliance state.
+			evidence = get_lot_evidence(self.name)
 
-		# Enforce season policy gate for dispatch.
-		_validate_season_policy_for_dispatch(self)
+		if dispatching:
+			# Enforce certificate expiry check when moving to a dispatch-like status
+			check_certificates_for_dispatch(self.name, self.get("status"), evidence)
+
+			# Enforce season policy gate for dispatch.
+			_validate_season_policy_for_dispatch(self, evidence)
 
 		# Enforce QA Manager approval for status transitions to Accepted/Rejected
 		new_status = (self.get("status") or "").strip()
@@ -202,6 +128,18 @@ class Lot(Document):
 						frappe.PermissionError,
 					)
 
+		if not recompute:
+			return
+
+		self.update(
+			compute_lot_compliance(
+				self.get("site"),
+				get_active_season_policy(self.get("site"), self.get("crop")),
+				evidence,
+				0 if self.is_new() else count_open_nonconformance(self.name),
+			)
+		)
+
 
 def _resolve_crop_name(value: str) -> str | None:
 	value = (value or "").strip()
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import frappe
+from frappe.model.document import Document
+
+
+class LotGenealogyLink(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Lot Genealogy Link", ["ancestor", "depth"])
+	frappe.db.add_index("Lot Genealogy Link", ["descendant", "depth"])
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+
+class LotQuantityLedgerEntry(Document):
+	def validate(self):
+		if not self.is_new():
+			frappe.throw(_("Lot quantity ledger entries cannot be changed"), frappe.ValidationError)
+
+	def on_trash(self):
+		frappe.throw(_("Lot quantity ledger entries cannot be deleted"), frappe.ValidationError)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Lot Quantity Ledger Entry", ["voucher_type", "voucher_no"])
+	frappe.db.add_index("Lot Quantity Ledger Entry", ["creation"])
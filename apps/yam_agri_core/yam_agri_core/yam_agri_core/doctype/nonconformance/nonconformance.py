@@ -33,3 +33,8 @@ class Nonconformance(Document):
 					_("Only a user with role '{0}' may set status to Closed").format(QA_MANAGER_ROLE),
 					frappe.PermissionError,
 				)
+
+
+def on_doctype_update():
+	# Keyset paging of EvidencePack scope by (date, name) within a Site.
+	frappe.db.add_index("Nonconformance", ["site", "modified", "name"])
@@ -4,6 +4,7 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from yam_agri_core.yam_agri_core.doctype.device.device import get_device_site
 from yam_agri_core.yam_agri_core.site_permissions import assert_site_access
 
 
@@ -71,7 +72,7 @@ def enforce_observation_validate(doc, method=None) -> None:
 
 	device = doc.get("device")
 	if device:
-		device_site = frappe.db.get_value("Device", device, "site")
+		device_site = get_device_site(device)
 		if device_site and device_site != doc.get("site"):
 			frappe.throw(
 				_("Device site must match Observation site"),
@@ -207,3 +208,8 @@ def _evaluate_threshold_band(value: float, policy: dict) -> tuple[str, bool, boo
 		return "warning", False, True
 
 	return "normal", False, False
+
+
+def on_doctype_update():
+	# Keyset paging of EvidencePack scope by (date, name) within a Site.
+	frappe.db.add_index("Observation", ["site", "observed_at", "name"])
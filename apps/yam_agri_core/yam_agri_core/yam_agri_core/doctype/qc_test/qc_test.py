@@ -26,3 +26,8 @@ class QCTest(Document):
 		if days is None:
 			return False
 		return days <= int(max_days)
+
+
+def on_doctype_update():
+	# Keyset paging of EvidencePack scope by (date, name) within a Site.
+	frappe.db.add_index("QCTest", ["site", "test_date", "name"])
@@ -2,6 +2,7 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from yam_agri_core.yam_agri_core.doctype.device.device import get_device_site
 from yam_agri_core.yam_agri_core.site_permissions import assert_site_access
 
 
@@ -22,7 +23,7 @@ class ScaleTicket(Document):
 
 		device = self.get("device")
 		if device:
-			device_site = frappe.db.get_value("Device", device, "site")
+			device_site = get_device_site(device)
 			if device_site and device_site != self.get("site"):
 				frappe.throw(_("Device site must match ScaleTicket site"), frappe.ValidationError)
 
@@ -31,3 +32,8 @@ class ScaleTicket(Document):
 			lot_site = frappe.db.get_value("Lot", lot, "site")
 			if lot_site and lot_site != self.get("site"):
 				frappe.throw(_("Lot site must match ScaleTicket site"), frappe.ValidationError)
+
+
+def on_doctype_update():
+	# Keyset paging of EvidencePack scope by (date, name) within a Site.
+	frappe.db.add_index("ScaleTicket", ["site", "ticket_datetime", "name"])
@@ -1,9 +1,16 @@
+from __future__ import annotations
+
+from typing import Any
+
 import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from yam_agri_core.yam_agri_core.compliance.dispatch_gate import _parse_csv_values
 from yam_agri_core.yam_agri_core.site_permissions import assert_site_access
 
+SEASON_POLICY_CACHE_KEY = "yam_agri_core:active_season_policies"
+
 
 class SeasonPolicy(Document):
 	def validate(self):
@@ -23,3 +30,74 @@ class SeasonPolicy(Document):
 			self.max_test_age_days = 7
 		elif int(max_days) <= 0:
 			frappe.throw(_("Max Test Age (days) must be greater than zero"), frappe.ValidationError)
+
+	def on_update(self):
+		clear_season_policy_cache()
+
+	def on_trash(self):
+		clear_season_policy_cache()
+
+	def after_rename(self, old_name, new_name, merge=False):
+		clear_season_policy_cache()
+
+
+def _policy_key(site: str | None, crop: str | None) -> str:
+	return f"{site or ''}\x1f{crop or ''}"
+
+
+def _load_active_season_policies() -> dict[str, Any]:
+	"""Index active Season Policies by (site, crop) and by site, newest first.
+
+	Mandatory test and certificate lists are parsed once here so dispatch checks
+	never re-parse the policy text.
+	"""
+	rows = frappe.get_all(
+		"Season Policy",
+		filters={"active": 1},
+		fields=[
+			"name",
+			"site",
+			"crop",
+			"mandatory_test_types",
+			"mandatory_certificate_types",
+			"max_test_age_days",
+			"enforce_dispatch_gate",
+		],
+		order_by="modified desc",
+		limit_page_length=0,
+	)
+
+	by_site_crop: dict[str, dict[str, Any]] = {}
+	by_site: dict[str, dict[str, Any]] = {}
+	for row in rows:
+		policy = dict(row)
+		policy["required_tests"] = list(dict.fromkeys(_parse_csv_values(row.get("mandatory_test_types"))))
+		policy["required_certificates"] = list(
+			dict.fromkeys(_parse_csv_values(row.get("mandatory_certificate_types")))
+		)
+		site = str(row.get("site") or "")
+		if row.get("crop"):
+			by_site_crop.setdefault(_policy_key(site, row.get("crop")), policy)
+		by_site.setdefault(site, policy)
+
+	return {"by_site_crop": by_site_crop, "by_site": by_site}
+
+
+def get_active_season_policy(site: str | None, crop: str | None) -> dict[str, Any] | None:
+	"""Return the newest active Season Policy for a Site/Crop.
+
+	Falls back to the newest active policy at the Site when none matches the
+	crop. Policies are cached in Redis and dropped whenever a Season Policy is
+	saved, renamed or deleted.
+	"""
+	cached = frappe.cache.get_value(SEASON_POLICY_CACHE_KEY, generator=_load_active_season_policies) or {}
+	policy = None
+	if crop:
+		policy = (cached.get("by_site_crop") or {}).get(_policy_key(site, crop))
+	if policy is None:
+		policy = (cached.get("by_site") or {}).get(str(site or ""))
+	return dict(policy) if policy else None
+
+
+def clear_season_policy_cache(doc=None, method=None) -> None:
+	frappe.cache.delete_value(SEASON_POLICY_CACHE_KEY)
@@ -3,6 +3,11 @@ from frappe import _
 from frappe.model.document import Document
 
 from yam_agri_core.yam_agri_core.site_permissions import assert_site_access
+from yam_agri_core.yam_agri_core.traceability.closure import assert_no_genealogy_cycle
+from yam_agri_core.yam_agri_core.traceability.genealogy import (
+	EXCLUDED_TRANSFER_STATUSES,
+	GENEALOGY_TRANSFER_TYPES,
+)
 
 
 class Transfer(Document):
@@ -28,6 +33,12 @@ class Transfer(Document):
 			if to_site and to_site != self.get("site"):
 				frappe.throw(_("To Lot site must match Transfer site"), frappe.ValidationError)
 
+		if (
+			self.get("transfer_type") in GENEALOGY_TRANSFER_TYPES
+			and self.get("status") not in EXCLUDED_TRANSFER_STATUSES
+		):
+			assert_no_genealogy_cycle(from_lot, to_lot)
+
 		new_status = (self.get("status") or "").strip()
 		if new_status in ("Approved", "Rejected"):
 			old_status = None
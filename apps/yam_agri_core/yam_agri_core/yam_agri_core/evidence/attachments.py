@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO
+
+ATTACHMENT_READ_WORKERS = 8
+# Files up to this size are read whole by the pool; larger ones are streamed by the writer.
+PREFETCH_MAX_BYTES = 8 * 1024 * 1024
+COPY_BLOCK_SIZE = 1024 * 1024
+
+_DONE = object()
+
+
+def read_attachment(path: Path | None) -> dict[str, Any]:
+	"""Read and hash one attachment.
+
+	Small files come back with `content` and `sha256` filled in. Large files only
+	report their size; `copy_with_digest` hashes them while copying so they are
+	read once and never held in memory. A missing or unreadable file gives
+	`{"ok": False}`.
+	"""
+	if path is None:
+		return {"ok": False, "path": None}
+	try:
+		size = path.stat().st_size
+		if size > PREFETCH_MAX_BYTES:
+			return {"ok": True, "path": path, "size": size, "content": None, "sha256": None}
+		content = path.read_bytes()
+	except OSError:
+		return {"ok": False, "path": path}
+	return {
+		"ok": True,
+		"path": path,
+		"size": len(content),
+		"content": content,
+		"sha256": hashlib.sha256(content).hexdigest(),
+	}
+
+
+def iter_attachments(
+	paths: list[Path | None], workers: int = ATTACHMENT_READ_WORKERS
+) -> Iterator[dict[str, Any]]:
+	"""Yield `read_attachment` results in input order while a thread pool reads ahead.
+
+	At most `2 * workers` reads are in flight, so memory stays bounded by
+	`2 * workers * PREFETCH_MAX_BYTES` however many attachments there are.
+	"""
+	if workers <= 1:
+		for path in paths:
+			yield read_attachment(path)
+		return
+
+	window = workers * 2
+	with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="evidence-read") as pool:
+		pending: deque = deque()
+		remaining = iter(paths)
+		for path in remaining:
+			pending.append(pool.submit(read_attachment, path))
+			if len(pending) >= window:
+				break
+		while pending:
+			result = pending.popleft().result()
+			next_path = next(remaining, _DONE)
+			if next_path is not _DONE:
+				pending.append(pool.submit(read_attachment, next_path))
+			yield result
+
+
+def copy_with_digest(
+	source: BinaryIO, target: BinaryIO, block_size: int = COPY_BLOCK_SIZE
+) -> tuple[int, str]:
+	"""Copy `source` to `target` in fixed-size blocks, returning (bytes copied, SHA-256 hex)."""
+	digest = hashlib.sha256()
+	size = 0
+	for block in iter(lambda: source.read(block_size), b""):
+		digest.update(block)
+		target.write(block)
+		size += len(block)
+	return size, digest.hexdigest()
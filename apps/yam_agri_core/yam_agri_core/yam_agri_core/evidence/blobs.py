@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import datetime
+import os
+import re
+from pathlib import Path
+
+from werkzeug.wrappers import Response
+
+import frappe
+from frappe import _, utils
+
+from yam_agri_core.yam_agri_core.evidence.attachments import copy_with_digest
+from yam_agri_core.yam_agri_core.evidence.downloads import file_response
+
+BLOB_DOCTYPE = "Evidence Blob"
+BLOB_REFERENCE_DOCTYPE = "Evidence Blob Reference"
+BLOB_CHUNK_SIZE = 1000
+# Unreferenced blobs are kept this long after their last reference. Exports that reuse
+# an older blob refresh `last_referenced` first (see _retain_blob).
+BLOB_GRACE_HOURS = 24
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def blob_root() -> Path:
+	return Path(frappe.get_site_path("private", "evidence_blobs"))
+
+
+def blob_path(sha256: str) -> Path:
+	"""Where the blob with this SHA-256 lives: private/evidence_blobs/<first two hex digits>/<sha256>."""
+	digest = str(sha256 or "").strip().lower()
+	if not _SHA256_RE.match(digest):
+		frappe.throw(_("Invalid evidence blob digest"), frappe.ValidationError)
+	return blob_root() / digest[:2] / digest
+
+
+def _retain_blob(sha256: str) -> bool:
+	"""Lock the blob's row and refresh `last_referenced`; False when there is no row.
+
+	The row lock makes a concurrent collect_unreferenced_blobs DELETE wait for this
+	transaction and then see the fresh `last_referenced`, so a blob being reused
+	is not collected before the export records its reference.
+	"""
+	if not frappe.db.get_value(BLOB_DOCTYPE, sha256, "name", for_update=True):
+		return False
+	frappe.db.set_value(BLOB_DOCTYPE, sha256, "last_referenced", utils.now_datetime(), update_modified=False)
+	return True
+
+
+def store_blob(source: Path, sha256: str | None = None) -> tuple[str, int]:
+	"""Add the content of `source` to the blob store and return (sha256, size).
+
+	Content that is already stored is not written again. New content is always
+	copied, never hard-linked: an attachment can be rewritten in place later
+	(File.optimize_file does), which would silently change a linked blob. The
+	digest is computed during the copy, so the stored name always matches the
+	stored bytes; `sha256` only lets an already-stored blob skip the copy.
+	"""
+	if sha256:
+		existing = blob_path(sha256)
+		if _retain_blob(sha256) and existing.is_file():
+			return sha256, existing.stat().st_size
+
+	root = blob_root()
+	root.mkdir(parents=True, exist_ok=True)
+	temp_path = root / f".blob.{frappe.generate_hash(length=12)}.tmp"
+	try:
+		with source.open("rb") as reader, temp_path.open("wb") as writer:
+			size, digest = copy_with_digest(reader, writer)
+		target = blob_path(digest)
+		target.parent.mkdir(parents=True, exist_ok=True)
+		# Retain an existing row before (re)writing the file, so it cannot be
+		# collected in between. Replacing identical content is harmless.
+		_retain_blob(digest)
+		os.replace(temp_path, target)
+		return digest, size
+	finally:
+		temp_path.unlink(missing_ok=True)
+
+
+def _ensure_blob_rows(blobs: dict[str, int]) -> None:
+	shas = sorted(blobs)
+	existing: set[str] = set()
+	for start in range(0, len(shas), BLOB_CHUNK_SIZE):
+		existing.update(
+			frappe.get_all(
+				BLOB_DOCTYPE, filters={"name": ["in", shas[start : start + BLOB_CHUNK_SIZE]]}, pluck="name"
+			)
+		)
+	missing = [sha for sha in shas if sha not in existing]
+	if not missing:
+		return
+
+	now = utils.now_datetime()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		BLOB_DOCTYPE,
+		["name", "creation", "modified", "owner", "modified_by", "sha256", "size_bytes", "ref_count"],
+		[(sha, now, now, user, user, sha, int(blobs[sha] or 0), 0) for sha in missing],
+		chunk_size=BLOB_CHUNK_SIZE,
+		ignore_duplicates=True,
+	)
+
+
+def _adjust_ref_counts(shas: list[str], delta: int) -> None:
+	now = utils.now_datetime()
+	for start in range(0, len(shas), BLOB_CHUNK_SIZE):
+		frappe.db.sql(
+			"""
+			UPDATE `tabEvidence Blob`
+			SET ref_count = GREATEST(ref_count + %(delta)s, 0), last_referenced = %(now)s
+			WHERE name IN %(names)s
+			""",
+			{"delta": delta, "now": now, "names": tuple(shas[start : start + BLOB_CHUNK_SIZE])},
+		)
+
+
+def sync_pack_blob_references(evidence_pack: str, site: str, blobs: dict[str, int]) -> dict[str, int]:
+	"""Make `blobs` (sha256 -> size) the set of blobs referenced by the EvidencePack.
+
+	Each blob's ref_count is the number of EvidencePacks referencing it, so
+	shared attachments are stored once however many packs include them.
+	"""
+	existing = set(
+		frappe.get_all(BLOB_REFERENCE_DOCTYPE, filters={"evidence_pack": evidence_pack}, pluck="blob")
+	)
+	added = sorted(set(blobs) - existing)
+	removed = sorted(existing - set(blobs))
+
+	if added:
+		_ensure_blob_rows({sha: blobs[sha] for sha in added})
+		now = utils.now_datetime()
+		user = frappe.session.user
+		frappe.db.bulk_insert(
+			BLOB_REFERENCE_DOCTYPE,
+			["name", "creation", "modified", "owner", "modified_by", "blob", "evidence_pack", "site"],
+			[
+				(frappe.generate_hash(length=12), now, now, user, user, sha, evidence_pack, site)
+				for sha in added
+			],
+			chunk_size=BLOB_CHUNK_SIZE,
+		)
+		_adjust_ref_counts(added, 1)
+	if removed:
+		frappe.db.delete(BLOB_REFERENCE_DOCTYPE, {"evidence_pack": evidence_pack, "blob": ["in", removed]})
+		_adjust_ref_counts(removed, -1)
+	return {"added": len(added), "removed": len(removed), "referenced": len(blobs)}
+
+
+def pack_references_blob(evidence_pack: str, sha256: str) -> bool:
+	return bool(frappe.db.exists(BLOB_REFERENCE_DOCTYPE, {"evidence_pack": evidence_pack, "blob": sha256}))
+
+
+def release_pack_blobs(doc, method=None) -> None:
+	"""doc_events hook for EvidencePack on_trash: drop the pack's blob references."""
+	sync_pack_blob_references(doc.name, doc.get("site"), {})
+
+
+def collect_unreferenced_blobs() -> int:
+	"""Daily job: delete blobs no EvidencePack has referenced for BLOB_GRACE_HOURS."""
+	cutoff = utils.now_datetime() - datetime.timedelta(hours=BLOB_GRACE_HOURS)
+	names = frappe.get_all(
+		BLOB_DOCTYPE,
+		filters={"ref_count": ["<=", 0], "last_referenced": ["<", cutoff]},
+		pluck="name",
+		limit_page_length=0,
+	)
+	removed = 0
+	for start in range(0, len(names), BLOB_CHUNK_SIZE):
+		chunk = names[start : start + BLOB_CHUNK_SIZE]
+		# Re-check both conditions in the DELETE so a blob re-referenced or retained
+		# by a running export meanwhile survives.
+		frappe.db.delete(
+			BLOB_DOCTYPE, {"name": ["in", chunk], "ref_count": ["<=", 0], "last_referenced": ["<", cutoff]}
+		)
+		still_present = set(frappe.get_all(BLOB_DOCTYPE, filters={"name": ["in", chunk]}, pluck="name"))
+		for sha in chunk:
+			if sha in still_present:
+				continue
+			blob_path(sha).unlink(missing_ok=True)
+			removed += 1
+	return removed
+
+
+def blob_response(sha256: str, filename: str | None = None) -> Response:
+	"""Send a stored blob as a file download."""
+	path = blob_path(sha256)
+	if not path.is_file():
+		frappe.throw(_("Evidence file is no longer available"), frappe.DoesNotExistError)
+	return file_response(path, filename or sha256)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import mimetypes
+from pathlib import Path
+from urllib.parse import quote, urlencode
+
+from werkzeug.utils import send_file
+from werkzeug.wrappers import Response
+
+import frappe
+from frappe import _, utils
+from frappe.utils.password import get_encryption_key
+
+# Signed download links are short-lived: long enough to start (and resume) a
+# multi-GB download, short enough that a leaked link soon stops working.
+DOWNLOAD_TOKEN_TTL = 15 * 60
+
+_DOWNLOAD_METHOD = "yam_agri_core.yam_agri_core.api.evidence_pack.download_evidence_file"
+# Matches the internal location bench's nginx config serves site files from.
+_ACCEL_REDIRECT_PREFIX = "/protected/"
+
+
+def _download_signature(evidence_pack: str, export_format: str, file_url: str, expires: int) -> str:
+	message = "\n".join((evidence_pack, export_format, file_url, str(expires)))
+	return hmac.new(get_encryption_key().encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def signed_download_url(
+	evidence_pack: str, export_format: str, file_url: str, ttl: int = DOWNLOAD_TOKEN_TTL
+) -> tuple[str, int]:
+	"""A download URL for an EvidencePack export and the Unix time it expires.
+
+	The signature covers the export's current file URL, so re-exporting the
+	pack invalidates links issued for the previous file.
+	"""
+	expires = int(utils.now_datetime().timestamp()) + int(ttl)
+	query = urlencode(
+		{
+			"evidence_pack": evidence_pack,
+			"export_format": export_format,
+			"expires": expires,
+			"signature": _download_signature(evidence_pack, export_format, file_url, expires),
+		}
+	)
+	return f"/api/method/{_DOWNLOAD_METHOD}?{query}", expires
+
+
+def verify_download_signature(
+	evidence_pack: str, export_format: str, file_url: str, expires: str | int, signature: str
+) -> None:
+	try:
+		expires_at = int(expires)
+	except (TypeError, ValueError):
+		expires_at = 0
+	expected = _download_signature(evidence_pack, export_format, file_url, expires_at)
+	if not hmac.compare_digest(expected, str(signature or "")):
+		frappe.throw(_("Invalid download link"), frappe.PermissionError)
+	if expires_at < int(utils.now_datetime().timestamp()):
+		frappe.throw(_("This download link has expired. Request a new one."), frappe.PermissionError)
+
+
+def file_response(path: Path, filename: str) -> Response:
+	"""Send a file under the site directory as an attachment.
+
+	Behind nginx the file is handed off with X-Accel-Redirect, so nginx serves
+	the bytes (including Range requests) and the worker is released at once.
+	Without nginx werkzeug streams the file and answers Range requests itself.
+	"""
+	site_root = Path(frappe.get_site_path()).resolve()
+	if frappe.get_request_header("X-Use-X-Accel-Redirect"):
+		relative = path.resolve().relative_to(site_root).as_posix()
+		response = Response()
+		response.headers["X-Accel-Redirect"] = quote(f"{_ACCEL_REDIRECT_PREFIX}{relative}")
+		response.headers.add("Content-Disposition", "attachment", filename=filename)
+		response.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+	else:
+		response = send_file(
+			str(path),
+			environ=frappe.local.request.environ,
+			as_attachment=True,
+			download_name=filename,
+			conditional=True,
+		)
+	response.headers["Cache-Control"] = "private, no-store"
+	return response
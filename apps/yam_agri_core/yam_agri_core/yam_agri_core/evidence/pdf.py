@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from pypdf import PdfReader, PdfWriter
+
+import frappe
+from frappe.utils.pdf import get_pdf
+
+# Linked rows per PDF section. wkhtmltopdf time and memory grow faster than
+# linearly with table length, so large packs are rendered as many short documents.
+PDF_SECTION_ROWS = 500
+PDF_RENDER_WORKERS = 4
+
+_TEMPLATE_PATH = ("yam_agri_core", "yam_agri_core", "templates", "includes", "evidence_pack_pdf.html")
+# path -> ((mtime_ns, size), sha256 of the source, compiled template)
+_TEMPLATE_CACHE: dict[str, tuple[tuple[int, int], str, Any]] = {}
+
+
+def _template_path() -> Path:
+	return Path(frappe.get_app_path(*_TEMPLATE_PATH))
+
+
+def get_compiled_template() -> tuple[Any, str]:
+	"""The compiled evidence pack template and the SHA-256 of its source.
+
+	Compiled once per worker process and reused until the file changes on disk.
+	"""
+	path = _template_path()
+	key = str(path)
+	stat = path.stat()
+	stamp = (stat.st_mtime_ns, stat.st_size)
+	cached = _TEMPLATE_CACHE.get(key)
+	if cached and cached[0] == stamp:
+		return cached[2], cached[1]
+
+	source = path.read_text(encoding="utf-8")
+	digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+	template = frappe.get_jenv().from_string(source)
+	_TEMPLATE_CACHE[key] = (stamp, digest, template)
+	return template, digest
+
+
+def pdf_template_version() -> str:
+	return get_compiled_template()[1]
+
+
+def paginate_rows(
+	linked_rows: list[dict[str, Any]], section_rows: int = PDF_SECTION_ROWS
+) -> list[tuple[int, list[dict[str, Any]]]]:
+	"""Split rows into (row_offset, rows) sections. An empty pack still gets one section."""
+	size = max(1, int(section_rows))
+	sections = [(start, linked_rows[start : start + size]) for start in range(0, len(linked_rows), size)]
+	return sections or [(0, [])]
+
+
+def render_section_html(
+	template: Any,
+	context: dict[str, Any],
+	sections: list[tuple[int, list[dict[str, Any]]]],
+) -> list[str]:
+	"""Render one HTML document per section.
+
+	The first section carries the scope counts and narrative; every section
+	repeats the pack header and numbers its rows from `row_offset`.
+	"""
+	return [
+		template.render(
+			{
+				**context,
+				"linked_documents": rows,
+				"row_offset": row_offset,
+				"first_section": index == 0,
+				"section_number": index + 1,
+				"section_count": len(sections),
+			}
+		)
+		for index, (row_offset, rows) in enumerate(sections)
+	]
+
+
+def _html_to_pdf(html: str) -> bytes:
+	pdf_content = get_pdf(html)
+	if isinstance(pdf_content, str):
+		pdf_content = pdf_content.encode("utf-8")
+	return pdf_content
+
+
+def _init_render_worker(site: str, sites_path: str) -> None:
+	# get_pdf reads Print Settings and site config, so each worker needs its own site connection.
+	frappe.init(site=site, sites_path=sites_path)
+	frappe.connect()
+
+
+def html_sections_to_pdfs(
+	html_sections: list[str],
+	workers: int = PDF_RENDER_WORKERS,
+	progress: Callable[[int, int], None] | None = None,
+) -> list[bytes]:
+	"""Convert HTML sections to PDFs, in order, using a pool of worker processes."""
+	workers = max(1, min(workers, len(html_sections), os.cpu_count() or 1))
+	total = len(html_sections)
+	if workers == 1:
+		parts = []
+		for index, html in enumerate(html_sections):
+			if progress:
+				progress(index, total)
+			parts.append(_html_to_pdf(html))
+		return parts
+
+	with ProcessPoolExecutor(
+		max_workers=workers,
+		mp_context=multiprocessing.get_context("spawn"),
+		initializer=_init_render_worker,
+		initargs=(frappe.local.site, frappe.local.sites_path),
+	) as pool:
+		parts = []
+		for index, part in enumerate(pool.map(_html_to_pdf, html_sections)):
+			if progress:
+				progress(index, total)
+			parts.append(part)
+		return parts
+
+
+def merge_pdfs(parts: list[bytes]) -> bytes:
+	if len(parts) == 1:
+		return parts[0]
+	writer = PdfWriter()
+	for part in parts:
+		writer.append(PdfReader(io.BytesIO(part)))
+	output = io.BytesIO()
+	writer.write(output)
+	return output.getvalue()
+
+
+def render_evidence_pdf(
+	context: dict[str, Any],
+	linked_rows: list[dict[str, Any]],
+	section_rows: int = PDF_SECTION_ROWS,
+	workers: int = PDF_RENDER_WORKERS,
+	progress: Callable[[int, int], None] | None = None,
+) -> bytes:
+	"""Render the evidence pack PDF as fixed-size sections and merge them into one file."""
+	template, _digest = get_compiled_template()
+	html_sections = render_section_html(template, context, paginate_rows(linked_rows, section_rows))
+	return merge_pdfs(html_sections_to_pdfs(html_sections, workers=workers, progress=progress))
@@ -857,6 +857,8 @@ def run_at04_automated_check() -> dict:
 
 	try:
 		frappe.set_user("Administrator")
+		from yam_agri_core.yam_agri_core.traceability.genealogy import trace_lot_genealogy
+
 		latest = frappe.get_all(
 			"Transfer",
 			filters={"transfer_type": "Split", "notes": ["like", "AT03-AUTO-SPLIT-%"]},
@@ -889,13 +891,9 @@ def run_at04_automated_check() -> dict:
 		evidence["shipment_lot"] = transfer.get("to_lot")
 		evidence["source_lot"] = transfer.get("from_lot")
 
-		backward_chain = frappe.get_all(
-			"Transfer",
-			filters={"to_lot": transfer.get("to_lot"), "site": transfer.get("site")},
-			fields=["name", "from_lot", "to_lot"],
-			order_by="modified desc",
-			limit_page_length=20,
-		)
+		backward_chain = trace_lot_genealogy(
+			transfer.get("to_lot"), "backward", sites=[transfer.get("site")]
+		)["edges"]
 		evidence["backward_chain_count"] = len(backward_chain)
 		evidence["trace_found"] = any(r.get("from_lot") == transfer.get("from_lot") for r in backward_chain)
 
@@ -926,6 +924,8 @@ def run_at05_automated_check() -> dict:
 
 	try:
 		frappe.set_user("Administrator")
+		from yam_agri_core.yam_agri_core.traceability.genealogy import trace_lot_genealogy
+
 		latest = frappe.get_all(
 			"Transfer",
 			filters={"transfer_type": "Split", "notes": ["like", "AT03-AUTO-SPLIT-%"]},
@@ -958,13 +958,9 @@ def run_at05_automated_check() -> dict:
 		evidence["source_lot"] = transfer.get("from_lot")
 		evidence["shipment_lot"] = transfer.get("to_lot")
 
-		forward_chain = frappe.get_all(
-			"Transfer",
-			filters={"from_lot": transfer.get("from_lot"), "site": transfer.get("site")},
-			fields=["name", "from_lot", "to_lot"],
-			order_by="modified desc",
-			limit_page_length=20,
-		)
+		forward_chain = trace_lot_genealogy(
+			transfer.get("from_lot"), "forward", sites=[transfer.get("site")]
+		)["edges"]
 		evidence["forward_chain_count"] = len(forward_chain)
 		evidence["trace_found"] = any(r.get("to_lot") == transfer.get("to_lot") for r in forward_chain)
 
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import Any
+
+import frappe
+from frappe import utils
+
+LEDGER_DOCTYPE = "Lot Quantity Ledger Entry"
+LEDGER_CHUNK_SIZE = 5000
+LEDGER_FIELDS = ["lot", "site", "entry_type", "qty_kg", "posting_datetime", "voucher_type", "voucher_no"]
+# Only QA-approved Transfers have physically moved material between Lots.
+LEDGER_TRANSFER_STATUSES = ("Approved",)
+QTY_EPSILON = 0.0005
+
+Movements = dict[tuple[str, str], float]
+
+
+def scale_ticket_movements(doc) -> Movements:
+	"""A ScaleTicket adds its measured net weight to the Lot, as the CSV import does."""
+	lot = doc.get("lot")
+	if not lot:
+		return {}
+	return {(lot, "Scale Ticket"): float(doc.get("net_kg") or 0)}
+
+
+def transfer_movements(doc) -> Movements:
+	if doc.get("status") not in LEDGER_TRANSFER_STATUSES:
+		return {}
+
+	qty = float(doc.get("qty_kg") or 0)
+	movements: Movements = {}
+	if doc.get("from_lot"):
+		movements[(doc.get("from_lot"), "Transfer Out")] = -qty
+	if doc.get("to_lot"):
+		movements[(doc.get("to_lot"), "Transfer In")] = qty
+	return movements
+
+
+def _posted_movements(voucher_type: str, voucher_no: str) -> Movements:
+	posted: Movements = {}
+	for row in frappe.get_all(
+		LEDGER_DOCTYPE,
+		filters={"voucher_type": voucher_type, "voucher_no": voucher_no},
+		fields=["lot", "entry_type", "qty_kg"],
+		limit_page_length=0,
+	):
+		key = (str(row.get("lot")), str(row.get("entry_type")))
+		posted[key] = posted.get(key, 0.0) + float(row.get("qty_kg") or 0)
+	return posted
+
+
+def append_ledger_entries(entries: list[dict[str, Any]]) -> int:
+	if not entries:
+		return 0
+	now = utils.now_datetime()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		LEDGER_DOCTYPE,
+		["name", "creation", "modified", "owner", "modified_by", *LEDGER_FIELDS],
+		[
+			(
+				frappe.generate_hash(length=12),
+				now,
+				now,
+				user,
+				user,
+				*(entry.get(field) for field in LEDGER_FIELDS),
+			)
+			for entry in entries
+		],
+		chunk_size=LEDGER_CHUNK_SIZE,
+	)
+	return len(entries)
+
+
+def sync_voucher_ledger(
+	voucher_type: str,
+	voucher_no: str,
+	site: str | None,
+	movements: Movements,
+	posting_datetime: Any = None,
+) -> int:
+	"""Bring the ledger for one voucher in line with `movements` by appending the difference.
+
+	Existing entries are never changed: an edited or deleted voucher posts
+	correcting entries, so the ledger keeps the full history and summing it per
+	Lot gives the expected balance.
+	"""
+	posted = _posted_movements(voucher_type, voucher_no)
+	entries = []
+	for lot, entry_type in sorted(set(posted) | set(movements)):
+		delta = movements.get((lot, entry_type), 0.0) - posted.get((lot, entry_type), 0.0)
+		if abs(delta) < QTY_EPSILON:
+			continue
+		entries.append(
+			{
+				"lot": lot,
+				"site": site,
+				"entry_type": entry_type,
+				"qty_kg": round(delta, 3),
+				"posting_datetime": posting_datetime or utils.now_datetime(),
+				"voucher_type": voucher_type,
+				"voucher_no": voucher_no,
+			}
+		)
+	return append_ledger_entries(entries)
+
+
+def on_scale_ticket_change(doc, method=None) -> None:
+	"""doc_events hook for ScaleTicket."""
+	movements = {} if method == "after_delete" else scale_ticket_movements(doc)
+	sync_voucher_ledger("ScaleTicket", doc.name, doc.get("site"), movements, doc.get("ticket_datetime"))
+
+
+def on_transfer_change(doc, method=None) -> None:
+	"""doc_events hook for Transfer."""
+	movements = {} if method == "after_delete" else transfer_movements(doc)
+	sync_voucher_ledger("Transfer", doc.name, doc.get("site"), movements, doc.get("transfer_datetime"))
+
+
+def on_lot_insert(doc, method=None) -> None:
+	"""doc_events hook for Lot: the quantity a Lot is created with is its opening balance."""
+	sync_voucher_ledger(
+		"Lot", doc.name, doc.get("site"), {(doc.name, "Opening"): float(doc.get("qty_kg") or 0)}
+	)
+
+
+def get_ledger_balances(lot_names: list[str]) -> dict[str, float]:
+	"""Expected quantity per Lot: the sum of its ledger entries."""
+	balances: dict[str, float] = {}
+	for start in range(0, len(lot_names), LEDGER_CHUNK_SIZE):
+		rows = frappe.db.sql(
+			"""
+			SELECT lot, SUM(qty_kg) AS balance
+			FROM `tabLot Quantity Ledger Entry`
+			WHERE lot IN %(lots)s
+			GROUP BY lot
+			""",
+			{"lots": tuple(lot_names[start : start + LEDGER_CHUNK_SIZE])},
+			as_dict=True,
+		)
+		for row in rows:
+			balances[str(row.get("lot"))] = float(row.get("balance") or 0)
+	return balances
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import frappe
+from frappe import _, utils
+
+from yam_agri_core.yam_agri_core.inventory.ledger import (
+	LEDGER_CHUNK_SIZE,
+	LEDGER_DOCTYPE,
+	get_ledger_balances,
+)
+from yam_agri_core.yam_agri_core.inventory.tolerance import get_site_tolerance_pct
+
+MASS_BALANCE_WATERMARK_KEY = "yam_agri_mass_balance_watermark"
+MASS_BALANCE_NC_PREFIX = "MASS-BALANCE"
+# Ignore rounding noise from the 3-decimal quantities.
+MIN_DISCREPANCY_KG = 0.01
+
+
+def _load_watermark() -> dict[str, Any]:
+	raw = frappe.db.get_default(MASS_BALANCE_WATERMARK_KEY)
+	try:
+		watermark = json.loads(raw) if raw else {}
+	except ValueError:
+		watermark = {}
+	return watermark if isinstance(watermark, dict) else {}
+
+
+def _save_watermark(scanned_at: Any) -> None:
+	frappe.db.set_default(MASS_BALANCE_WATERMARK_KEY, json.dumps({"scanned_at": str(scanned_at)}))
+
+
+def find_lots_to_reconcile(since: Any = None) -> dict[str, list[str]]:
+	"""Lots to check, grouped by Site: those with ledger entries or edits after `since`, else all."""
+	if not since:
+		rows = frappe.get_all("Lot", fields=["name", "site"], limit_page_length=0)
+	else:
+		changed = set(
+			frappe.get_all(LEDGER_DOCTYPE, filters={"creation": [">", since]}, pluck="lot", distinct=True)
+		)
+		changed.update(frappe.get_all("Lot", filters={"modified": [">", since]}, pluck="name"))
+		rows = []
+		names = sorted(changed)
+		for start in range(0, len(names), LEDGER_CHUNK_SIZE):
+			rows.extend(
+				frappe.get_all(
+					"Lot",
+					filters={"name": ["in", names[start : start + LEDGER_CHUNK_SIZE]]},
+					fields=["name", "site"],
+					limit_page_length=0,
+				)
+			)
+
+	by_site: dict[str, list[str]] = {}
+	for row in rows:
+		if row.get("site"):
+			by_site.setdefault(str(row.get("site")), []).append(str(row.get("name")))
+	return by_site
+
+
+def evaluate_mass_balance(actual_kg: float, expected_kg: float, tolerance_pct: float) -> dict[str, Any]:
+	discrepancy = round(actual_kg - expected_kg, 3)
+	allowed = max(abs(actual_kg), abs(expected_kg)) * tolerance_pct / 100.0
+	return {
+		"actual_kg": round(actual_kg, 3),
+		"expected_kg": round(expected_kg, 3),
+		"discrepancy_kg": discrepancy,
+		"tolerance_pct": tolerance_pct,
+		"out_of_tolerance": abs(discrepancy) > max(allowed, MIN_DISCREPANCY_KG),
+	}
+
+
+def _ensure_mass_balance_nonconformance(site: str, lot: str, result: dict[str, Any]) -> str:
+	"""Open (or refresh) the candidate Nonconformance for a Lot's mass-balance discrepancy."""
+	description = _(
+		"{0} lot={1}; expected_kg={2}; actual_kg={3}; discrepancy_kg={4}; tolerance_pct={5}"
+	).format(
+		MASS_BALANCE_NC_PREFIX,
+		lot,
+		result["expected_kg"],
+		result["actual_kg"],
+		result["discrepancy_kg"],
+		result["tolerance_pct"],
+	)
+	existing = frappe.db.get_value(
+		"Nonconformance",
+		{
+			"site": site,
+			"lot": lot,
+			"status": ["!=", "Closed"],
+			"capa_description": ["like", f"{MASS_BALANCE_NC_PREFIX} lot={lot};%"],
+		},
+		"name",
+	)
+	if existing:
+		frappe.db.set_value("Nonconformance", existing, "capa_description", description)
+		return str(existing)
+
+	nc = frappe.get_doc(
+		{
+			"doctype": "Nonconformance",
+			"site": site,
+			"lot": lot,
+			"status": "Open",
+			"capa_description": description,
+		}
+	)
+	nc.insert(ignore_permissions=True)
+	return str(nc.name)
+
+
+def reconcile_lots(site_name: str, lot_names: list[str]) -> list[dict[str, Any]]:
+	"""Compare each Lot's `qty_kg` with its ledger balance and raise Nonconformances for drift.
+
+	Returns one entry per Lot outside the Site's weighing tolerance.
+	"""
+	if not lot_names:
+		return []
+
+	tolerance_pct = get_site_tolerance_pct(site_name)
+	balances = get_ledger_balances(lot_names)
+	discrepancies = []
+	for start in range(0, len(lot_names), LEDGER_CHUNK_SIZE):
+		for lot in frappe.get_all(
+			"Lot",
+			filters={"name": ["in", lot_names[start : start + LEDGER_CHUNK_SIZE]], "site": site_name},
+			fields=["name", "qty_kg"],
+			limit_page_length=0,
+		):
+			name = str(lot.get("name"))
+			result = evaluate_mass_balance(
+				float(lot.get("qty_kg") or 0), balances.get(name, 0.0), tolerance_pct
+			)
+			if not result["out_of_tolerance"]:
+				continue
+			result["lot"] = name
+			result["nonconformance"] = _ensure_mass_balance_nonconformance(site_name, name, result)
+			discrepancies.append(result)
+	return discrepancies
+
+
+def reconcile_site_lots(site_name: str, lot_names: list[str] | None = None) -> int:
+	"""Background job: reconcile the given Lots (default: every Lot) at one Site."""
+	if lot_names is None:
+		lot_names = frappe.get_all("Lot", filters={"site": site_name}, pluck="name")
+	return len(reconcile_lots(site_name, lot_names))
+
+
+def schedule_mass_balance_reconciliation(full: bool = False) -> int:
+	"""Scheduler entry point: enqueue one reconciliation job per Site for Lots changed since the last run.
+
+	Sites are reconciled in parallel on the long queue. `full=True` ignores the
+	watermark and checks every Lot, which also catches quantities edited without
+	touching `modified`.
+	"""
+	scanned_at = utils.now_datetime()
+	if full:
+		# A full run only needs the Sites: reconcile_site_lots(lot_names=None) loads each
+		# Site's Lots in the worker, which keeps large Lot lists out of the job payloads.
+		lot_counts = {
+			str(row.get("site")): int(row.get("lot_count") or 0)
+			for row in frappe.get_all(
+				"Lot", fields=["site", "count(name) as lot_count"], group_by="site", limit_page_length=0
+			)
+			if row.get("site")
+		}
+		jobs = {site_name: None for site_name in lot_counts}
+	else:
+		by_site = find_lots_to_reconcile(_load_watermark().get("scanned_at"))
+		lot_counts = {site_name: len(lot_names) for site_name, lot_names in by_site.items()}
+		jobs = by_site
+
+	for site_name, lot_names in sorted(jobs.items()):
+		frappe.enqueue(
+			"yam_agri_core.yam_agri_core.inventory.mass_balance.reconcile_site_lots",
+			queue="long",
+			site_name=site_name,
+			lot_names=lot_names,
+			enqueue_after_commit=True,
+		)
+	_save_watermark(scanned_at)
+	return sum(lot_counts.values())
+
+
+def schedule_full_mass_balance_reconciliation() -> int:
+	return schedule_mass_balance_reconciliation(full=True)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Any
+
+import frappe
+
+DEFAULT_TOLERANCE_PCT = 2.5
+
+
+def get_site_tolerance_pct(site_name: str, override_policy: str | None = None) -> float:
+	"""Weighing tolerance (%) for a Site: its active, in-date Site Tolerance Policy, else the default.
+
+	`override_policy` restricts the lookup to one named policy.
+	"""
+	if frappe.db.exists("DocType", "Site Tolerance Policy"):
+		filters: dict[str, Any] = {"site": site_name, "active": 1}
+		if override_policy:
+			filters["name"] = override_policy
+		policy_row = frappe.get_all(
+			"Site Tolerance Policy",
+			filters=filters,
+			fields=["name", "tolerance_pct", "from_date", "to_date"],
+			order_by="modified desc",
+			limit_page_length=20,
+		)
+		today = frappe.utils.nowdate()
+		for row in policy_row:
+			from_date = row.get("from_date")
+			to_date = row.get("to_date")
+			if from_date and str(from_date) > str(today):
+				continue
+			if to_date and str(to_date) < str(today):
+				continue
+			try:
+				pct = float(row.get("tolerance_pct") or 0)
+			except (TypeError, ValueError):
+				continue
+			if pct > 0:
+				return pct
+
+	return DEFAULT_TOLERANCE_PCT
@@ -0,0 +1,11 @@
+import frappe
+
+from yam_agri_core.yam_agri_core.compliance.lot_status import refresh_lots_compliance
+
+
+def execute():
+	"""Populate the stored compliance state (dispatch_ready, missing evidence, next expiry) on every Lot."""
+	if not frappe.db.exists("DocType", "Lot"):
+		return
+
+	refresh_lots_compliance(frappe.get_all("Lot", pluck="name"))
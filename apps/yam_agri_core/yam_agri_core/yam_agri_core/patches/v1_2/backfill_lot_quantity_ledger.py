@@ -0,0 +1,54 @@
+import frappe
+
+from yam_agri_core.yam_agri_core.inventory.ledger import (
+	LEDGER_DOCTYPE,
+	LEDGER_TRANSFER_STATUSES,
+	get_ledger_balances,
+	sync_voucher_ledger,
+	transfer_movements,
+)
+
+
+def execute():
+	"""Seed the Lot quantity ledger from existing ScaleTickets and approved Transfers.
+
+	Each Lot's opening entry absorbs whatever the history does not explain, so every
+	Lot starts reconciled and only drift after this patch is reported.
+	"""
+	if not frappe.db.exists("DocType", "Lot Quantity Ledger Entry"):
+		return
+
+	for ticket in frappe.get_all(
+		"ScaleTicket",
+		filters={"lot": ["is", "set"]},
+		fields=["name", "site", "lot", "net_kg", "ticket_datetime"],
+		limit_page_length=0,
+	):
+		sync_voucher_ledger(
+			"ScaleTicket",
+			ticket.name,
+			ticket.site,
+			{(ticket.lot, "Scale Ticket"): float(ticket.net_kg or 0)},
+			ticket.ticket_datetime,
+		)
+
+	for transfer in frappe.get_all(
+		"Transfer",
+		filters={"status": ["in", list(LEDGER_TRANSFER_STATUSES)]},
+		fields=["name", "site", "from_lot", "to_lot", "qty_kg", "status", "transfer_datetime"],
+		limit_page_length=0,
+	):
+		sync_voucher_ledger(
+			"Transfer", transfer.name, transfer.site, transfer_movements(transfer), transfer.transfer_datetime
+		)
+
+	opened = set(frappe.get_all(LEDGER_DOCTYPE, filters={"voucher_type": "Lot"}, pluck="voucher_no"))
+	lots = [
+		lot
+		for lot in frappe.get_all("Lot", fields=["name", "site", "qty_kg", "creation"], limit_page_length=0)
+		if lot.name not in opened
+	]
+	balances = get_ledger_balances([lot.name for lot in lots])
+	for lot in lots:
+		opening = float(lot.qty_kg or 0) - balances.get(lot.name, 0.0)
+		sync_voucher_ledger("Lot", lot.name, lot.site, {(lot.name, "Opening"): opening}, lot.creation)
@@ -0,0 +1,15 @@
+from yam_agri_core.yam_agri_core.doctype.certificate import certificate
+from yam_agri_core.yam_agri_core.doctype.nonconformance import nonconformance
+from yam_agri_core.yam_agri_core.doctype.observation import observation
+from yam_agri_core.yam_agri_core.doctype.qc_test import qc_test
+from yam_agri_core.yam_agri_core.doctype.scale_ticket import scale_ticket
+
+
+def execute():
+	"""Add the (site, date, name) indexes EvidencePack collection pages through.
+
+	New installs get them from each controller's `on_doctype_update`; existing
+	sites only run that when the DocType itself changes.
+	"""
+	for controller in (qc_test, certificate, scale_ticket, observation, nonconformance):
+		controller.on_doctype_update()
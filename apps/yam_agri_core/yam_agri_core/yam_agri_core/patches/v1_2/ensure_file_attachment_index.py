@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+	"""Make sure File has the (attached_to_doctype, attached_to_name) index used for attachment counts.
+
+	Recent Frappe versions create it already; `add_index` is a no-op then.
+	"""
+	frappe.db.add_index("File", ["attached_to_doctype", "attached_to_name"])
@@ -0,0 +1,11 @@
+import frappe
+
+from yam_agri_core.yam_agri_core.traceability.closure import rebuild_all_lot_closure
+
+
+def execute():
+	"""Build the Lot genealogy closure table from existing Transfers."""
+	if not frappe.db.exists("DocType", "Lot Genealogy Link"):
+		return
+
+	rebuild_all_lot_closure()
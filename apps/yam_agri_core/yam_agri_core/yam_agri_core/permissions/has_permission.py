@@ -128,6 +128,24 @@ def evidence_pack_has_permission(doc, user: str | None = None, permission_type:
 	return _doctype_has_site_permission(doc, user=user, permission_type=permission_type)
 
 
+def lot_genealogy_link_has_permission(
+	doc, user: str | None = None, permission_type: str | None = None
+) -> bool:
+	return _doctype_has_site_permission(doc, user=user, permission_type=permission_type)
+
+
+def lot_quantity_ledger_entry_has_permission(
+	doc, user: str | None = None, permission_type: str | None = None
+) -> bool:
+	return _doctype_has_site_permission(doc, user=user, permission_type=permission_type)
+
+
+def evidence_blob_reference_has_permission(
+	doc, user: str | None = None, permission_type: str | None = None
+) -> bool:
+	return _doctype_has_site_permission(doc, user=user, permission_type=permission_type)
+
+
 def complaint_has_permission(doc, user: str | None = None, permission_type: str | None = None) -> bool:
 	return _doctype_has_site_permission(doc, user=user, permission_type=permission_type)
 
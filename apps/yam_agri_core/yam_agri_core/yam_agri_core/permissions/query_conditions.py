@@ -113,6 +113,18 @@ def evidence_pack_query_conditions(user: str) -> str | None:
 	return build_site_query_condition("EvidencePack", user=user)
 
 
+def lot_genealogy_link_query_conditions(user: str) -> str | None:
+	return build_site_query_condition("Lot Genealogy Link", user=user)
+
+
+def lot_quantity_ledger_entry_query_conditions(user: str) -> str | None:
+	return build_site_query_condition("Lot Quantity Ledger Entry", user=user)
+
+
+def evidence_blob_reference_query_conditions(user: str) -> str | None:
+	return build_site_query_condition("Evidence Blob Reference", user=user)
+
+
 def complaint_query_conditions(user: str) -> str | None:
 	return build_site_query_condition("Complaint", user=user)
 
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import Any
+
+import frappe
+from frappe import _
+
+
+def parse_lot_names(value: Any) -> list[str]:
+	"""Parse a Lot list argument: a list, a JSON array or a comma-separated string.
+
+	Blank entries are dropped and duplicates removed, keeping the first occurrence.
+	"""
+	if value in (None, ""):
+		return []
+	if isinstance(value, str):
+		text = value.strip()
+		value = frappe.parse_json(text) if text.startswith("[") else text.split(",")
+	if not isinstance(value, (list, tuple)):
+		frappe.throw(_("Lots must be a list of Lot names"), frappe.ValidationError)
+	return list(dict.fromkeys(str(item).strip() for item in value if str(item or "").strip()))
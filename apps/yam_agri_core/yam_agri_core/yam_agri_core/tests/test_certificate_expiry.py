@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import date
+
+from yam_agri_core.yam_agri_core.compliance import certificate_expiry as module
+
+TODAY = date(2026, 3, 10)
+
+
+def test_first_sweep_scans_from_today_to_horizon(monkeypatch):
+	calls: list[list] = []
+
+	def _fake_get_all(doctype, filters, **_kwargs):
+		calls.append(filters)
+		return [{"name": "CERT-1", "site": "SITE-A", "lot": "LOT-1", "expiry_date": "2026-03-20"}]
+
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+
+	rows = module.find_newly_expiring_certificates(TODAY, date(2026, 4, 9), {})
+
+	assert [row["name"] for row in rows] == ["CERT-1"]
+	assert calls == [[["expiry_date", ">", date(2026, 3, 9)], ["expiry_date", "<=", date(2026, 4, 9)]]]
+
+
+def test_later_sweeps_start_at_watermark_and_pick_up_edits(monkeypatch):
+	calls: list[list] = []
+
+	def _fake_get_all(doctype, filters, **_kwargs):
+		calls.append(filters)
+		if filters[0][0] == "modified":
+			return [{"name": "CERT-2", "site": "SITE-A", "lot": "LOT-2", "expiry_date": "2026-03-15"}]
+		return [{"name": "CERT-3", "site": "SITE-B", "lot": "LOT-3", "expiry_date": "2026-04-09"}]
+
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+	watermark = {"horizon": "2026-04-08", "scanned_at": "2026-03-09 02:00:00"}
+
+	rows = module.find_newly_expiring_certificates(TODAY, date(2026, 4, 9), watermark)
+
+	assert [row["name"] for row in rows] == ["CERT-2", "CERT-3"]
+	assert calls[0][0] == ["expiry_date", ">", date(2026, 4, 8)]
+	assert calls[1][0] == ["modified", ">", "2026-03-09 02:00:00"]
+
+
+def test_sweep_sends_one_digest_per_site_and_refreshes_lots(monkeypatch):
+	rows = [
+		{"name": "CERT-1", "site": "SITE-A", "lot": "LOT-1", "expiry_date": "2026-03-20"},
+		{"name": "CERT-2", "site": "SITE-A", "lot": "LOT-2", "expiry_date": "2026-03-21"},
+		{"name": "CERT-3", "site": "SITE-B", "lot": "LOT-1", "expiry_date": "2026-03-22"},
+	]
+	digests: list[tuple[str, int]] = []
+	refreshed: list[list[str]] = []
+	saved: list[date] = []
+
+	monkeypatch.setattr(module, "_today", lambda: TODAY)
+	monkeypatch.setattr(module, "_load_watermark", lambda: {})
+	monkeypatch.setattr(module, "find_newly_expiring_certificates", lambda *_args: rows)
+	monkeypatch.setattr(
+		module, "_send_site_digest", lambda site, certs, _h: digests.append((site, len(certs)))
+	)
+	monkeypatch.setattr(module, "refresh_lots_compliance", refreshed.append)
+	monkeypatch.setattr(module, "_save_watermark", lambda horizon, _scanned_at: saved.append(horizon))
+
+	result = module.sweep_certificate_expiry(days=30)
+
+	assert digests == [("SITE-A", 2), ("SITE-B", 1)]
+	assert refreshed == [["LOT-1", "LOT-2"]]
+	assert saved == [date(2026, 4, 9)]
+	assert result["certificate_count"] == 3
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from yam_agri_core.yam_agri_core.api import scale_ticket_import
+from yam_agri_core.yam_agri_core.doctype.device import device as module
+
+DEVICE_ROWS = [
+	{"name": "DEV-3", "device_name": "Scale B", "site": "SITE-A", "status": "Active"},
+	{"name": "DEV-2", "device_name": "Probe", "site": "SITE-B", "status": "Active"},
+	{"name": "DEV-1", "device_name": "Scale A", "site": "SITE-A", "status": "Inactive"},
+]
+
+
+def test_load_device_registry_indexes_labels_and_active_fallback(monkeypatch):
+	monkeypatch.setattr(module.frappe, "get_all", lambda *_args, **_kwargs: DEVICE_ROWS)
+
+	registry = module._load_device_registry()
+
+	assert set(registry["devices"]) == {"DEV-1", "DEV-2", "DEV-3"}
+	assert registry["by_label"][module._label_key("SITE-A", "Scale A")] == "DEV-1"
+	assert registry["active_by_site"] == {"SITE-A": "DEV-3", "SITE-B": "DEV-2"}
+
+
+def test_resolve_device_for_site_uses_registry_without_queries(monkeypatch):
+	monkeypatch.setattr(module.frappe, "get_all", lambda *_args, **_kwargs: DEVICE_ROWS)
+	registry = module._load_device_registry()
+	monkeypatch.setattr(module, "get_device_registry", lambda: registry)
+	monkeypatch.setattr(
+		module.frappe,
+		"db",
+		SimpleNamespace(get_value=lambda *_args, **_kwargs: (_ for _ in ()).throw(AssertionError())),
+	)
+
+	assert module.resolve_device_for_site("SITE-A", "DEV-1") == "DEV-1"
+	assert module.resolve_device_for_site("SITE-A", "Scale A") == "DEV-1"
+	assert module.resolve_device_for_site("SITE-A", "DEV-2") == "DEV-3"
+	assert module.resolve_device_for_site("SITE-A", "DEV-2", fallback_to_active=False) is None
+	assert module.resolve_device_for_site("SITE-C", "") is None
+	assert module.get_device_site("DEV-2") == "SITE-B"
+
+
+def test_scale_ticket_import_resolves_devices_through_registry(monkeypatch):
+	observed = {}
+
+	def _fake_resolve(site, device_ref):
+		observed["args"] = (site, device_ref)
+		return "DEV-9"
+
+	monkeypatch.setattr(scale_ticket_import, "resolve_device_for_site", _fake_resolve)
+
+	assert scale_ticket_import._resolve_device_for_site("SITE-A", "Scale A") == "DEV-9"
+	assert observed["args"] == ("SITE-A", "Scale A")
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from yam_agri_core.yam_agri_core.compliance import dispatch_gate as module
+from yam_agri_core.yam_agri_core.doctype.lot import lot as lot_module
+
+TODAY = date(2026, 3, 10)
+
+POLICY = {
+	"name": "POL-1",
+	"mandatory_test_types": "Moisture,\nAflatoxin",
+	"mandatory_certificate_types": "COA, Phyto",
+	"max_test_age_days": 7,
+	"enforce_dispatch_gate": 1,
+}
+
+EVIDENCE = {
+	"qc_tests": [
+		{
+			"name": "QC-3",
+			"site": "SITE-A",
+			"test_type": "Moisture",
+			"pass_fail": "Pass",
+			"test_date": "2026-03-08",
+		},
+		{
+			"name": "QC-2",
+			"site": "SITE-A",
+			"test_type": "Aflatoxin",
+			"pass_fail": "Fail",
+			"test_date": "2026-03-09",
+		},
+		{
+			"name": "QC-1",
+			"site": "SITE-A",
+			"test_type": "Aflatoxin",
+			"pass_fail": "Pass",
+			"test_date": "2026-02-01",
+		},
+		{
+			"name": "QC-0",
+			"site": "SITE-B",
+			"test_type": "Aflatoxin",
+			"pass_fail": "Pass",
+			"test_date": "2026-03-09",
+		},
+	],
+	"certificates": [
+		{"name": "CERT-3", "site": "SITE-A", "cert_type": "COA", "expiry_date": "2027-01-01"},
+		{"name": "CERT-2", "site": "SITE-A", "cert_type": "Phyto", "expiry_date": "2026-03-01"},
+		{"name": "CERT-1", "site": "SITE-A", "cert_type": "Phyto", "expiry_date": "2027-01-01"},
+	],
+}
+
+
+def test_evaluate_dispatch_requirements_uses_latest_evidence_per_type():
+	result = module.evaluate_dispatch_requirements(POLICY, EVIDENCE, "SITE-A", today=TODAY)
+
+	assert result["max_test_age_days"] == 7
+	# Only a stale pass exists for Aflatoxin at SITE-A; the SITE-B pass does not count.
+	assert result["missing_or_stale_tests"] == ["Aflatoxin"]
+	# The most recently modified Phyto certificate is expired.
+	assert result["missing_or_expired_certificates"] == ["Phyto"]
+
+
+def test_evaluate_dispatch_requirements_without_policy_requires_nothing():
+	result = module.evaluate_dispatch_requirements(None, {"qc_tests": [], "certificates": []}, "SITE-A")
+
+	assert result["missing_or_stale_tests"] == []
+	assert result["missing_or_expired_certificates"] == []
+
+
+def test_find_expired_certificates_filters_by_site_and_orders_by_expiry():
+	certificates = [
+		*EVIDENCE["certificates"],
+		{"name": "CERT-9", "site": "SITE-B", "cert_type": "COA", "expiry_date": "2025-01-01"},
+		{"name": "CERT-8", "site": "SITE-A", "cert_type": "COA", "expiry_date": "2025-06-01"},
+	]
+
+	assert [row["name"] for row in module.find_expired_certificates(certificates, today=TODAY)] == [
+		"CERT-9",
+		"CERT-8",
+		"CERT-2",
+	]
+	assert [row["name"] for row in module.find_expired_certificates(certificates, "SITE-A", TODAY)] == [
+		"CERT-8",
+		"CERT-2",
+	]
+
+
+def test_lot_validation_fetches_evidence_once(monkeypatch):
+	calls: list[str] = []
+
+	def _fake_get_all(doctype, **_kwargs):
+		calls.append(doctype)
+		return EVIDENCE["qc_tests"] if doctype == "QCTest" else EVIDENCE["certificates"][:1]
+
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+	monkeypatch.setattr(module, "_today", lambda: TODAY)
+	monkeypatch.setattr(lot_module, "get_active_season_policy", lambda _site, _crop: POLICY)
+
+	evidence = module.get_lot_evidence("LOT-001")
+	lot_module.check_certificates_for_dispatch("LOT-001", "For Dispatch", evidence)
+
+	class _Lot:
+		name = "LOT-001"
+
+		def get(self, key):
+			return {"site": "SITE-A", "crop": "Wheat", "status": "For Dispatch"}.get(key)
+
+	with pytest.raises(module.frappe.ValidationError, match="Aflatoxin"):
+		lot_module._validate_season_policy_for_dispatch(_Lot(), evidence)
+
+	assert calls == ["QCTest", "Certificate"]
+
+
+class _SavedLot:
+	name = "LOT-001"
+
+	def __init__(self, status, changed=()):
+		self.values = {"site": "SITE-A", "crop": "", "status": status}
+		self.changed = set(changed)
+		self.updated = None
+
+	def get(self, key):
+		return self.values.get(key)
+
+	def is_new(self):
+		return False
+
+	def has_value_changed(self, fieldname):
+		return fieldname in self.changed
+
+	def update(self, values):
+		self.updated = values
+
+
+def test_lot_validate_recomputes_compliance_only_when_it_can_change(monkeypatch):
+	fetched: list[str] = []
+	monkeypatch.setattr(lot_module, "assert_site_access", lambda _site: None)
+	monkeypatch.setattr(lot_module, "get_lot_evidence", lambda name: fetched.append(name) or EVIDENCE)
+	monkeypatch.setattr(lot_module, "count_open_nonconformance", lambda _name: 0)
+	monkeypatch.setattr(lot_module, "get_active_season_policy", lambda _site, _crop: None)
+	monkeypatch.setattr(lot_module, "compute_lot_compliance", lambda *_args: {"dispatch_ready": 0})
+
+	unrelated = _SavedLot("Draft")
+	lot_module.Lot.validate(unrelated)
+	assert fetched == []
+	assert unrelated.updated is None
+
+	moved = _SavedLot("Draft", changed={"site"})
+	lot_module.Lot.validate(moved)
+	assert fetched == ["LOT-001"]
+	assert moved.updated == {"dispatch_ready": 0}
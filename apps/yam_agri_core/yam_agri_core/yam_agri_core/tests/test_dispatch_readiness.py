@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from datetime import date
+from types import SimpleNamespace
+
+from yam_agri_core.yam_agri_core.api import dispatch_readiness as module
+
+POLICY = {
+	"name": "POL-1",
+	"required_tests": ["Moisture"],
+	"required_certificates": [],
+	"max_test_age_days": 7,
+	"enforce_dispatch_gate": 1,
+}
+
+LOT_ROWS = [
+	{"name": "LOT-1", "lot_number": "L1", "site": "SITE-A", "crop": "Wheat", "status": "Accepted"},
+	{"name": "LOT-2", "lot_number": "L2", "site": "SITE-A", "crop": "Wheat", "status": "Accepted"},
+	{"name": "LOT-3", "lot_number": "L3", "site": "SITE-A", "crop": "Barley", "status": "Draft"},
+]
+
+QC_ROWS = [
+	{
+		"name": "QC-1",
+		"lot": "LOT-1",
+		"site": "SITE-A",
+		"test_type": "Moisture",
+		"pass_fail": "Pass",
+		"test_date": "2026-03-09",
+	},
+	{
+		"name": "QC-2",
+		"lot": "LOT-2",
+		"site": "SITE-A",
+		"test_type": "Moisture",
+		"pass_fail": "Pass",
+		"test_date": "2026-01-01",
+	},
+]
+
+CERT_ROWS = [
+	{"name": "CERT-1", "lot": "LOT-1", "site": "SITE-A", "cert_type": "COA", "expiry_date": "2027-01-01"},
+]
+
+
+def test_get_dispatch_readiness_evaluates_lots_set_wise(monkeypatch):
+	calls: list[str] = []
+	checked_sites: list[str] = []
+
+	def _fake_get_all(doctype, **_kwargs):
+		calls.append(doctype)
+		return {"Lot": LOT_ROWS, "QCTest": QC_ROWS, "Certificate": CERT_ROWS}[doctype]
+
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+	monkeypatch.setattr(module, "_today", lambda: date(2026, 3, 10))
+	monkeypatch.setattr(module, "assert_site_access", checked_sites.append)
+	monkeypatch.setattr(
+		module, "get_active_season_policy", lambda _site, crop: POLICY if crop == "Wheat" else None
+	)
+
+	result = module.get_dispatch_readiness(lots='["LOT-1", "LOT-2", "LOT-3", "LOT-404"]')
+
+	assert calls == ["Lot", "QCTest", "Certificate"]
+	assert checked_sites == ["SITE-A"]
+	assert result["ready_count"] == 1
+	assert result["not_found"] == ["LOT-404"]
+
+	by_lot = {row["lot"]: row for row in result["lots"]}
+	assert by_lot["LOT-1"]["dispatch_ready"] is True
+	assert [reason["code"] for reason in by_lot["LOT-2"]["blocking_reasons"]] == ["missing_or_stale_tests"]
+	assert by_lot["LOT-2"]["blocking_reasons"][0]["items"] == ["Moisture"]
+	assert [reason["code"] for reason in by_lot["LOT-3"]["blocking_reasons"]] == ["no_active_policy"]
+
+
+def test_get_dispatch_readiness_without_site_access_returns_empty(monkeypatch):
+	monkeypatch.setattr(module.frappe, "session", SimpleNamespace(user="field.user@example.com"))
+	monkeypatch.setattr(module.frappe, "get_roles", lambda _user: ["Field User"])
+	monkeypatch.setattr(module, "get_allowed_sites", lambda user=None: [])
+	monkeypatch.setattr(
+		module.frappe, "get_all", lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError())
+	)
+
+	result = module.get_dispatch_readiness()
+
+	assert result["lot_count"] == 0
+	assert result["lots"] == []
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import hashlib
+import io
+
+from yam_agri_core.yam_agri_core.evidence import attachments as module
+
+
+def test_iter_attachments_preserves_order_and_hashes_small_files(tmp_path):
+	paths = []
+	for index in range(25):
+		path = tmp_path / f"file-{index}.bin"
+		path.write_bytes(bytes([index]) * (index + 1))
+		paths.append(path)
+	paths.insert(3, None)
+	paths.insert(7, tmp_path / "missing.bin")
+
+	results = list(module.iter_attachments(paths, workers=4))
+
+	assert [result.get("path") for result in results] == paths
+	assert [result["ok"] for result in results].count(False) == 2
+	first = results[0]
+	assert first["size"] == 1
+	assert first["sha256"] == hashlib.sha256(b"\x00").hexdigest()
+
+
+def test_large_attachments_are_streamed_and_hashed_while_copying(tmp_path, monkeypatch):
+	monkeypatch.setattr(module, "PREFETCH_MAX_BYTES", 10)
+	path = tmp_path / "scan.pdf"
+	payload = b"0123456789" * 50
+	path.write_bytes(payload)
+
+	result = module.read_attachment(path)
+	assert result["content"] is None
+	assert result["size"] == len(payload)
+
+	target = io.BytesIO()
+	with path.open("rb") as source:
+		size, sha256 = module.copy_with_digest(source, target, block_size=64)
+
+	assert size == len(payload)
+	assert sha256 == hashlib.sha256(payload).hexdigest()
+	assert target.getvalue() == payload
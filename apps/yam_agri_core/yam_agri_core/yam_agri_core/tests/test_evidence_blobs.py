@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+from types import SimpleNamespace
+
+from yam_agri_core.yam_agri_core.evidence import blobs as module
+
+
+def _site_path(tmp_path):
+	return lambda *parts: str(tmp_path.joinpath(*parts))
+
+
+def _patch_blob_rows(monkeypatch, rows):
+	"""Fake Evidence Blob rows: sha256 -> last_referenced."""
+	touched = []
+
+	def _set_value(doctype, name, fieldname, value, update_modified=True):
+		rows[name] = value
+		touched.append(name)
+
+	monkeypatch.setattr(module.utils, "now_datetime", lambda: "2026-10-19 10:00:00")
+	monkeypatch.setattr(
+		module.frappe,
+		"db",
+		SimpleNamespace(
+			get_value=lambda doctype, name, fieldname, for_update=False: name if name in rows else None,
+			set_value=_set_value,
+		),
+	)
+	return touched
+
+
+def test_store_blob_keeps_one_copy_of_identical_content(monkeypatch, tmp_path):
+	monkeypatch.setattr(module.frappe, "get_site_path", _site_path(tmp_path))
+	rows = {}
+	touched = _patch_blob_rows(monkeypatch, rows)
+	monkeypatch.setattr(
+		module.frappe, "generate_hash", lambda length=12: f"tmp{len(list(tmp_path.rglob('*')))}"
+	)
+	first = tmp_path / "pack-a-certificate.pdf"
+	second = tmp_path / "pack-b-certificate.pdf"
+	first.write_bytes(b"%PDF lab certificate")
+	second.write_bytes(b"%PDF lab certificate")
+	expected = hashlib.sha256(b"%PDF lab certificate").hexdigest()
+
+	assert module.store_blob(first) == (expected, 20)
+	rows[expected] = "2026-01-01 00:00:00"
+	assert module.store_blob(second, expected) == (expected, 20)
+	assert touched == [expected]
+	assert rows[expected] == "2026-10-19 10:00:00"
+
+	stored = [path for path in (tmp_path / "private" / "evidence_blobs").rglob("*") if path.is_file()]
+	assert stored == [tmp_path / "private" / "evidence_blobs" / expected[:2] / expected]
+	assert stored[0].read_bytes() == b"%PDF lab certificate"
+
+	# The blob is a copy, so rewriting the attachment in place leaves it intact.
+	with first.open("wb+") as rewritten:
+		rewritten.write(b"%PDF optimized")
+	assert stored[0].read_bytes() == b"%PDF lab certificate"
+	assert stored[0].stat().st_nlink == 1
+
+
+def test_store_blob_names_the_blob_by_the_copied_content(monkeypatch, tmp_path):
+	monkeypatch.setattr(module.frappe, "get_site_path", _site_path(tmp_path))
+	_patch_blob_rows(monkeypatch, {})
+	monkeypatch.setattr(module.frappe, "generate_hash", lambda length=12: "tmp")
+	source = tmp_path / "changed-after-hashing.pdf"
+	source.write_bytes(b"%PDF current content")
+	stale = hashlib.sha256(b"%PDF content when hashed").hexdigest()
+
+	digest, size = module.store_blob(source, stale)
+
+	assert digest == hashlib.sha256(b"%PDF current content").hexdigest()
+	assert size == 20
+	assert module.blob_path(digest).read_bytes() == b"%PDF current content"
+	assert not module.blob_path(stale).exists()
+
+
+def test_store_blob_rewrites_a_file_whose_row_was_collected(monkeypatch, tmp_path):
+	monkeypatch.setattr(module.frappe, "get_site_path", _site_path(tmp_path))
+	monkeypatch.setattr(module.frappe, "generate_hash", lambda length=12: "tmp")
+	_patch_blob_rows(monkeypatch, {})
+	source = tmp_path / "lab.pdf"
+	source.write_bytes(b"%PDF lab")
+	digest = hashlib.sha256(b"%PDF lab").hexdigest()
+	# The collector deleted the row and is about to unlink the file.
+	stale = module.blob_path(digest)
+	stale.parent.mkdir(parents=True)
+	stale.write_bytes(b"%PDF lab")
+	stale_inode = stale.stat().st_ino
+
+	assert module.store_blob(source, digest) == (digest, 8)
+	assert stale.stat().st_ino != stale_inode
+
+
+def test_collect_unreferenced_blobs_rechecks_grace_period_when_deleting(monkeypatch, tmp_path):
+	deletes = []
+	monkeypatch.setattr(module.frappe, "get_site_path", _site_path(tmp_path))
+	monkeypatch.setattr(module.utils, "now_datetime", lambda: datetime.datetime(2026, 10, 19, 10, 0))
+	monkeypatch.setattr(
+		module.frappe, "get_all", lambda doctype, filters=None, pluck=None, **_kwargs: ["d" * 64]
+	)
+	monkeypatch.setattr(
+		module.frappe, "db", SimpleNamespace(delete=lambda doctype, filters: deletes.append(filters))
+	)
+
+	assert module.collect_unreferenced_blobs() == 0
+	assert deletes[0]["last_referenced"] == [
+		"<",
+		datetime.datetime(2026, 10, 19, 10, 0) - datetime.timedelta(hours=24),
+	]
+	assert deletes[0]["ref_count"] == ["<=", 0]
+
+
+def test_blob_path_rejects_non_digest_names(monkeypatch, tmp_path):
+	monkeypatch.setattr(module.frappe, "get_site_path", _site_path(tmp_path))
+	monkeypatch.setattr(module, "_", lambda text: text)
+
+	def _throw(message, exc=None):
+		raise (exc or Exception)(message)
+
+	monkeypatch.setattr(module.frappe, "throw", _throw)
+	try:
+		module.blob_path("../../site_config.json")
+	except module.frappe.ValidationError:
+		pass
+	else:
+		raise AssertionError("path-like digest must be rejected")
+
+
+def test_sync_pack_blob_references_adjusts_ref_counts_by_difference(monkeypatch):
+	adjustments, inserted, deleted = [], [], []
+	sha_kept, sha_new, sha_dropped = "a" * 64, "b" * 64, "c" * 64
+
+	def _get_all(doctype, filters=None, pluck=None, **_kwargs):
+		if doctype == module.BLOB_REFERENCE_DOCTYPE:
+			return [sha_kept, sha_dropped]
+		return [sha for sha in filters["name"][1] if sha == sha_kept]
+
+	monkeypatch.setattr(module.frappe, "get_all", _get_all)
+	monkeypatch.setattr(module.frappe, "session", SimpleNamespace(user="qa.manager@example.com"))
+	monkeypatch.setattr(module.frappe, "generate_hash", lambda length=12: "ref")
+	monkeypatch.setattr(module.utils, "now_datetime", lambda: "2026-10-19 10:00:00")
+	monkeypatch.setattr(
+		module.frappe,
+		"db",
+		SimpleNamespace(
+			bulk_insert=lambda doctype, fields, values, **kwargs: inserted.append((doctype, values)),
+			delete=lambda doctype, filters: deleted.append(filters["blob"][1]),
+			sql=lambda query, values: adjustments.append((values["delta"], values["names"])),
+		),
+	)
+
+	result = module.sync_pack_blob_references("EP-1", "SITE-A", {sha_kept: 10, sha_new: 20})
+
+	assert result == {"added": 1, "removed": 1, "referenced": 2}
+	assert inserted[0][0] == module.BLOB_DOCTYPE
+	assert inserted[0][1][0][5:] == (sha_new, 20, 0)
+	assert inserted[1][1][0][5:] == (sha_new, "EP-1", "SITE-A")
+	assert deleted == [[sha_dropped]]
+	assert adjustments == [(1, (sha_new,)), (-1, (sha_dropped,))]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import datetime
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from werkzeug.test import EnvironBuilder
+
+from yam_agri_core.yam_agri_core.evidence import downloads as module
+
+NOW = datetime.datetime(2026, 10, 19, 9, 0, 0)
+
+
+class _Denied(Exception):
+	pass
+
+
+def _patch_frappe(monkeypatch, tmp_path, request_headers=None, now=NOW):
+	def _throw(message, exc=None):
+		raise _Denied(message)
+
+	monkeypatch.setattr(module, "get_encryption_key", lambda: "site-encryption-key")
+	monkeypatch.setattr(module.utils, "now_datetime", lambda: now)
+	monkeypatch.setattr(module, "_", lambda text: text)
+	monkeypatch.setattr(module.frappe, "throw", _throw)
+	monkeypatch.setattr(module.frappe, "get_site_path", lambda *parts: str(tmp_path.joinpath(*parts)))
+	monkeypatch.setattr(
+		module.frappe,
+		"get_request_header",
+		lambda key, default=None: (request_headers or {}).get(key, default),
+	)
+
+
+def _query(url):
+	return {key: values[0] for key, values in parse_qs(urlparse(url).query).items()}
+
+
+def test_signed_download_url_verifies_until_it_expires(monkeypatch, tmp_path):
+	_patch_frappe(monkeypatch, tmp_path)
+	url, expires = module.signed_download_url("EP-1", "zip", "/private/files/EP-1-evidence-pack.zip")
+	query = _query(url)
+
+	assert url.startswith("/api/method/yam_agri_core.yam_agri_core.api.evidence_pack.download_evidence_file?")
+	assert int(query["expires"]) == expires == int(NOW.timestamp()) + module.DOWNLOAD_TOKEN_TTL
+	module.verify_download_signature(
+		"EP-1", "zip", "/private/files/EP-1-evidence-pack.zip", query["expires"], query["signature"]
+	)
+
+	later = NOW + datetime.timedelta(seconds=module.DOWNLOAD_TOKEN_TTL + 1)
+	monkeypatch.setattr(module.utils, "now_datetime", lambda: later)
+	with pytest.raises(_Denied, match="expired"):
+		module.verify_download_signature(
+			"EP-1", "zip", "/private/files/EP-1-evidence-pack.zip", query["expires"], query["signature"]
+		)
+
+
+def test_download_signature_is_bound_to_pack_format_file_and_expiry(monkeypatch, tmp_path):
+	_patch_frappe(monkeypatch, tmp_path)
+	url, expires = module.signed_download_url("EP-1", "pdf", "/private/files/EP-1-evidence-pack.pdf")
+	signature = _query(url)["signature"]
+
+	for pack, fmt, file_url, expiry in (
+		("EP-2", "pdf", "/private/files/EP-1-evidence-pack.pdf", expires),
+		("EP-1", "zip", "/private/files/EP-1-evidence-pack.pdf", expires),
+		("EP-1", "pdf", "/private/files/EP-1-evidence-packa1b2.pdf", expires),
+		("EP-1", "pdf", "/private/files/EP-1-evidence-pack.pdf", expires + 3600),
+	):
+		with pytest.raises(_Denied, match="Invalid download link"):
+			module.verify_download_signature(pack, fmt, file_url, expiry, signature)
+
+
+def test_file_response_hands_off_to_nginx_when_it_asks_for_x_accel_redirect(monkeypatch, tmp_path):
+	_patch_frappe(monkeypatch, tmp_path, request_headers={"X-Use-X-Accel-Redirect": "True"})
+	path = tmp_path / "private" / "files" / "EP 1.zip"
+	path.parent.mkdir(parents=True)
+	path.write_bytes(b"PK" * 1024)
+
+	response = module.file_response(path, "EP 1.zip")
+
+	assert response.headers["X-Accel-Redirect"] == "/protected/private/files/EP%201.zip"
+	assert response.headers["Content-Disposition"].startswith("attachment")
+	assert response.mimetype == "application/zip"
+	assert response.get_data() == b""
+
+
+def test_file_response_answers_range_requests_without_nginx(monkeypatch, tmp_path):
+	environ = EnvironBuilder(headers={"Range": "bytes=2-5"}).get_environ()
+	_patch_frappe(monkeypatch, tmp_path)
+	monkeypatch.setattr(module.frappe, "local", SimpleNamespace(request=SimpleNamespace(environ=environ)))
+	path = tmp_path / "private" / "files" / "EP-1.pdf"
+	path.parent.mkdir(parents=True)
+	path.write_bytes(b"%PDF-1.7 evidence")
+
+	response = module.file_response(path, "EP-1.pdf")
+	response.direct_passthrough = False
+
+	assert response.status_code == 206
+	assert response.headers["Content-Range"] == "bytes 2-5/17"
+	assert response.get_data() == b"DF-1"
+	assert "X-Accel-Redirect" not in response.headers
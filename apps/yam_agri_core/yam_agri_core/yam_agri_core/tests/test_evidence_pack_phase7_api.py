@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import zipfile
 from types import SimpleNamespace
 
 from yam_agri_core.yam_agri_core.api import evidence_pack as module
@@ -15,8 +18,11 @@ class DummyEvidencePack:
 		self.record_count = 0
 		self.pdf_file = ""
 		self.zip_file = ""
+		self.pdf_export_hash = ""
+		self.zip_export_hash = ""
 		self.rows = []
 		self.saved = False
+		self.db_values = {}
 
 	def get(self, key):
 		if key == "linked_documents":
@@ -37,51 +43,244 @@ class DummyEvidencePack:
 	def save(self):
 		self.saved = True
 
+	def db_set(self, values):
+		self.db_values.update(values)
+		for key, value in values.items():
+			setattr(self, key, value)
+
 	def check_permission(self, permission_type):
 		_ = permission_type
 
 
+def _patch_cache(monkeypatch, store):
+	def _set_value(key, value, expires_in_sec=None):
+		store[key] = value
+
+	monkeypatch.setattr(module.frappe, "cache", SimpleNamespace(get_value=store.get, set_value=_set_value))
+
+
 def test_generate_evidence_pack_links_sets_ready_and_counts(monkeypatch):
+	_patch_cache(monkeypatch, {})
 	doc = DummyEvidencePack(status="Draft")
-	rows = [
-		{"source_doctype": "QCTest", "source_name": "QCT-1", "site": "SITE-A", "document_date": "2026-02-27"},
-		{"source_doctype": "Certificate", "source_name": "CERT-1", "site": "SITE-A", "document_date": "2026-02-27"},
-	]
-	counts = {"QCTest": 1, "Certificate": 1}
+	rows = {
+		"QCTest": [
+			{
+				"source_doctype": "QCTest",
+				"source_name": "QCT-1",
+				"site": "SITE-A",
+				"document_date": "2026-02-27",
+			},
+		],
+		"Certificate": [
+			{"source_doctype": "Certificate", "source_name": "CERT-2", "document_date": "2026-02-28"},
+			{"source_doctype": "Certificate", "source_name": "CERT-1", "document_date": "2026-02-26"},
+		],
+	}
+	deleted, inserted = [], []
 
 	monkeypatch.setattr(module, "_assert_role_gate", lambda _label: None)
 	monkeypatch.setattr(module, "_resolve_evidence_pack_doc", lambda _name, permission_type="write": doc)
-	monkeypatch.setattr(module, "_collect_scope_rows", lambda _doc, include_quarantine=True: (rows, counts))
+	monkeypatch.setattr(
+		module,
+		"_iter_source_rows",
+		lambda _doc, config, modified_since=None: iter(rows.get(config["doctype"], [])),
+	)
 	monkeypatch.setattr(module.frappe, "session", SimpleNamespace(user="qa.manager@example.com"))
 	monkeypatch.setattr(module.frappe.utils, "now_datetime", lambda: "2026-02-27 18:00:00")
+	monkeypatch.setattr(module.frappe, "generate_hash", lambda length=10: "hash")
+	monkeypatch.setattr(
+		module.frappe,
+		"db",
+		SimpleNamespace(
+			delete=lambda doctype, filters: deleted.append(filters),
+			bulk_insert=lambda doctype, fields, values, chunk_size=None: inserted.extend(values),
+		),
+	)
 
 	result = module.generate_evidence_pack_links("YAM-EP-TEST-0001", rebuild=1, include_quarantine=1)
 
 	assert result["ok"] is True
-	assert result["record_count"] == 2
+	assert result["record_count"] == 3
 	assert result["counts"]["QCTest"] == 1
+	assert result["counts"]["Certificate"] == 2
 	assert doc.status == "Ready"
 	assert doc.generated_by == "qa.manager@example.com"
-	assert len(doc.rows) == 2
-	assert doc.saved is True
+	assert deleted == [{"parent": "YAM-EP-TEST-0001", "parenttype": "EvidencePack"}]
+	# streams are merged newest first and numbered in that order
+	assert [(row[8], row[10]) for row in inserted] == [(1, "CERT-2"), (2, "QCT-1"), (3, "CERT-1")]
+	assert doc.db_values["record_count"] == 3
+
+
+def test_generate_evidence_pack_links_incremental_applies_only_the_delta(monkeypatch):
+	_patch_cache(monkeypatch, {})
+	doc = DummyEvidencePack(status="Ready")
+	doc.generated_at = "2026-02-27 18:00:00"
+	doc.generated_scope = module._generation_scope(doc, True)
+	doc.rows = [
+		SimpleNamespace(name="row-1", idx=1, source_doctype="QCTest", source_name="QCT-1", status="Pass"),
+		SimpleNamespace(name="row-2", idx=2, source_doctype="QCTest", source_name="QCT-2", status="Pass"),
+		SimpleNamespace(name="row-3", idx=3, source_doctype="QCTest", source_name="QCT-3", status="Pass"),
+	]
+	for row in doc.rows:
+		row.get = lambda key, _row=row: getattr(_row, key, None)
+	changed = [
+		{"source_doctype": "QCTest", "source_name": "QCT-1", "status": "Fail", "summary": "re-tested"},
+		{"source_doctype": "QCTest", "source_name": "QCT-9", "status": "Pass"},
+	]
+	updates, deletes, inserts = [], [], []
+
+	def _fake_get_all(doctype, **kwargs):
+		if doctype == "QCTest":
+			# QCT-2 untouched, QCT-3 deleted
+			return [{"name": "QCT-2", "modified": "2026-02-01 00:00:00"}]
+		return [{"source_doctype": "QCTest", "row_count": 3}]
+
+	monkeypatch.setattr(module, "_assert_role_gate", lambda _label: None)
+	monkeypatch.setattr(module, "_resolve_evidence_pack_doc", lambda _name, permission_type="write": doc)
+	monkeypatch.setattr(
+		module,
+		"_collect_scope_rows",
+		lambda _doc, include_quarantine=True, modified_since=None: (changed, {"QCTest": 2}),
+	)
+	monkeypatch.setattr(module.frappe, "session", SimpleNamespace(user="qa.manager@example.com"))
+	monkeypatch.setattr(module.frappe.utils, "now_datetime", lambda: "2026-02-28 09:00:00")
+	monkeypatch.setattr(module.frappe.utils, "get_datetime", lambda value: str(value))
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+	monkeypatch.setattr(module.frappe, "generate_hash", lambda length=10: "hash")
+	monkeypatch.setattr(
+		module.frappe,
+		"db",
+		SimpleNamespace(
+			set_value=lambda doctype, name, values, update_modified=True: updates.append((name, values)),
+			delete=lambda doctype, filters: deletes.extend(filters["name"][1]),
+			bulk_insert=lambda doctype, fields, values, chunk_size=None: inserts.extend(values),
+		),
+	)
+
+	result = module.generate_evidence_pack_links("YAM-EP-TEST-0001", rebuild=0)
+
+	assert result["mode"] == "incremental"
+	assert (result["inserted"], result["updated"], result["deleted"]) == (1, 1, 1)
+	assert [name for name, _values in updates] == ["row-1"]
+	assert deletes == ["row-3"]
+	assert inserts[0][5:9] == ("YAM-EP-TEST-0001", "EvidencePack", "linked_documents", 4)
+	assert result["record_count"] == 3
+	assert doc.db_values["generated_at"] == "2026-02-28 09:00:00"
+	assert doc.saved is False
 
 
 def test_export_evidence_pack_zip_sets_zip_file(monkeypatch):
+	_patch_cache(monkeypatch, {})
 	doc = DummyEvidencePack(status="Ready")
 	doc.rows = [{"source_doctype": "QCTest", "source_name": "QCT-1"}]
 
 	monkeypatch.setattr(module, "_assert_role_gate", lambda _label: None)
 	monkeypatch.setattr(module, "_resolve_evidence_pack_doc", lambda _name, permission_type="write": doc)
 	monkeypatch.setattr(module, "_collect_zip_sources", lambda _doc: [])
-	monkeypatch.setattr(module, "_build_zip_bytes", lambda _doc, _files, _counts: b"zip-bytes")
-	monkeypatch.setattr(module, "save_file", lambda *args, **kwargs: SimpleNamespace(file_url="/private/files/ep.zip"))
+	monkeypatch.setattr(
+		module,
+		"_build_zip_file",
+		lambda _doc, _files, _counts, progress=None, blob_refs=None: SimpleNamespace(
+			file_url="/private/files/ep.zip"
+		),
+	)
 
 	result = module.export_evidence_pack_zip("YAM-EP-TEST-0001")
 
 	assert result["ok"] is True
 	assert result["zip_file"] == "/private/files/ep.zip"
+	assert result["cached"] is False
 	assert doc.zip_file == "/private/files/ep.zip"
-	assert doc.saved is True
+	assert len(doc.zip_export_hash) == 64
+	assert doc.db_values["zip_file"] == "/private/files/ep.zip"
+
+
+def test_export_evidence_pack_zip_reuses_unchanged_export(monkeypatch, tmp_path):
+	(tmp_path / "private" / "files").mkdir(parents=True)
+	(tmp_path / "private" / "files" / "ep.zip").write_bytes(b"PK")
+	doc = DummyEvidencePack(status="Ready")
+	doc.rows = [{"source_doctype": "QCTest", "source_name": "QCT-1"}]
+	files = [{"name": "F-1", "file_url": "/private/files/lab.pdf", "content_hash": "abc", "file_size": 4}]
+	doc.zip_file = "/private/files/ep.zip"
+	doc.zip_export_hash = module._export_fingerprint(doc, "zip", module._linked_rows(doc), files)
+
+	def _fail_build(*_args, **_kwargs):
+		raise AssertionError("unchanged pack must not be rebuilt")
+
+	monkeypatch.setattr(module, "_assert_role_gate", lambda _label: None)
+	monkeypatch.setattr(module, "_resolve_evidence_pack_doc", lambda _name, permission_type="write": doc)
+	monkeypatch.setattr(module, "_collect_zip_sources", lambda _doc: files)
+	monkeypatch.setattr(module, "_build_zip_file", _fail_build)
+	monkeypatch.setattr(module.frappe, "get_site_path", lambda *parts: str(tmp_path.joinpath(*parts)))
+
+	result = module.export_evidence_pack_zip("YAM-EP-TEST-0001")
+
+	assert result["cached"] is True
+	assert result["zip_file"] == "/private/files/ep.zip"
+	assert doc.db_values == {}
+
+	# a changed attachment digest invalidates the cached export
+	files[0]["content_hash"] = "def"
+	fingerprint = module._export_fingerprint(doc, "zip", module._linked_rows(doc), files)
+	assert module._cached_export_url(doc, "zip", fingerprint) == ""
+
+
+def test_enqueue_evidence_pack_export_queues_deduplicated_job(monkeypatch):
+	doc = DummyEvidencePack(status="Ready")
+	enqueued = []
+
+	monkeypatch.setattr(module, "_assert_role_gate", lambda _label: None)
+	monkeypatch.setattr(module, "_resolve_evidence_pack_doc", lambda _name, permission_type="write": doc)
+	monkeypatch.setattr(module, "pdf_template_version", lambda: "template-sha")
+	monkeypatch.setattr(module, "_accepted_ai_narrative", lambda _doc: "")
+	monkeypatch.setattr(module.frappe, "session", SimpleNamespace(user="qa.manager@example.com"))
+	monkeypatch.setattr(module.frappe, "enqueue", lambda method, **kwargs: enqueued.append((method, kwargs)))
+
+	result = module.enqueue_evidence_pack_export("YAM-EP-TEST-0001", export_format="PDF")
+
+	assert result["queued"] is True
+	assert result["job_id"] == "evidence-pack-export::YAM-EP-TEST-0001::pdf"
+	method, kwargs = enqueued[0]
+	assert method.endswith("api.evidence_pack.run_evidence_pack_export")
+	assert kwargs["deduplicate"] is True
+	assert kwargs["export_format"] == "pdf"
+	assert kwargs["user"] == "qa.manager@example.com"
+
+
+def test_zip_export_jobs_and_progress_events_are_keyed_by_layout(monkeypatch):
+	doc = DummyEvidencePack(status="Ready")
+	enqueued, events = [], []
+
+	monkeypatch.setattr(module, "_assert_role_gate", lambda _label: None)
+	monkeypatch.setattr(module, "_resolve_evidence_pack_doc", lambda _name, permission_type="write": doc)
+	monkeypatch.setattr(module, "_collect_zip_sources", lambda _doc: [])
+	monkeypatch.setattr(module.frappe, "session", SimpleNamespace(user="qa.manager@example.com"))
+	monkeypatch.setattr(module.frappe, "enqueue", lambda method, **kwargs: enqueued.append(kwargs))
+
+	bundle = module.enqueue_evidence_pack_export("YAM-EP-TEST-0001", export_format="zip")
+	referenced = module.enqueue_evidence_pack_export(
+		"YAM-EP-TEST-0001", export_format="zip", layout="referenced"
+	)
+
+	assert bundle["job_id"] == "evidence-pack-export::YAM-EP-TEST-0001::zip::bundle"
+	assert referenced["job_id"] == "evidence-pack-export::YAM-EP-TEST-0001::zip::referenced"
+	assert referenced["layout"] == "referenced"
+	assert [kwargs["layout"] for kwargs in enqueued] == ["bundle", "referenced"]
+
+	monkeypatch.setattr(module.frappe, "get_doc", lambda doctype, name: doc)
+	monkeypatch.setattr(
+		module.frappe, "publish_realtime", lambda event, payload, **kwargs: events.append(payload)
+	)
+	monkeypatch.setitem(
+		module._EXPORTERS,
+		"zip",
+		lambda _doc, progress=None, layout="bundle": {"zip_file": f"/private/files/{layout}.zip"},
+	)
+
+	module.run_evidence_pack_export("YAM-EP-TEST-0001", "zip", "qa.manager@example.com", layout="referenced")
+
+	assert events[-1]["layout"] == "referenced"
+	assert events[-1]["file_url"] == "/private/files/referenced.zip"
 
 
 def test_get_auditor_evidence_pack_stub_guest(monkeypatch):
@@ -96,3 +295,246 @@ def test_get_auditor_evidence_pack_stub_guest(monkeypatch):
 
 def test_safe_zip_segment_sanitizes_path_tokens():
 	assert module._safe_zip_segment("../unsafe\\path/name.txt") == "--unsafe-path-name.txt"
+
+
+def test_collect_scope_rows_counts_attachments_with_one_grouped_query_per_doctype(monkeypatch):
+	doc = DummyEvidencePack(status="Draft")
+	doc.from_date = "2026-02-01"
+	doc.to_date = "2026-02-28"
+	queries = []
+
+	def _fake_get_all(doctype, **_kwargs):
+		return [{"name": f"{doctype}-{index}", "site": "SITE-A"} for index in range(3)]
+
+	def _fake_sql(query, values, as_dict=False):
+		queries.append(values["doctype"])
+		return [{"attached_to_name": f"{values['doctype']}-1", "attachment_count": 2}]
+
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+	monkeypatch.setattr(
+		module.frappe, "get_meta", lambda _doctype: SimpleNamespace(has_field=lambda _f: True)
+	)
+	monkeypatch.setattr(module.frappe, "db", SimpleNamespace(sql=_fake_sql))
+
+	rows, counts = module._collect_scope_rows(doc)
+
+	assert queries == ["QCTest", "Certificate", "ScaleTicket", "Observation", "Nonconformance"]
+	assert counts["QCTest"] == 3
+	attachments = {row["source_name"]: row["attachment_count"] for row in rows}
+	assert attachments["QCTest-1"] == 2
+	assert attachments["QCTest-0"] == 0
+
+
+def test_iter_keyset_pages_continues_after_last_date_and_name(monkeypatch):
+	records = [
+		{"name": f"OBS-{index:02d}", "observed_at": f"2026-02-{10 - index // 3:02d}"} for index in range(7)
+	]
+	records.sort(key=lambda row: (row["observed_at"], row["name"]), reverse=True)
+	calls = []
+
+	def _fake_get_all(doctype, filters=None, or_filters=None, fields=None, order_by=None, limit=None):
+		calls.append(filters)
+		matched = records
+		for fieldname, operator, value in filters:
+			if operator == "=":
+				matched = [row for row in matched if row[fieldname] == value]
+			elif operator == "<":
+				matched = [row for row in matched if row[fieldname] < value]
+		return [dict(row) for row in matched[:limit]]
+
+	monkeypatch.setattr(module, "_SCOPE_PAGE_SIZE", 2)
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+
+	pages = list(module._iter_keyset_pages("Observation", [], None, ["name", "observed_at"], "observed_at"))
+
+	assert [row["name"] for page in pages for row in page] == [row["name"] for row in records]
+	assert [len(page) for page in pages] == [2, 2, 2, 1]
+	assert ["observed_at", "=", records[1]["observed_at"]] in calls[1]
+
+
+def test_write_zip_archive_streams_local_attachments_and_skips_unsafe_urls(monkeypatch, tmp_path):
+	private_dir = tmp_path / "private" / "files"
+	private_dir.mkdir(parents=True)
+	(private_dir / "lab.pdf").write_bytes(b"%PDF" + b"x" * 5000)
+	(tmp_path / "secret.txt").write_text("outside")
+	doc = DummyEvidencePack(status="Ready")
+	files = [
+		{
+			"name": "F-1",
+			"file_name": "lab.pdf",
+			"file_url": "/private/files/lab.pdf",
+			"attached_to_doctype": "QCTest",
+			"attached_to_name": "QCT-1",
+		},
+		{
+			"name": "F-2",
+			"file_name": "lab.pdf",
+			"file_url": "/private/files/lab.pdf",
+			"attached_to_doctype": "QCTest",
+			"attached_to_name": "QCT-1",
+		},
+		{"name": "F-3", "file_name": "secret.txt", "file_url": "/private/files/../../secret.txt"},
+		{"name": "F-4", "file_name": "remote.pdf", "file_url": "https://example.com/remote.pdf"},
+	]
+	monkeypatch.setattr(module.frappe, "get_site_path", lambda *parts: str(tmp_path.joinpath(*parts)))
+	monkeypatch.setattr(
+		module.frappe.utils, "now_datetime", lambda: SimpleNamespace(isoformat=lambda: "2026-02-27")
+	)
+
+	target = tmp_path / "out.zip"
+	written = module._write_zip_archive(doc, files, {"QCTest": 1}, target)
+
+	assert written == 2
+	with zipfile.ZipFile(target) as bundle:
+		assert sorted(bundle.namelist()) == [
+			"manifest.json",
+			"records/QCTest/QCT-1/2_lab.pdf",
+			"records/QCTest/QCT-1/lab.pdf",
+		]
+		assert bundle.read("records/QCTest/QCT-1/lab.pdf") == b"%PDF" + b"x" * 5000
+		manifest = json.loads(bundle.read("manifest.json"))
+
+	assert manifest["file_count"] == 2
+	assert manifest["files"][0]["size"] == 5004
+	assert manifest["files"][0]["sha256"] == hashlib.sha256(b"%PDF" + b"x" * 5000).hexdigest()
+
+
+def test_write_zip_archive_referenced_layout_stores_attachments_as_shared_blobs(monkeypatch, tmp_path):
+	private_dir = tmp_path / "private" / "files"
+	private_dir.mkdir(parents=True)
+	(private_dir / "lab.pdf").write_bytes(b"%PDF shared")
+	doc = DummyEvidencePack(status="Ready")
+	files = [
+		{
+			"name": "F-1",
+			"file_name": "lab.pdf",
+			"file_url": "/private/files/lab.pdf",
+			"attached_to_doctype": "QCTest",
+			"attached_to_name": "QCT-1",
+		}
+	]
+	stored = []
+
+	def _store_blob(path, sha256=None):
+		stored.append(path.name)
+		return sha256, 11
+
+	monkeypatch.setattr(module, "store_blob", _store_blob)
+	monkeypatch.setattr(module.frappe, "get_site_path", lambda *parts: str(tmp_path.joinpath(*parts)))
+	monkeypatch.setattr(
+		module.frappe.utils, "now_datetime", lambda: SimpleNamespace(isoformat=lambda: "2026-10-19")
+	)
+
+	blob_refs = {}
+	target = tmp_path / "out.zip"
+	written = module._write_zip_archive(doc, files, {"QCTest": 1}, target, blob_refs=blob_refs)
+
+	digest = hashlib.sha256(b"%PDF shared").hexdigest()
+	assert written == 1
+	assert stored == ["lab.pdf"]
+	assert blob_refs == {digest: 11}
+	with zipfile.ZipFile(target) as bundle:
+		assert sorted(bundle.namelist()) == ["README.txt", "manifest.json"]
+		manifest = json.loads(bundle.read("manifest.json"))
+	assert manifest["layout"] == "referenced"
+	assert manifest["files"][0]["sha256"] == digest
+	assert f"sha256={digest}" in manifest["files"][0]["download"]
+
+
+def test_auditor_portal_listing_is_cached_and_answers_if_none_match_with_304(monkeypatch):
+	store = {}
+	queries = []
+	_patch_cache(monkeypatch, store)
+	monkeypatch.setattr(module.frappe, "session", SimpleNamespace(user="auditor@example.com"))
+	monkeypatch.setattr(module, "_has_global_site_access", lambda _user: False)
+	monkeypatch.setattr(module, "get_allowed_sites", lambda user=None: ["SITE-A"])
+	monkeypatch.setattr(module, "_", lambda text: text)
+	monkeypatch.setattr(module.frappe, "as_json", lambda value: json.dumps(value, sort_keys=True))
+	generations = iter(range(1, 10))
+	monkeypatch.setattr(module.frappe, "generate_hash", lambda length=10: f"gen{next(generations)}")
+	monkeypatch.setattr(
+		module.frappe,
+		"get_all",
+		lambda doctype, **kwargs: queries.append(kwargs["filters"]) or [{"name": "EP-1", "status": "Ready"}],
+	)
+	headers = {}
+	monkeypatch.setattr(
+		module.frappe,
+		"local",
+		SimpleNamespace(
+			response={}, response_headers=SimpleNamespace(set=lambda key, value: headers.update({key: value}))
+		),
+	)
+	request_headers = {}
+	monkeypatch.setattr(module.frappe, "get_request_header", lambda key: request_headers.get(key))
+
+	first = module.get_auditor_evidence_pack_stub(from_date="2026-01-01")
+	etag = headers["ETag"]
+	request_headers["If-None-Match"] = f"W/{etag}"
+	second = module.get_auditor_evidence_pack_stub(from_date="2026-01-01")
+
+	assert first["records"] == [{"name": "EP-1", "status": "Ready"}]
+	assert queries == [
+		{
+			"status": ["in", ["Ready", "Sent", "Approved"]],
+			"site": ["in", ["SITE-A"]],
+			"to_date": [">=", "2026-01-01"],
+		}
+	]
+	assert second == {"ok": True, "not_modified": True}
+	assert module.frappe.local.response["http_status_code"] == 304
+
+	module.clear_auditor_portal_cache()
+	module.frappe.local.response = {}
+	module.get_auditor_evidence_pack_stub(from_date="2026-01-01")
+
+	assert len(queries) == 2
+	assert headers["ETag"] == etag
+	assert module.frappe.local.response["http_status_code"] == 304
+
+
+def test_attachments_changed_since_includes_records_whose_files_were_deleted(monkeypatch):
+	queries = []
+
+	def _fake_get_all(doctype, **kwargs):
+		queries.append((doctype, kwargs["filters"]))
+		if doctype == "File":
+			return ["QCT-2"]
+		return [
+			json.dumps({"attached_to_doctype": "QCTest", "attached_to_name": "QCT-7"}),
+			json.dumps({"attached_to_doctype": "Certificate", "attached_to_name": "CERT-1"}),
+			"not json",
+		]
+
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+
+	assert module._attachments_changed_since("QCTest", "2026-02-27 18:00:00") == ["QCT-2", "QCT-7"]
+	assert queries[1] == (
+		"Deleted Document",
+		{"deleted_doctype": "File", "creation": [">=", "2026-02-27 18:00:00"]},
+	)
+
+
+def test_portal_download_links_are_signed_only_for_readable_packs(monkeypatch):
+	checked = []
+
+	def _has_permission(doctype, ptype="read", doc=None):
+		checked.append((doctype, ptype, doc))
+		return doc == "EP-READABLE"
+
+	monkeypatch.setattr(module.frappe, "has_permission", _has_permission)
+	monkeypatch.setattr(
+		module, "signed_download_url", lambda name, fmt, file_url: (f"signed:{name}:{fmt}", 0)
+	)
+	rows = [
+		{"name": "EP-READABLE", "pdf_file": "/private/files/a.pdf", "zip_file": ""},
+		{"name": "EP-SITE-ONLY", "pdf_file": "/private/files/b.pdf", "zip_file": "/private/files/b.zip"},
+	]
+
+	linked = module.with_download_links(rows)
+
+	assert linked[0]["pdf_download"] == "signed:EP-READABLE:pdf"
+	assert linked[0]["zip_download"] == ""
+	assert (linked[1]["pdf_download"], linked[1]["zip_download"]) == ("", "")
+	assert checked == [("EvidencePack", "read", "EP-READABLE"), ("EvidencePack", "read", "EP-SITE-ONLY")]
+	assert "pdf_download" not in rows[0]
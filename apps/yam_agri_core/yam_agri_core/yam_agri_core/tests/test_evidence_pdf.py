@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from yam_agri_core.yam_agri_core.evidence import pdf as module
+
+
+class _Template:
+	def render(self, context):
+		numbers = [context["row_offset"] + index + 1 for index in range(len(context["linked_documents"]))]
+		return f"{context['section_number']}/{context['section_count']}:{context['first_section']}:{numbers}"
+
+
+def test_paginate_rows_keeps_offsets_and_one_section_for_empty_pack():
+	rows = [{"source_name": f"QCT-{index}"} for index in range(5)]
+
+	sections = module.paginate_rows(rows, section_rows=2)
+
+	assert [(offset, len(chunk)) for offset, chunk in sections] == [(0, 2), (2, 2), (4, 1)]
+	assert module.paginate_rows([], section_rows=2) == [(0, [])]
+
+
+def test_render_section_html_numbers_rows_across_sections():
+	sections = module.paginate_rows([{}] * 3, section_rows=2)
+
+	html = module.render_section_html(_Template(), {"doc": None}, sections)
+
+	assert html == ["1/2:True:[1, 2]", "2/2:False:[3]"]
+
+
+def test_compiled_template_is_reused_until_the_file_changes(monkeypatch, tmp_path):
+	template_file = tmp_path / "evidence_pack_pdf.html"
+	template_file.write_text("v1", encoding="utf-8")
+	compiled = []
+
+	def _from_string(source):
+		compiled.append(source)
+		return SimpleNamespace(source=source)
+
+	monkeypatch.setattr(module, "_template_path", lambda: template_file)
+	monkeypatch.setattr(module, "_TEMPLATE_CACHE", {})
+	monkeypatch.setattr(module.frappe, "get_jenv", lambda: SimpleNamespace(from_string=_from_string))
+
+	first, digest = module.get_compiled_template()
+	again, same_digest = module.get_compiled_template()
+	assert first is again and digest == same_digest
+	assert compiled == ["v1"]
+
+	template_file.write_text("v2 with a longer body", encoding="utf-8")
+	updated, new_digest = module.get_compiled_template()
+	assert updated.source == "v2 with a longer body"
+	assert new_digest != digest
+
+
+def test_render_evidence_pdf_converts_sections_in_order_and_merges(monkeypatch):
+	monkeypatch.setattr(module, "get_compiled_template", lambda: (_Template(), "sha"))
+	monkeypatch.setattr(module, "_html_to_pdf", lambda html: html.encode("utf-8"))
+	monkeypatch.setattr(module, "merge_pdfs", lambda parts: b"|".join(parts))
+	progress = []
+
+	result = module.render_evidence_pdf(
+		{}, [{}] * 5, section_rows=2, workers=1, progress=lambda done, total: progress.append((done, total))
+	)
+
+	assert result == b"1/3:True:[1, 2]|2/3:False:[3, 4]|3/3:False:[5]"
+	assert progress == [(0, 3), (1, 3), (2, 3)]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import date
+
+from yam_agri_core.yam_agri_core.compliance import lot_status as module
+
+TODAY = date(2026, 3, 10)
+
+POLICY = {
+	"name": "POL-1",
+	"required_tests": ["Moisture"],
+	"required_certificates": ["COA"],
+	"max_test_age_days": 7,
+	"enforce_dispatch_gate": 1,
+}
+
+
+def _evidence(test_date: str, cert_expiry: str) -> dict:
+	return {
+		"qc_tests": [
+			{
+				"name": "QC-1",
+				"site": "SITE-A",
+				"test_type": "Moisture",
+				"pass_fail": "Pass",
+				"test_date": test_date,
+			}
+		],
+		"certificates": [
+			{"name": "CERT-1", "site": "SITE-A", "cert_type": "COA", "expiry_date": cert_expiry}
+		],
+	}
+
+
+def test_compute_lot_compliance_ready_with_next_expiry():
+	state = module.compute_lot_compliance("SITE-A", POLICY, _evidence("2026-03-08", "2026-04-01"), 2, TODAY)
+
+	assert state["dispatch_ready"] == 1
+	assert state["missing_required_tests"] == ""
+	assert state["open_nonconformance_count"] == 2
+	# The Moisture test goes stale on 2026-03-16, before the certificate expires.
+	assert state["compliance_next_expiry"] == date(2026, 3, 16)
+
+
+def test_compute_lot_compliance_blocks_on_stale_test_or_missing_policy():
+	state = module.compute_lot_compliance("SITE-A", POLICY, _evidence("2026-02-01", "2026-04-01"), 0, TODAY)
+
+	assert state["dispatch_ready"] == 0
+	assert state["missing_required_tests"] == "Moisture"
+	assert state["compliance_next_expiry"] == date(2026, 4, 2)
+
+	no_policy = module.compute_lot_compliance("SITE-A", None, _evidence("2026-03-08", "2026-04-01"), 0, TODAY)
+	assert no_policy["dispatch_ready"] == 0
+
+
+def test_evidence_change_refreshes_old_and_new_lot(monkeypatch):
+	refreshed: list[str] = []
+	monkeypatch.setattr(module, "refresh_lot_compliance", refreshed.append)
+
+	class _Previous:
+		def get(self, key):
+			return {"lot": "LOT-OLD"}.get(key)
+
+	class _QCTest:
+		def get(self, key):
+			return {"lot": "LOT-NEW"}.get(key)
+
+		def get_doc_before_save(self):
+			return _Previous()
+
+	module.on_lot_evidence_change(_QCTest(), "on_update")
+	module.on_lot_evidence_change(_QCTest(), "after_delete")
+
+	assert refreshed == ["LOT-NEW", "LOT-OLD", "LOT-NEW"]
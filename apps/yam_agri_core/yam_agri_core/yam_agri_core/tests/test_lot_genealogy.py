@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from yam_agri_core.yam_agri_core.api import traceability as api_module
+from yam_agri_core.yam_agri_core.traceability import genealogy as module
+
+TRANSFERS = [
+	{
+		"name": "TRF-1",
+		"transfer_type": "Split",
+		"from_lot": "LOT-A",
+		"to_lot": "LOT-B",
+		"qty_kg": 40,
+		"site": "SITE-A",
+	},
+	{
+		"name": "TRF-2",
+		"transfer_type": "Blend",
+		"from_lot": "LOT-B",
+		"to_lot": "LOT-C",
+		"qty_kg": 25,
+		"site": "SITE-A",
+	},
+	{
+		"name": "TRF-3",
+		"transfer_type": "Merge",
+		"from_lot": "LOT-X",
+		"to_lot": "LOT-A",
+		"qty_kg": 60,
+		"site": "SITE-A",
+	},
+]
+
+
+def _patch_db(monkeypatch, observed: list):
+	def _fake_sql(query, values, as_dict=False):
+		observed.append((query, values))
+		if "INNER JOIN trace ON t.`from_lot`" in query:
+			return [{"lot": "LOT-A", "depth": 0}, {"lot": "LOT-B", "depth": 1}, {"lot": "LOT-C", "depth": 2}]
+		return [{"lot": "LOT-A", "depth": 0}, {"lot": "LOT-X", "depth": 1}]
+
+	def _fake_get_all(doctype, filters, **_kwargs):
+		if doctype == "Lot":
+			return [{"name": name, "site": "SITE-A", "qty_kg": 100} for name in filters["name"][1]]
+		near = "from_lot" if "from_lot" in filters else "to_lot"
+		return [row for row in TRANSFERS if row[near] in filters[near][1]]
+
+	monkeypatch.setattr(module.frappe, "db", SimpleNamespace(sql=_fake_sql))
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+
+
+def test_trace_lot_genealogy_walks_both_directions_with_recursive_cte(monkeypatch):
+	observed: list = []
+	_patch_db(monkeypatch, observed)
+
+	trace = module.trace_lot_genealogy("LOT-A", "both", max_depth=10, sites=["SITE-A"])
+
+	assert all("WITH RECURSIVE" in query for query, _values in observed)
+	assert observed[0][1]["sites"] == ("SITE-A",)
+	assert observed[0][1]["max_depth"] == 10
+
+	nodes = {node["lot"]: node for node in trace["nodes"]}
+	assert nodes["LOT-C"]["forward_depth"] == 2
+	assert nodes["LOT-X"]["backward_depth"] == 1
+	assert {edge["transfer"] for edge in trace["edges"]} == {"TRF-1", "TRF-2", "TRF-3"}
+	assert trace["truncated"] is False
+
+
+def test_trace_lot_genealogy_caps_depth_and_flags_truncation(monkeypatch):
+	observed: list = []
+	_patch_db(monkeypatch, observed)
+
+	trace = module.trace_lot_genealogy("LOT-A", "forward", max_depth=500, node_limit=2)
+
+	assert trace["max_depth"] == module.MAX_GENEALOGY_DEPTH
+	assert trace["truncated"] is True
+	assert "t.site IN" not in observed[0][0]
+
+
+def test_get_lot_genealogy_scopes_transfers_to_caller_sites(monkeypatch):
+	observed = {}
+	monkeypatch.setattr(api_module.frappe, "session", SimpleNamespace(user="qa.user@example.com"))
+	monkeypatch.setattr(api_module.frappe, "get_roles", lambda _user: ["QA Manager"])
+	monkeypatch.setattr(
+		api_module.frappe, "db", SimpleNamespace(get_value=lambda *_args, **_kwargs: "SITE-A")
+	)
+	monkeypatch.setattr(api_module, "assert_site_access", lambda site: observed.setdefault("checked", site))
+	monkeypatch.setattr(api_module, "get_allowed_sites", lambda user=None: ["SITE-B"])
+
+	def _fake_trace(lot, direction, depth, sites=None):
+		observed["args"] = (lot, direction, depth, sites)
+		return {"lot": lot, "nodes": [], "edges": []}
+
+	monkeypatch.setattr(api_module, "trace_lot_genealogy", _fake_trace)
+
+	result = api_module.get_lot_genealogy("LOT-A", direction="Backward", max_depth="4")
+
+	assert result["status"] == "ok"
+	assert observed["checked"] == "SITE-A"
+	assert observed["args"] == ("LOT-A", "backward", 4, ["SITE-A", "SITE-B"])
+
+	with pytest.raises(api_module.frappe.ValidationError):
+		api_module.get_lot_genealogy("LOT-A", direction="sideways")
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from yam_agri_core.yam_agri_core.api import traceability as api_module
+from yam_agri_core.yam_agri_core.traceability import closure as module
+
+LOTS = {
+	"LOT-A": {"name": "LOT-A", "site": "SITE-A", "qty_kg": 100},
+	"LOT-B": {"name": "LOT-B", "site": "SITE-A", "qty_kg": 50},
+	"LOT-C": {"name": "LOT-C", "site": "SITE-A", "qty_kg": 80},
+	"LOT-D": {"name": "LOT-D", "site": "SITE-A", "qty_kg": 0},
+}
+
+
+def _rows_by_pair(rows: list[dict]) -> dict[tuple[str, str], dict]:
+	return {(row["ancestor"], row["descendant"]): row for row in rows}
+
+
+def test_compute_lot_closure_multiplies_fractions_along_paths_and_sums_parallel_paths():
+	# A -> B (40 of 50), A -> C (20 of 80), B -> C (40 of 80), C -> D (lot qty unknown)
+	edges = {
+		"LOT-B": {"LOT-A": 40.0},
+		"LOT-C": {"LOT-A": 20.0, "LOT-B": 40.0},
+		"LOT-D": {"LOT-C": 10.0},
+	}
+
+	rows = _rows_by_pair(module.compute_lot_closure({"LOT-B", "LOT-C", "LOT-D"}, edges, LOTS, {}))
+
+	assert set(rows) == {
+		("LOT-A", "LOT-B"),
+		("LOT-A", "LOT-C"),
+		("LOT-B", "LOT-C"),
+		("LOT-A", "LOT-D"),
+		("LOT-B", "LOT-D"),
+		("LOT-C", "LOT-D"),
+	}
+	assert rows[("LOT-A", "LOT-B")]["qty_fraction"] == pytest.approx(0.8)
+	assert rows[("LOT-B", "LOT-C")]["qty_fraction"] == pytest.approx(0.5)
+	# direct 20/80 plus 0.8 of the 40/80 via B
+	assert rows[("LOT-A", "LOT-C")]["qty_fraction"] == pytest.approx(0.25 + 0.4)
+	assert rows[("LOT-A", "LOT-C")]["depth"] == 1
+	assert rows[("LOT-A", "LOT-D")]["depth"] == 2
+	assert rows[("LOT-C", "LOT-D")]["qty_fraction"] == pytest.approx(1.0)
+	assert {row["site"] for row in rows.values()} == {"SITE-A"}
+
+
+def test_compute_lot_closure_extends_stored_ancestors_of_unchanged_parents():
+	edges = {"LOT-C": {"LOT-B": 40.0}}
+	outside = {"LOT-B": {"LOT-A": (1, 0.8)}}
+
+	rows = _rows_by_pair(module.compute_lot_closure({"LOT-C"}, edges, LOTS, outside))
+
+	assert rows[("LOT-A", "LOT-C")]["depth"] == 2
+	assert rows[("LOT-A", "LOT-C")]["qty_fraction"] == pytest.approx(0.4)
+
+
+def test_rebuild_lot_closure_replaces_rows_of_lot_and_its_descendants(monkeypatch):
+	stored = [
+		{"ancestor": "LOT-B", "descendant": "LOT-C", "depth": 1, "qty_fraction": 0.5},
+		{"ancestor": "LOT-A", "descendant": "LOT-B", "depth": 1, "qty_fraction": 0.8},
+	]
+	transfers = [
+		{"from_lot": "LOT-A", "to_lot": "LOT-B", "qty_kg": 40},
+		{"from_lot": "LOT-B", "to_lot": "LOT-C", "qty_kg": 40},
+	]
+	deleted: list = []
+	inserted: list = []
+
+	def _fake_get_all(doctype, filters=None, fields=None, pluck=None, **_kwargs):
+		if doctype == module.CLOSURE_DOCTYPE and pluck:
+			return [row[pluck] for row in stored if row["ancestor"] in filters["ancestor"][1]]
+		if doctype == module.CLOSURE_DOCTYPE:
+			return [row for row in stored if row["descendant"] in filters["descendant"][1]]
+		if doctype == "Transfer":
+			return [row for row in transfers if row["to_lot"] in filters["to_lot"][1]]
+		return [LOTS[name] for name in filters["name"][1]]
+
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+	monkeypatch.setattr(module.frappe, "generate_hash", lambda length=None: "hash")
+	monkeypatch.setattr(module.frappe, "session", SimpleNamespace(user="qa@example.com"))
+	monkeypatch.setattr(
+		module.frappe,
+		"db",
+		SimpleNamespace(
+			delete=lambda doctype, filters=None: deleted.append(filters),
+			bulk_insert=lambda doctype, fields, values, chunk_size=None: inserted.extend(values),
+		),
+	)
+
+	written = module.rebuild_lot_closure(["LOT-B"])
+
+	assert deleted == [{"descendant": ["in", ["LOT-B", "LOT-C"]]}]
+	assert written == 3
+	pairs = {(values[5], values[6]) for values in inserted}
+	assert pairs == {("LOT-A", "LOT-B"), ("LOT-B", "LOT-C"), ("LOT-A", "LOT-C")}
+
+
+def test_assert_no_genealogy_cycle_rejects_transfer_into_an_ancestor(monkeypatch):
+	class _ValidationError(Exception):
+		pass
+
+	def _throw(message, exc=None):
+		raise (exc or _ValidationError)(message)
+
+	monkeypatch.setattr(module.frappe, "ValidationError", _ValidationError)
+	monkeypatch.setattr(module.frappe, "throw", _throw)
+	monkeypatch.setattr(module, "_", lambda text: text)
+	monkeypatch.setattr(
+		module.frappe,
+		"db",
+		SimpleNamespace(
+			exists=lambda doctype, filters: filters == {"ancestor": "LOT-A", "descendant": "LOT-C"}
+		),
+	)
+
+	module.assert_no_genealogy_cycle("LOT-A", "LOT-C")
+	with pytest.raises(_ValidationError):
+		module.assert_no_genealogy_cycle("LOT-C", "LOT-A")
+	with pytest.raises(_ValidationError):
+		module.assert_no_genealogy_cycle("LOT-A", "LOT-A")
+
+
+def test_get_downstream_lots_merges_seed_descendants(monkeypatch):
+	checked_sites: list = []
+	monkeypatch.setattr(api_module.frappe, "session", SimpleNamespace(user="qa@example.com"))
+	monkeypatch.setattr(api_module.frappe, "get_roles", lambda user: ["QA Manager"])
+	monkeypatch.setattr(api_module, "get_allowed_sites", lambda user=None: ["SITE-A"])
+	monkeypatch.setattr(api_module, "assert_site_access", checked_sites.append)
+	monkeypatch.setattr(
+		api_module.frappe,
+		"get_all",
+		lambda doctype, filters=None, **_kwargs: [LOTS[name] for name in filters["name"][1]],
+	)
+	monkeypatch.setattr(
+		api_module,
+		"get_descendants_of_lots",
+		lambda seeds, sites=None: {
+			"LOT-A": [
+				{
+					"ancestor": "LOT-A",
+					"descendant": "LOT-C",
+					"depth": 2,
+					"site": "SITE-A",
+					"qty_fraction": 0.2,
+				}
+			],
+			"LOT-B": [
+				{
+					"ancestor": "LOT-B",
+					"descendant": "LOT-C",
+					"depth": 1,
+					"site": "SITE-A",
+					"qty_fraction": 0.5,
+				}
+			],
+		},
+	)
+
+	result = api_module.get_downstream_lots('["LOT-A", "LOT-B"]')
+
+	assert checked_sites == ["SITE-A"]
+	assert result["affected"] == [
+		{"lot": "LOT-C", "site": "SITE-A", "depth": 1, "qty_fraction": 0.5, "sources": ["LOT-A", "LOT-B"]}
+	]
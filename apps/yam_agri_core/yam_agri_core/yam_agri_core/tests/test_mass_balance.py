@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from yam_agri_core.yam_agri_core.inventory import ledger as ledger_module
+from yam_agri_core.yam_agri_core.inventory import mass_balance as module
+
+
+class _Doc(dict):
+	def __getattr__(self, key):
+		return self.get(key)
+
+
+def test_sync_voucher_ledger_appends_only_the_difference(monkeypatch):
+	posted = [
+		{"lot": "LOT-A", "entry_type": "Transfer Out", "qty_kg": -40},
+		{"lot": "LOT-B", "entry_type": "Transfer In", "qty_kg": 40},
+	]
+	appended: list = []
+	monkeypatch.setattr(ledger_module.frappe, "get_all", lambda *args, **kwargs: posted)
+	monkeypatch.setattr(ledger_module, "append_ledger_entries", lambda entries: appended.extend(entries))
+
+	# the Transfer was edited to 30 kg into LOT-C instead of LOT-B
+	doc = _Doc(name="TRF-1", site="SITE-A", status="Approved", from_lot="LOT-A", to_lot="LOT-C", qty_kg=30)
+	ledger_module.on_transfer_change(doc, "on_update")
+
+	assert sorted((entry["lot"], entry["entry_type"], entry["qty_kg"]) for entry in appended) == [
+		("LOT-A", "Transfer Out", 10),
+		("LOT-B", "Transfer In", -40),
+		("LOT-C", "Transfer In", 30),
+	]
+	assert {entry["voucher_no"] for entry in appended} == {"TRF-1"}
+
+
+def test_unapproved_transfer_posts_no_movements():
+	assert ledger_module.transfer_movements(_Doc(status="Draft", from_lot="LOT-A", qty_kg=5)) == {}
+
+
+def test_evaluate_mass_balance_applies_percentage_tolerance_and_rounding_floor():
+	assert not module.evaluate_mass_balance(1000.0, 990.0, 2.5)["out_of_tolerance"]
+	assert module.evaluate_mass_balance(1000.0, 900.0, 2.5)["out_of_tolerance"]
+	assert not module.evaluate_mass_balance(0.004, 0.0, 2.5)["out_of_tolerance"]
+	assert module.evaluate_mass_balance(1000.0, 900.0, 2.5)["discrepancy_kg"] == 100.0
+
+
+def test_reconcile_lots_raises_candidate_nonconformance_for_drift(monkeypatch):
+	created: list = []
+	monkeypatch.setattr(module, "get_site_tolerance_pct", lambda site: 2.5)
+	monkeypatch.setattr(module, "get_ledger_balances", lambda lots: {"LOT-A": 100.0, "LOT-B": 500.0})
+	monkeypatch.setattr(
+		module.frappe,
+		"get_all",
+		lambda doctype, **kwargs: [{"name": "LOT-A", "qty_kg": 100.5}, {"name": "LOT-B", "qty_kg": 420.0}],
+	)
+	monkeypatch.setattr(module.frappe, "db", SimpleNamespace(get_value=lambda *args, **kwargs: None))
+	monkeypatch.setattr(module, "_", lambda text: text)
+
+	def _get_doc(values):
+		created.append(values)
+		return SimpleNamespace(name="NC-1", insert=lambda ignore_permissions=False: None)
+
+	monkeypatch.setattr(module.frappe, "get_doc", _get_doc)
+
+	discrepancies = module.reconcile_lots("SITE-A", ["LOT-A", "LOT-B"])
+
+	assert [entry["lot"] for entry in discrepancies] == ["LOT-B"]
+	assert discrepancies[0]["discrepancy_kg"] == -80.0
+	assert discrepancies[0]["nonconformance"] == "NC-1"
+	assert created[0]["lot"] == "LOT-B"
+	assert created[0]["capa_description"].startswith("MASS-BALANCE lot=LOT-B;")
+
+
+def test_schedule_enqueues_one_job_per_site_from_watermark(monkeypatch):
+	enqueued: list = []
+	saved: list = []
+	monkeypatch.setattr(module, "_load_watermark", lambda: {"scanned_at": "2026-10-01 00:00:00"})
+	monkeypatch.setattr(module, "_save_watermark", saved.append)
+	monkeypatch.setattr(module.utils, "now_datetime", lambda: "2026-10-02 00:00:00")
+	monkeypatch.setattr(
+		module,
+		"find_lots_to_reconcile",
+		lambda since: {"SITE-A": ["LOT-A"], "SITE-B": ["LOT-B", "LOT-C"]} if since else {},
+	)
+	monkeypatch.setattr(module.frappe, "enqueue", lambda method, **kwargs: enqueued.append(kwargs))
+
+	assert module.schedule_mass_balance_reconciliation() == 3
+	assert [(job["site_name"], job["lot_names"]) for job in enqueued] == [
+		("SITE-A", ["LOT-A"]),
+		("SITE-B", ["LOT-B", "LOT-C"]),
+	]
+	assert saved == ["2026-10-02 00:00:00"]
+
+
+def test_full_schedule_enqueues_sites_without_lot_lists(monkeypatch):
+	enqueued: list = []
+	monkeypatch.setattr(module, "_save_watermark", lambda _scanned_at: None)
+	monkeypatch.setattr(module.utils, "now_datetime", lambda: "2026-10-02 00:00:00")
+	monkeypatch.setattr(
+		module.frappe,
+		"get_all",
+		lambda doctype, **kwargs: [
+			{"site": "SITE-B", "lot_count": 40000},
+			{"site": "SITE-A", "lot_count": 2},
+		],
+	)
+	monkeypatch.setattr(module.frappe, "enqueue", lambda method, **kwargs: enqueued.append(kwargs))
+
+	assert module.schedule_full_mass_balance_reconciliation() == 40002
+	assert [(job["site_name"], job["lot_names"]) for job in enqueued] == [("SITE-A", None), ("SITE-B", None)]
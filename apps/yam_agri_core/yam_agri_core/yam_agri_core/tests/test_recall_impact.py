@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import pytest
+
+from yam_agri_core.yam_agri_core.traceability import recall as module
+
+LOTS = {
+	"LOT-SEED": {
+		"name": "LOT-SEED",
+		"lot_number": "S",
+		"site": "SITE-A",
+		"qty_kg": 100,
+		"status": "Accepted",
+	},
+	"LOT-B": {"name": "LOT-B", "lot_number": "B", "site": "SITE-A", "qty_kg": 200, "status": "Dispatched"},
+	"LOT-C": {"name": "LOT-C", "lot_number": "C", "site": "SITE-A", "qty_kg": 400, "status": "Accepted"},
+	"LOT-D": {"name": "LOT-D", "lot_number": "D", "site": "SITE-A", "qty_kg": 50, "status": "Draft"},
+}
+CLOSURE = [
+	{"ancestor": "LOT-SEED", "descendant": "LOT-B", "depth": 1, "site": "SITE-A", "qty_fraction": 0.25},
+	{"ancestor": "LOT-SEED", "descendant": "LOT-C", "depth": 1, "site": "SITE-A", "qty_fraction": 0.1},
+	{"ancestor": "LOT-SEED", "descendant": "LOT-D", "depth": 2, "site": "SITE-A", "qty_fraction": 0.1},
+	{"ancestor": "LOT-C", "descendant": "LOT-D", "depth": 1, "site": "SITE-A", "qty_fraction": 1.0},
+]
+TRANSFERS = [
+	{"from_lot": "LOT-SEED", "to_lot": "LOT-B", "qty_kg": 50},
+	{"from_lot": "LOT-SEED", "to_lot": "LOT-C", "qty_kg": 40},
+]
+RECORDS = {
+	"Complaint": [{"name": "COMP-1", "lot": "LOT-C", "status": "Open"}],
+	"Certificate": [{"name": "CERT-1", "lot": "LOT-B", "cert_type": "Phyto"}],
+	"EvidencePack": [{"name": "EP-1", "lot": "LOT-SEED", "title": "Audit"}],
+}
+
+
+def _patch(monkeypatch, observed: list, transfers: list[dict] = TRANSFERS):
+	def _fake_get_all(doctype, filters=None, **_kwargs):
+		observed.append((doctype, filters))
+		if doctype == "Lot":
+			return [LOTS[name] for name in filters["name"][1] if name in LOTS]
+		if doctype == "Transfer":
+			return [row for row in transfers if row["from_lot"] in filters["from_lot"][1]]
+		return [row for row in RECORDS[doctype] if row["lot"] in filters["lot"][1]]
+
+	def _fake_descendants(lot_names, sites=None):
+		return {lot: [row for row in CLOSURE if row["ancestor"] == lot] for lot in lot_names}
+
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+	monkeypatch.setattr(module, "get_descendants_of_lots", _fake_descendants)
+
+
+def test_simulate_recall_ranks_shipped_then_complained_then_exposed_quantity(monkeypatch):
+	observed: list = []
+	_patch(monkeypatch, observed)
+
+	report = module.simulate_recall(["LOT-SEED"])
+
+	assert [entry["lot"] for entry in report["lots"]] == ["LOT-B", "LOT-C", "LOT-SEED", "LOT-D"]
+	assert [entry["rank"] for entry in report["lots"]] == [1, 2, 3, 4]
+	by_lot = {entry["lot"]: entry for entry in report["lots"]}
+	assert by_lot["LOT-B"]["affected_qty_kg"] == pytest.approx(50)
+	assert by_lot["LOT-C"]["open_complaint_count"] == 1
+	assert by_lot["LOT-SEED"]["qty_fraction"] == 1.0
+	assert report["summary"]["affected_lots"] == 4
+	assert report["summary"]["shipped_lots"] == 1
+	assert report["summary"]["affected_qty_kg"] == pytest.approx(100 + 50 + 40 + 5)
+	# one query per linked DocType, not per lot
+	assert [doctype for doctype, _filters in observed].count("Complaint") == 1
+
+
+def test_simulate_recall_window_only_follows_transfers_inside_it(monkeypatch):
+	observed: list = []
+	# only the Transfer into LOT-C falls inside the window
+	_patch(monkeypatch, observed, transfers=[TRANSFERS[1]])
+
+	report = module.simulate_recall(["LOT-SEED"], "2026-01-01 00:00:00", "2026-01-31 23:59:59")
+
+	transfer_filters = next(filters for doctype, filters in observed if doctype == "Transfer")
+	assert transfer_filters["transfer_datetime"] == [
+		"between",
+		["2026-01-01 00:00:00", "2026-01-31 23:59:59"],
+	]
+	by_lot = {entry["lot"]: entry for entry in report["lots"]}
+	assert "LOT-B" not in by_lot
+	assert by_lot["LOT-C"]["qty_fraction"] == pytest.approx(0.1)
+	assert by_lot["LOT-D"]["depth"] == 2
+	assert by_lot["LOT-D"]["qty_fraction"] == pytest.approx(0.1)
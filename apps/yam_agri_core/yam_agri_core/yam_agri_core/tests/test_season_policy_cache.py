@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from yam_agri_core.yam_agri_core.doctype.season_policy import season_policy as module
+
+POLICY_ROWS = [
+	{
+		"name": "SP-3",
+		"site": "SITE-A",
+		"crop": "Wheat",
+		"mandatory_test_types": "Moisture,\nAflatoxin, Moisture",
+		"mandatory_certificate_types": "COA",
+		"max_test_age_days": 5,
+		"enforce_dispatch_gate": 1,
+	},
+	{
+		"name": "SP-2",
+		"site": "SITE-A",
+		"crop": "",
+		"mandatory_test_types": "Moisture",
+		"mandatory_certificate_types": "",
+		"max_test_age_days": 7,
+		"enforce_dispatch_gate": 0,
+	},
+	{
+		"name": "SP-1",
+		"site": "SITE-A",
+		"crop": "Wheat",
+		"mandatory_test_types": "Protein",
+		"mandatory_certificate_types": "",
+		"max_test_age_days": 7,
+		"enforce_dispatch_gate": 1,
+	},
+]
+
+
+def _patch_cache(monkeypatch, store):
+	def _get_value(key, generator=None):
+		if key not in store and generator:
+			store[key] = generator()
+		return store.get(key)
+
+	monkeypatch.setattr(
+		module.frappe,
+		"cache",
+		SimpleNamespace(get_value=_get_value, delete_value=lambda key: store.pop(key, None)),
+	)
+
+
+def test_load_active_season_policies_parses_lists_once(monkeypatch):
+	monkeypatch.setattr(module.frappe, "get_all", lambda *_args, **_kwargs: POLICY_ROWS)
+
+	policies = module._load_active_season_policies()
+	wheat = policies["by_site_crop"][module._policy_key("SITE-A", "Wheat")]
+
+	assert wheat["name"] == "SP-3"
+	assert wheat["required_tests"] == ["Moisture", "Aflatoxin"]
+	assert wheat["required_certificates"] == ["COA"]
+	assert policies["by_site"]["SITE-A"]["name"] == "SP-3"
+
+
+def test_get_active_season_policy_queries_once_until_cleared(monkeypatch):
+	calls = []
+
+	def _fake_get_all(*_args, **_kwargs):
+		calls.append(1)
+		return POLICY_ROWS
+
+	store: dict = {}
+	_patch_cache(monkeypatch, store)
+	monkeypatch.setattr(module.frappe, "get_all", _fake_get_all)
+
+	assert module.get_active_season_policy("SITE-A", "Wheat")["name"] == "SP-3"
+	# Unknown crop falls back to the newest active policy at the site.
+	assert module.get_active_season_policy("SITE-A", "Barley")["name"] == "SP-3"
+	assert module.get_active_season_policy("SITE-B", "Wheat") is None
+	assert len(calls) == 1
+
+	module.clear_season_policy_cache()
+	module.get_active_season_policy("SITE-A", None)
+	assert len(calls) == 2
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+from typing import Any
+
+import frappe
+from frappe import _, utils
+
+from yam_agri_core.yam_agri_core.traceability.genealogy import (
+	EXCLUDED_TRANSFER_STATUSES,
+	GENEALOGY_TRANSFER_TYPES,
+)
+
+CLOSURE_DOCTYPE = "Lot Genealogy Link"
+CLOSURE_CHUNK_SIZE = 5000
+CLOSURE_FIELDS = ["ancestor", "descendant", "depth", "site", "qty_fraction"]
+
+
+def _chunks(values: list[str], size: int = CLOSURE_CHUNK_SIZE):
+	for start in range(0, len(values), size):
+		yield values[start : start + size]
+
+
+def _merge_ancestor(ancestors: dict[str, tuple[int, float]], lot: str, depth: int, fraction: float) -> None:
+	"""Record `lot` as an ancestor: shortest depth wins, fractions of parallel paths add up (capped at 1)."""
+	current = ancestors.get(lot)
+	if current is None:
+		ancestors[lot] = (depth, min(1.0, fraction))
+		return
+	ancestors[lot] = (min(current[0], depth), min(1.0, current[1] + fraction))
+
+
+def _load_in_edges(lot_names: list[str]) -> dict[str, dict[str, float]]:
+	"""Active genealogy Transfers into `lot_names`, as {to_lot: {from_lot: qty_kg}}."""
+	edges: dict[str, dict[str, float]] = {}
+	for chunk in _chunks(lot_names):
+		for row in frappe.get_all(
+			"Transfer",
+			filters={
+				"to_lot": ["in", chunk],
+				"from_lot": ["is", "set"],
+				"transfer_type": ["in", list(GENEALOGY_TRANSFER_TYPES)],
+				"status": ["not in", list(EXCLUDED_TRANSFER_STATUSES)],
+			},
+			fields=["from_lot", "to_lot", "qty_kg"],
+			limit_page_length=0,
+		):
+			parents = edges.setdefault(str(row.get("to_lot")), {})
+			from_lot = str(row.get("from_lot"))
+			parents[from_lot] = parents.get(from_lot, 0.0) + float(row.get("qty_kg") or 0)
+	return edges
+
+
+def _load_lots(lot_names: list[str]) -> dict[str, dict[str, Any]]:
+	lots: dict[str, dict[str, Any]] = {}
+	for chunk in _chunks(lot_names):
+		for row in frappe.get_all(
+			"Lot",
+			filters={"name": ["in", chunk]},
+			fields=["name", "site", "qty_kg"],
+			limit_page_length=0,
+		):
+			lots[str(row.get("name"))] = row
+	return lots
+
+
+def _load_existing_ancestors(lot_names: list[str]) -> dict[str, dict[str, tuple[int, float]]]:
+	ancestors: dict[str, dict[str, tuple[int, float]]] = {}
+	for chunk in _chunks(lot_names):
+		for row in frappe.get_all(
+			CLOSURE_DOCTYPE,
+			filters={"descendant": ["in", chunk]},
+			fields=["ancestor", "descendant", "depth", "qty_fraction"],
+			limit_page_length=0,
+		):
+			ancestors.setdefault(str(row.get("descendant")), {})[str(row.get("ancestor"))] = (
+				int(row.get("depth") or 0),
+				float(row.get("qty_fraction") or 0),
+			)
+	return ancestors
+
+
+def _edge_fraction(qty_kg: float, to_lot: dict[str, Any] | None) -> float:
+	"""Share of the receiving Lot that came over one edge; unknown Lot quantity counts as all of it."""
+	to_qty = float((to_lot or {}).get("qty_kg") or 0)
+	if to_qty <= 0:
+		return 1.0
+	return min(1.0, qty_kg / to_qty)
+
+
+def _topological_order(lot_names: set[str], edges: dict[str, dict[str, float]]) -> list[str]:
+	"""Order `lot_names` so every Lot follows its parents inside the set.
+
+	Lots on a cycle (which `assert_no_genealogy_cycle` prevents) are appended at
+	the end so a bad record degrades the closure instead of failing the rebuild.
+	"""
+	pending = {lot: {parent for parent in edges.get(lot, {}) if parent in lot_names} for lot in lot_names}
+	children: dict[str, list[str]] = {}
+	for lot, parents in pending.items():
+		for parent in parents:
+			children.setdefault(parent, []).append(lot)
+
+	ready = sorted(lot for lot, parents in pending.items() if not parents)
+	order: list[str] = []
+	while ready:
+		lot = ready.pop()
+		order.append(lot)
+		for child in children.get(lot, []):
+			pending[child].discard(lot)
+			if not pending[child]:
+				ready.append(child)
+
+	seen = set(order)
+	order.extend(sorted(lot for lot in lot_names if lot not in seen))
+	return order
+
+
+def compute_lot_closure(
+	lot_names: set[str],
+	edges: dict[str, dict[str, float]],
+	lots: dict[str, dict[str, Any]],
+	outside_ancestors: dict[str, dict[str, tuple[int, float]]],
+) -> list[dict[str, Any]]:
+	"""Closure rows (ancestor, descendant, depth, site, qty_fraction) for every Lot in `lot_names`.
+
+	`edges` holds the in-edges of those Lots; `outside_ancestors` holds the stored
+	closure of parents outside the set, which a change inside the set cannot affect.
+	"""
+	computed: dict[str, dict[str, tuple[int, float]]] = {}
+	rows: list[dict[str, Any]] = []
+	for lot in _topological_order(lot_names, edges):
+		ancestors: dict[str, tuple[int, float]] = {}
+		for parent, qty_kg in edges.get(lot, {}).items():
+			if parent == lot:
+				continue
+			fraction = _edge_fraction(qty_kg, lots.get(lot))
+			_merge_ancestor(ancestors, parent, 1, fraction)
+			parent_ancestors = computed.get(parent) if parent in lot_names else outside_ancestors.get(parent)
+			for ancestor, (depth, ancestor_fraction) in (parent_ancestors or {}).items():
+				if ancestor != lot:
+					_merge_ancestor(ancestors, ancestor, depth + 1, ancestor_fraction * fraction)
+		computed[lot] = ancestors
+
+		site = (lots.get(lot) or {}).get("site")
+		for ancestor, (depth, fraction) in sorted(ancestors.items()):
+			rows.append(
+				{
+					"ancestor": ancestor,
+					"descendant": lot,
+					"depth": depth,
+					"site": site,
+					"qty_fraction": round(fraction, 9),
+				}
+			)
+	return rows
+
+
+def _replace_closure_rows(lot_names: list[str], rows: list[dict[str, Any]]) -> None:
+	for chunk in _chunks(lot_names):
+		frappe.db.delete(CLOSURE_DOCTYPE, {"descendant": ["in", chunk]})
+
+	if not rows:
+		return
+	now = utils.now_datetime()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		CLOSURE_DOCTYPE,
+		["name", "creation", "modified", "owner", "modified_by", *CLOSURE_FIELDS],
+		[
+			(frappe.generate_hash(length=12), now, now, user, user, *(row[field] for field in CLOSURE_FIELDS))
+			for row in rows
+		],
+		chunk_size=CLOSURE_CHUNK_SIZE,
+	)
+
+
+def rebuild_lot_closure(lot_names: list[str]) -> int:
+	"""Recompute the closure rows of `lot_names` and everything downstream of them.
+
+	Only descendants can change when a Transfer into a Lot changes, so the rest of
+	the table is left alone. Returns the number of rows written.
+	"""
+	start = sorted({lot for lot in lot_names if lot})
+	if not start:
+		return 0
+
+	affected = set(start)
+	for chunk in _chunks(start):
+		affected.update(
+			frappe.get_all(CLOSURE_DOCTYPE, filters={"ancestor": ["in", chunk]}, pluck="descendant")
+		)
+
+	affected_names = sorted(affected)
+	edges = _load_in_edges(affected_names)
+	outside_parents = sorted({parent for parents in edges.values() for parent in parents} - affected)
+	rows = compute_lot_closure(
+		affected,
+		edges,
+		_load_lots(affected_names),
+		_load_existing_ancestors(outside_parents),
+	)
+	_replace_closure_rows(affected_names, rows)
+	return len(rows)
+
+
+def rebuild_all_lot_closure() -> int:
+	"""Rebuild the whole Lot genealogy closure from Transfers.
+
+	Run from the command line after bulk imports or to repair the table:
+
+		bench --site <site> execute yam_agri_core.yam_agri_core.traceability.closure.rebuild_all_lot_closure
+	"""
+	edges: dict[str, dict[str, float]] = {}
+	for row in frappe.get_all(
+		"Transfer",
+		filters={
+			"to_lot": ["is", "set"],
+			"from_lot": ["is", "set"],
+			"transfer_type": ["in", list(GENEALOGY_TRANSFER_TYPES)],
+			"status": ["not in", list(EXCLUDED_TRANSFER_STATUSES)],
+		},
+		fields=["from_lot", "to_lot", "qty_kg"],
+		limit_page_length=0,
+	):
+		parents = edges.setdefault(str(row.get("to_lot")), {})
+		from_lot = str(row.get("from_lot"))
+		parents[from_lot] = parents.get(from_lot, 0.0) + float(row.get("qty_kg") or 0)
+
+	lot_names = set(edges)
+	rows = compute_lot_closure(lot_names, edges, _load_lots(sorted(lot_names)), {})
+	frappe.db.delete(CLOSURE_DOCTYPE)
+	_replace_closure_rows([], rows)
+	return len(rows)
+
+
+def on_transfer_change(doc, method=None) -> None:
+	"""doc_events hook for Transfer: refresh the closure below the receiving Lot(s)."""
+	lots = {doc.get("to_lot")}
+	if method == "on_update":
+		previous = doc.get_doc_before_save()
+		if previous:
+			lots.add(previous.get("to_lot"))
+	rebuild_lot_closure([lot for lot in lots if lot])
+
+
+def on_lot_change(doc, method=None) -> None:
+	"""doc_events hook for Lot: quantity fractions into the Lot depend on its quantity."""
+	if doc.has_value_changed("qty_kg") and frappe.db.exists(CLOSURE_DOCTYPE, {"descendant": doc.name}):
+		rebuild_lot_closure([doc.name])
+
+
+def assert_no_genealogy_cycle(from_lot: str | None, to_lot: str | None) -> None:
+	"""Reject a Transfer that would make a Lot its own ancestor."""
+	if not from_lot or not to_lot:
+		return
+	if from_lot == to_lot or frappe.db.exists(CLOSURE_DOCTYPE, {"ancestor": to_lot, "descendant": from_lot}):
+		frappe.throw(
+			_("Transfer from Lot {0} to Lot {1} would create a genealogy cycle").format(from_lot, to_lot),
+			frappe.ValidationError,
+		)
+
+
+def _lineage_rows(filters: dict[str, Any], max_depth: int | None, sites: list[str] | None) -> list[dict]:
+	if max_depth is not None:
+		filters["depth"] = ["<=", int(max_depth)]
+	if sites is not None:
+		filters["site"] = ["in", sites]
+	return frappe.get_all(
+		CLOSURE_DOCTYPE,
+		filters=filters,
+		fields=CLOSURE_FIELDS,
+		order_by="depth asc, qty_fraction desc",
+		limit_page_length=0,
+	)
+
+
+def get_lot_ancestors(
+	lot: str, max_depth: int | None = None, sites: list[str] | None = None
+) -> list[dict[str, Any]]:
+	"""Every upstream Lot of `lot` with hop distance and the share of `lot` it contributed."""
+	return _lineage_rows({"descendant": lot}, max_depth, sites)
+
+
+def get_lot_descendants(
+	lot: str, max_depth: int | None = None, sites: list[str] | None = None
+) -> list[dict[str, Any]]:
+	"""Every downstream Lot of `lot` with hop distance and the share of it that came from `lot`."""
+	return _lineage_rows({"ancestor": lot}, max_depth, sites)
+
+
+def get_descendants_of_lots(
+	lot_names: list[str], sites: list[str] | None = None
+) -> dict[str, list[dict[str, Any]]]:
+	"""Bulk `get_lot_descendants`: one indexed query per chunk of seed Lots."""
+	result: dict[str, list[dict[str, Any]]] = {lot: [] for lot in lot_names}
+	for chunk in _chunks(list(result)):
+		for row in _lineage_rows({"ancestor": ["in", chunk]}, None, sites):
+			result[row.get("ancestor")].append(row)
+	return result
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from typing import Any
+
+import frappe
+
+GENEALOGY_TRANSFER_TYPES = ("Split", "Merge", "Blend")
+EXCLUDED_TRANSFER_STATUSES = ("Rejected",)
+DEFAULT_GENEALOGY_DEPTH = 10
+MAX_GENEALOGY_DEPTH = 50
+MAX_GENEALOGY_NODES = 5000
+
+# Walks Transfer links one hop per iteration. UNION (not UNION ALL) keeps each
+# (lot, depth) pair once, so merges/blends do not multiply rows and cycles stop at
+# the depth limit. `{near}`/`{far}` are from_lot/to_lot for a forward trace and
+# swapped for a backward trace. The anchor is cast to the width of `name` because
+# MariaDB types CTE columns from the anchor row.
+_TRACE_NODES_SQL = """
+	WITH RECURSIVE trace (lot, depth) AS (
+		SELECT CAST(%(lot)s AS CHAR(140)), 0
+		UNION
+		SELECT t.`{far}`, trace.depth + 1
+		FROM `tabTransfer` t
+		INNER JOIN trace ON t.`{near}` = trace.lot
+		WHERE trace.depth < %(max_depth)s
+			AND t.`{far}` IS NOT NULL
+			AND t.transfer_type IN %(transfer_types)s
+			AND t.status NOT IN %(excluded_statuses)s
+			{site_condition}
+	)
+	SELECT lot, MIN(depth) AS depth
+	FROM trace
+	GROUP BY lot
+	ORDER BY depth, lot
+	LIMIT %(node_limit)s
+"""
+
+
+def _site_condition(sites: list[str] | None) -> str:
+	if sites is None:
+		return ""
+	return "AND t.site IN %(sites)s"
+
+
+def _trace_nodes(
+	lot: str, direction: str, max_depth: int, sites: list[str] | None, node_limit: int
+) -> dict[str, int]:
+	near, far = ("from_lot", "to_lot") if direction == "forward" else ("to_lot", "from_lot")
+	query = _TRACE_NODES_SQL.format(near=near, far=far, site_condition=_site_condition(sites))
+	rows = frappe.db.sql(
+		query,
+		{
+			"lot": lot,
+			"max_depth": max_depth,
+			"transfer_types": GENEALOGY_TRANSFER_TYPES,
+			"excluded_statuses": EXCLUDED_TRANSFER_STATUSES,
+			"sites": tuple(sites or ("",)),
+			"node_limit": node_limit,
+		},
+		as_dict=True,
+	)
+	return {str(row.get("lot")): int(row.get("depth") or 0) for row in rows}
+
+
+def _trace_edges(
+	nodes: dict[str, int], direction: str, max_depth: int, sites: list[str] | None
+) -> list[dict]:
+	near, far = ("from_lot", "to_lot") if direction == "forward" else ("to_lot", "from_lot")
+	expandable = [lot for lot, depth in nodes.items() if depth < max_depth]
+	if not expandable:
+		return []
+
+	filters: dict[str, Any] = {
+		near: ["in", expandable],
+		"transfer_type": ["in", list(GENEALOGY_TRANSFER_TYPES)],
+		"status": ["not in", list(EXCLUDED_TRANSFER_STATUSES)],
+	}
+	if sites is not None:
+		filters["site"] = ["in", sites]
+
+	rows = frappe.get_all(
+		"Transfer",
+		filters=filters,
+		fields=[
+			"name",
+			"transfer_type",
+			"from_lot",
+			"to_lot",
+			"qty_kg",
+			"transfer_datetime",
+			"site",
+			"status",
+		],
+		order_by="transfer_datetime asc",
+		limit_page_length=0,
+	)
+	return [row for row in rows if row.get(far) in nodes]
+
+
+def trace_lot_genealogy(
+	lot: str,
+	direction: str = "both",
+	max_depth: int = DEFAULT_GENEALOGY_DEPTH,
+	sites: list[str] | None = None,
+	node_limit: int = MAX_GENEALOGY_NODES,
+) -> dict[str, Any]:
+	"""Walk the Transfer graph from `lot` forward (descendants), backward (sources) or both.
+
+	`sites=None` traverses every Site; otherwise only Transfers at the listed
+	Sites are followed. Returns nodes (Lots with their hop distance), edges
+	(Transfers with quantities) and whether the node limit truncated the trace.
+	No permission checks are applied here; callers scope `sites`.
+	"""
+	directions = ("forward", "backward") if direction == "both" else (direction,)
+	max_depth = max(0, min(int(max_depth), MAX_GENEALOGY_DEPTH))
+
+	nodes: dict[str, dict[str, Any]] = {lot: {"lot": lot, "forward_depth": 0, "backward_depth": 0}}
+	edges: dict[str, dict[str, Any]] = {}
+	truncated = False
+	for walk in directions:
+		reached = _trace_nodes(lot, walk, max_depth, sites, node_limit + 1)
+		if len(reached) > node_limit:
+			truncated = True
+			reached = dict(list(reached.items())[:node_limit])
+		for name, depth in reached.items():
+			node = nodes.setdefault(name, {"lot": name, "forward_depth": None, "backward_depth": None})
+			node[f"{walk}_depth"] = depth
+		for edge in _trace_edges(reached, walk, max_depth, sites):
+			edges[edge.get("name")] = edge
+
+	lot_rows = frappe.get_all(
+		"Lot",
+		filters={"name": ["in", list(nodes)]},
+		fields=["name", "lot_number", "site", "crop", "qty_kg", "status"],
+		limit_page_length=0,
+	)
+	for row in lot_rows:
+		nodes[row.get("name")].update(
+			{
+				"lot_number": row.get("lot_number"),
+				"site": row.get("site"),
+				"crop": row.get("crop"),
+				"qty_kg": float(row.get("qty_kg") or 0),
+				"status": row.get("status"),
+			}
+		)
+
+	edge_rows = [
+		{
+			"transfer": edge.get("name"),
+			"transfer_type": edge.get("transfer_type"),
+			"from_lot": edge.get("from_lot"),
+			"to_lot": edge.get("to_lot"),
+			"qty_kg": float(edge.get("qty_kg") or 0),
+			"transfer_datetime": edge.get("transfer_datetime"),
+			"site": edge.get("site"),
+			"status": edge.get("status"),
+		}
+		for edge in edges.values()
+	]
+	return {
+		"lot": lot,
+		"direction": direction,
+		"max_depth": max_depth,
+		"truncated": truncated,
+		"nodes": list(nodes.values()),
+		"edges": edge_rows,
+	}
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from typing import Any
+
+import frappe
+from frappe import utils
+
+from yam_agri_core.yam_agri_core.traceability.closure import (
+	_chunks,
+	_edge_fraction,
+	_merge_ancestor,
+	get_descendants_of_lots,
+)
+from yam_agri_core.yam_agri_core.traceability.genealogy import (
+	EXCLUDED_TRANSFER_STATUSES,
+	GENEALOGY_TRANSFER_TYPES,
+)
+
+SHIPPED_LOT_STATUSES = ("For Dispatch", "Dispatched")
+OPEN_COMPLAINT_STATUSES = ("Open", "Investigating", "Escalated")
+
+
+def _seed_shares_from_closure(
+	seeds: list[str], sites: list[str] | None
+) -> dict[str, dict[str, tuple[int, float]]]:
+	"""{seed: {lot: (depth, share)}} straight from the stored closure."""
+	return {
+		seed: {
+			str(row.get("descendant")): (int(row.get("depth") or 0), float(row.get("qty_fraction") or 0))
+			for row in rows
+		}
+		for seed, rows in get_descendants_of_lots(seeds, sites=sites).items()
+	}
+
+
+def _seed_shares_in_window(
+	seeds: list[str], from_datetime: Any, to_datetime: Any, sites: list[str] | None
+) -> dict[str, dict[str, tuple[int, float]]]:
+	"""{seed: {lot: (depth, share)}} counting only material that left a seed inside the window.
+
+	A seed's share of a downstream Lot is the sum over its first-hop Transfers of
+	the edge fraction times the child's stored share, so restricting the first hop
+	to the window needs one Transfer query and one closure lookup for the children.
+	"""
+	filters: dict[str, Any] = {
+		"to_lot": ["is", "set"],
+		"transfer_type": ["in", list(GENEALOGY_TRANSFER_TYPES)],
+		"status": ["not in", list(EXCLUDED_TRANSFER_STATUSES)],
+	}
+	if from_datetime and to_datetime:
+		filters["transfer_datetime"] = ["between", [from_datetime, to_datetime]]
+	elif from_datetime:
+		filters["transfer_datetime"] = [">=", from_datetime]
+	elif to_datetime:
+		filters["transfer_datetime"] = ["<=", to_datetime]
+	if sites is not None:
+		filters["site"] = ["in", sites]
+
+	first_hop: dict[str, dict[str, float]] = {}
+	for chunk in _chunks(seeds):
+		for row in frappe.get_all(
+			"Transfer",
+			filters={**filters, "from_lot": ["in", chunk]},
+			fields=["from_lot", "to_lot", "qty_kg"],
+			limit_page_length=0,
+		):
+			children = first_hop.setdefault(str(row.get("from_lot")), {})
+			to_lot = str(row.get("to_lot"))
+			children[to_lot] = children.get(to_lot, 0.0) + float(row.get("qty_kg") or 0)
+
+	child_names = sorted({child for children in first_hop.values() for child in children})
+	child_lots: dict[str, dict[str, Any]] = {}
+	for chunk in _chunks(child_names):
+		for row in frappe.get_all(
+			"Lot", filters={"name": ["in", chunk]}, fields=["name", "qty_kg"], limit_page_length=0
+		):
+			child_lots[str(row.get("name"))] = row
+	below_children = _seed_shares_from_closure(child_names, sites)
+
+	shares: dict[str, dict[str, tuple[int, float]]] = {}
+	for seed in seeds:
+		reached: dict[str, tuple[int, float]] = {}
+		for child, qty_kg in first_hop.get(seed, {}).items():
+			fraction = _edge_fraction(qty_kg, child_lots.get(child))
+			_merge_ancestor(reached, child, 1, fraction)
+			for lot, (depth, share) in below_children.get(child, {}).items():
+				_merge_ancestor(reached, lot, depth + 1, fraction * share)
+		shares[seed] = reached
+	return shares
+
+
+def _linked_records(doctype: str, lot_names: list[str], fields: list[str]) -> dict[str, list[dict]]:
+	records: dict[str, list[dict]] = {}
+	for chunk in _chunks(lot_names):
+		for row in frappe.get_all(
+			doctype,
+			filters={"lot": ["in", chunk]},
+			fields=["name", "lot", *fields],
+			limit_page_length=0,
+		):
+			records.setdefault(row.get("lot"), []).append(row)
+	return records
+
+
+def _rank_key(entry: dict[str, Any]) -> tuple:
+	# Shipped material first, then lots customers already complained about, then by exposed quantity.
+	return (
+		not entry["shipped"],
+		-entry["open_complaint_count"],
+		-entry["affected_qty_kg"],
+		entry["depth"],
+		entry["lot"],
+	)
+
+
+def simulate_recall(
+	seed_lots: list[str],
+	from_datetime: Any = None,
+	to_datetime: Any = None,
+	sites: list[str] | None = None,
+) -> dict[str, Any]:
+	"""Impact report for recalling `seed_lots`: every downstream Lot, ranked, with linked records.
+
+	With a time window only Transfers out of the seeds inside the window are
+	followed; without one the stored genealogy closure is used as is. Each Lot's
+	`qty_fraction` is the share of it that came from any seed (summed across seeds
+	and capped at 1, so an upper bound when seeds share lineage). Complaints,
+	Certificates and Evidence Packs on affected Lots are joined set-wise.
+	No permission checks are applied here; callers scope `sites`.
+	"""
+	seeds = list(dict.fromkeys(lot for lot in seed_lots if lot))
+	if from_datetime or to_datetime:
+		shares = _seed_shares_in_window(seeds, from_datetime, to_datetime, sites)
+	else:
+		shares = _seed_shares_from_closure(seeds, sites)
+
+	affected: dict[str, dict[str, Any]] = {}
+	for seed in seeds:
+		for lot, (depth, share) in [(seed, (0, 1.0)), *shares.get(seed, {}).items()]:
+			entry = affected.setdefault(lot, {"lot": lot, "depth": depth, "qty_fraction": 0.0, "sources": []})
+			entry["depth"] = min(entry["depth"], depth)
+			entry["qty_fraction"] = min(1.0, entry["qty_fraction"] + share)
+			entry["sources"].append(seed)
+
+	lot_names = sorted(affected)
+	lots: dict[str, dict[str, Any]] = {}
+	for chunk in _chunks(lot_names):
+		for row in frappe.get_all(
+			"Lot",
+			filters={"name": ["in", chunk]},
+			fields=["name", "lot_number", "site", "crop", "qty_kg", "status"],
+			limit_page_length=0,
+		):
+			lots[str(row.get("name"))] = row
+	complaints = _linked_records("Complaint", lot_names, ["complaint_date", "status", "customer_name"])
+	certificates = _linked_records("Certificate", lot_names, ["cert_type", "expiry_date"])
+	evidence_packs = _linked_records("EvidencePack", lot_names, ["title", "status"])
+
+	report: list[dict[str, Any]] = []
+	for name in lot_names:
+		lot = lots.get(name)
+		if not lot:
+			continue
+		entry = affected[name]
+		qty_kg = float(lot.get("qty_kg") or 0)
+		lot_complaints = complaints.get(name, [])
+		entry.update(
+			{
+				"lot_number": lot.get("lot_number"),
+				"site": lot.get("site"),
+				"crop": lot.get("crop"),
+				"status": lot.get("status"),
+				"shipped": lot.get("status") in SHIPPED_LOT_STATUSES,
+				"qty_kg": qty_kg,
+				"affected_qty_kg": round(qty_kg * entry["qty_fraction"], 3),
+				"complaints": lot_complaints,
+				"open_complaint_count": sum(
+					1 for row in lot_complaints if row.get("status") in OPEN_COMPLAINT_STATUSES
+				),
+				"certificates": certificates.get(name, []),
+				"evidence_packs": evidence_packs.get(name, []),
+			}
+		)
+		report.append(entry)
+
+	report.sort(key=_rank_key)
+	for rank, entry in enumerate(report, start=1):
+		entry["rank"] = rank
+
+	return {
+		"seed_lots": seeds,
+		"from_datetime": from_datetime,
+		"to_datetime": to_datetime,
+		"generated_at": utils.now_datetime(),
+		"summary": {
+			"affected_lots": len(report),
+			"shipped_lots": sum(1 for entry in report if entry["shipped"]),
+			"affected_qty_kg": round(sum(entry["affected_qty_kg"] for entry in report), 3),
+			"complaints": sum(len(entry["complaints"]) for entry in report),
+			"certificates": sum(len(entry["certificates"]) for entry in report),
+			"evidence_packs": sum(len(entry["evidence_packs"]) for entry in report),
+		},
+		"lots": report,
+	}
@@ -0,0 +1,113 @@
+"""Benchmark evidence pack PDF export: one HTML document vs sectioned, parallel rendering.
+
+Needs a bench site, since get_pdf reads Print Settings and runs wkhtmltopdf:
+
+	cd ~/frappe-bench/sites
+	../env/bin/python ../apps/yam_agri_core/tools/benchmark_evidence_pdf.py \\
+		--site dev.localhost --rows 500 5000 50000
+
+Each row count is rendered three ways: the whole pack as one document, as
+sections converted one after another, and as sections converted by the worker
+pool. Use --single-max-rows to skip the single-document run for very large
+packs, where it can exhaust memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "apps" / "yam_agri_core"))
+
+import frappe
+
+from yam_agri_core.yam_agri_core.evidence import pdf as evidence_pdf
+
+
+def _synthetic_rows(count: int) -> list[dict]:
+	doctypes = ("QCTest", "Certificate", "ScaleTicket", "Observation", "Nonconformance")
+	return [
+		{
+			"source_doctype": doctypes[index % len(doctypes)],
+			"source_name": f"BENCH-{index:06d}",
+			"site": "BENCH-SITE",
+			"document_date": f"2026-0{1 + index % 9}-{1 + index % 28:02d}",
+			"status": "Pass" if index % 7 else "Fail",
+			"attachment_count": index % 4,
+			"summary": f"Synthetic evidence row {index} for PDF rendering benchmark",
+		}
+		for index in range(count)
+	]
+
+
+def _context(count: int) -> dict:
+	doc = frappe._dict(
+		name="BENCH-EP",
+		title="Benchmark pack",
+		site="BENCH-SITE",
+		lot=None,
+		from_date="2026-01-01",
+		to_date="2026-09-30",
+		status="Ready",
+	)
+	return {
+		"doc": doc,
+		"counts": {"Synthetic": count},
+		"generated_on": frappe.utils.now_datetime(),
+		"narrative": "",
+	}
+
+
+def _timed(label: str, render) -> None:
+	started = time.perf_counter()
+	content = render()
+	elapsed = time.perf_counter() - started
+	print(f"  {label:>22}: {elapsed:8.2f}s  {len(content) / (1024 * 1024):7.1f} MiB")
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--site", required=True)
+	parser.add_argument("--sites-path", default=".")
+	parser.add_argument("--rows", type=int, nargs="+", default=[500, 5000, 50000])
+	parser.add_argument("--section-rows", type=int, default=evidence_pdf.PDF_SECTION_ROWS)
+	parser.add_argument("--workers", type=int, default=evidence_pdf.PDF_RENDER_WORKERS)
+	parser.add_argument("--single-max-rows", type=int, default=5000)
+	args = parser.parse_args()
+
+	frappe.init(site=args.site, sites_path=args.sites_path)
+	frappe.connect()
+	try:
+		print(f"{os.cpu_count()} CPU(s), {args.section_rows} rows per section, {args.workers} workers")
+		for count in args.rows:
+			rows = _synthetic_rows(count)
+			context = _context(count)
+			print(f"{count} rows")
+			if count <= args.single_max_rows:
+				_timed(
+					"single document",
+					lambda rows=rows, context=context: evidence_pdf.render_evidence_pdf(
+						context, rows, section_rows=max(1, len(rows)), workers=1
+					),
+				)
+			_timed(
+				"sections, sequential",
+				lambda rows=rows, context=context: evidence_pdf.render_evidence_pdf(
+					context, rows, section_rows=args.section_rows, workers=1
+				),
+			)
+			_timed(
+				f"sections, {args.workers} workers",
+				lambda rows=rows, context=context: evidence_pdf.render_evidence_pdf(
+					context, rows, section_rows=args.section_rows, workers=args.workers
+				),
+			)
+	finally:
+		frappe.destroy()
+
+
+if __name__ == "__main__":
+	main()
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import json
+import math
 import os
+import socket
 import threading
 import time
+import zlib
+from array import array
+from collections import OrderedDict
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 
+import httpx
+import msgpack
 import paho.mqtt.client as mqtt
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
 
 app = FastAPI(title="YAM IoT Gateway", version="0.1.0")
@@ -17,18 +25,205 @@ MQTT_HOST = os.environ.get("MQTT_HOST", "mqtt")
 MQTT_PORT = int(os.environ.get("MQTT_PORT", "1883"))
 MQTT_TOPIC = os.environ.get("MQTT_TOPIC", "yam/iot/observation")
 
+# Horizontal scale-out. With MQTT_SHARED_GROUP set, replicas consume through MQTT 5
+# shared subscriptions ($share/<group>/<topic>). With MQTT_PARTITION_COUNT > 0,
+# devices publish to <MQTT_TOPIC>/<crc32(device) % count> and each partition is
+# owned by exactly one replica, which preserves per-device ordering.
+GATEWAY_REPLICA_ID = os.environ.get("GATEWAY_REPLICA_ID", "") or socket.gethostname()
+GATEWAY_REPLICA_COUNT = max(int(os.environ.get("GATEWAY_REPLICA_COUNT", "1")), 1)
+GATEWAY_REPLICA_INDEX = int(os.environ.get("GATEWAY_REPLICA_INDEX", "0"))
+GATEWAY_PEER_URLS = [
+	url.strip().rstrip("/") for url in os.environ.get("GATEWAY_PEER_URLS", "").split(",") if url.strip()
+]
+MQTT_SHARED_GROUP = os.environ.get("MQTT_SHARED_GROUP", "").strip()
+MQTT_PARTITION_COUNT = int(os.environ.get("MQTT_PARTITION_COUNT", "0"))
+# Devices publishing to "<topic>/<suffix>" send MessagePack batches instead of one JSON object.
+MQTT_BATCH_TOPIC_SUFFIX = os.environ.get("MQTT_BATCH_TOPIC_SUFFIX", "msgpack").strip().strip("/")
+MAX_BATCH_READINGS = int(os.environ.get("MAX_BATCH_READINGS", "5000"))
+
 FRAPPE_URL = os.environ.get("FRAPPE_URL", "")
 FRAPPE_SITE = os.environ.get("FRAPPE_SITE", "")
+FRAPPE_API_KEY = os.environ.get("FRAPPE_API_KEY", "")
+FRAPPE_API_SECRET = os.environ.get("FRAPPE_API_SECRET", "")
+
+DEVICE_REGISTRY_METHOD = "yam_agri_core.yam_agri_core.api.observation_monitoring.get_device_registry_snapshot"
+DEVICE_REGISTRY_REFRESH_SECONDS = int(os.environ.get("DEVICE_REGISTRY_REFRESH_SECONDS", "300"))
+
+DEVICE_STATE_CAPACITY = int(os.environ.get("DEVICE_STATE_CAPACITY", "100000"))
+DEVICE_STATE_RATE_TAU_SECONDS = float(os.environ.get("DEVICE_STATE_RATE_TAU_SECONDS", "60"))
+DEVICE_STATE_SNAPSHOT_PATH = os.environ.get(
+	"DEVICE_STATE_SNAPSHOT_PATH", "/var/lib/yam-iot-gateway/device_state.json"
+)
+DEVICE_STATE_SNAPSHOT_SECONDS = int(os.environ.get("DEVICE_STATE_SNAPSHOT_SECONDS", "30"))
+MAX_DEVICE_LIST_LIMIT = 1000
+
+ANOMALY_WINDOW_SIZE = int(os.environ.get("ANOMALY_WINDOW_SIZE", "60"))
+ANOMALY_MIN_SAMPLES = int(os.environ.get("ANOMALY_MIN_SAMPLES", "10"))
+ANOMALY_ZSCORE_THRESHOLD = float(os.environ.get("ANOMALY_ZSCORE_THRESHOLD", "4"))
+ANOMALY_QUARANTINE_ZSCORE = float(os.environ.get("ANOMALY_QUARANTINE_ZSCORE", "8"))
+# Floor for the window stddev: max(absolute, percent of |mean|). Without it a flat-lined
+# series (stddev 0) could never score a z-score, so any spike after it went unflagged.
+ANOMALY_MIN_STDDEV = float(os.environ.get("ANOMALY_MIN_STDDEV", "0.001"))
+ANOMALY_MIN_STDDEV_PCT = float(os.environ.get("ANOMALY_MIN_STDDEV_PCT", "0.1"))
+# JSON object of observation_type -> max absolute change per second, e.g. {"temperature": 0.5}.
+ANOMALY_MAX_RATE_PER_SECOND: dict[str, float] = {
+	str(key): float(value)
+	for key, value in json.loads(os.environ.get("ANOMALY_MAX_RATE_PER_SECOND", "{}") or "{}").items()
+}
+ANOMALY_SERIES_CAPACITY = int(os.environ.get("ANOMALY_SERIES_CAPACITY", "200000"))
+DEDUPE_WINDOW_SECONDS = float(os.environ.get("DEDUPE_WINDOW_SECONDS", "600"))
+DEDUPE_CAPACITY = int(os.environ.get("DEDUPE_CAPACITY", "200000"))
+
+# off: annotate only; flag: set quality_flag=Quarantine; drop: do not forward quarantined readings.
+EDGE_QUARANTINE_MODE = os.environ.get("EDGE_QUARANTINE_MODE", "flag").strip().lower()
 
 _state: dict[str, Any] = {
 	"mqtt_connected": False,
 	"mqtt_last_message_at": "",
 	"mqtt_last_error": "",
 	"mqtt_messages_received": 0,
+	"device_rejections": 0,
+	"duplicates_suppressed": 0,
+	"mqtt_redeliveries": 0,
+	"edge_anomalies_flagged": 0,
+	"edge_quarantined": 0,
+	"edge_dropped": 0,
 	"ingest_events": [],
 }
 _state_lock = threading.Lock()
 
+# Device name -> {"site", "status", "device_name"}; mirrors the Frappe Device registry cache.
+_device_registry: dict[str, dict[str, Any]] = {}
+_device_registry_meta: dict[str, Any] = {"loaded": False, "loaded_at": "", "last_error": ""}
+_device_registry_lock = threading.Lock()
+
+
+class _DeviceState:
+	"""Live per-device record; `__slots__` keeps per-device overhead small at ~100k devices."""
+
+	__slots__ = (
+		"device",
+		"error_count",
+		"first_seen",
+		"last_seen",
+		"last_values",
+		"message_count",
+		"rate_ewma",
+		"site",
+	)
+
+	def __init__(self, device: str, site: str, now: float) -> None:
+		self.device = device
+		self.site = site
+		self.first_seen = now
+		self.last_seen = 0.0
+		self.message_count = 0
+		self.error_count = 0
+		self.rate_ewma = 0.0
+		# observation_type -> (value, unit, observed_at)
+		self.last_values: dict[str, tuple[float, str, str]] = {}
+
+	def to_dict(self, now: float) -> dict[str, Any]:
+		return {
+			"device": self.device,
+			"site": self.site,
+			"first_seen": _epoch_to_iso(self.first_seen),
+			"last_seen": _epoch_to_iso(self.last_seen),
+			"seconds_since_last_seen": round(max(now - self.last_seen, 0.0), 3) if self.last_seen else None,
+			"message_count": self.message_count,
+			"error_count": self.error_count,
+			"messages_per_second": round(_decayed_rate(self.rate_ewma, self.last_seen, now), 6),
+			"last_values": {
+				observation_type: {"value": value, "unit": unit, "observed_at": observed_at}
+				for observation_type, (value, unit, observed_at) in self.last_values.items()
+			},
+		}
+
+	def to_snapshot(self) -> list[Any]:
+		return [
+			self.device,
+			self.site,
+			self.first_seen,
+			self.last_seen,
+			self.message_count,
+			self.error_count,
+			self.rate_ewma,
+			{key: list(value) for key, value in self.last_values.items()},
+		]
+
+	@classmethod
+	def from_snapshot(cls, row: list[Any]) -> _DeviceState:
+		record = cls(str(row[0]), str(row[1]), float(row[2]))
+		record.last_seen = float(row[3])
+		record.message_count = int(row[4])
+		record.error_count = int(row[5])
+		record.rate_ewma = float(row[6])
+		record.last_values = {
+			str(key): (float(value[0]), str(value[1]), str(value[2])) for key, value in (row[7] or {}).items()
+		}
+		return record
+
+
+# Least recently seen device first, so eviction and "most recent" listing are O(1) per item.
+_device_states: OrderedDict[str, _DeviceState] = OrderedDict()
+_device_state_lock = threading.Lock()
+
+
+class _SeriesWindow:
+	"""Fixed-size ring buffer of recent readings for one (device, observation_type) series.
+
+	Running sums give O(1) mean/stddev per reading; they are recomputed from the
+	buffer on every wrap so floating-point drift stays bounded.
+	"""
+
+	__slots__ = ("count", "index", "last_at", "last_value", "total", "total_sq", "values")
+
+	def __init__(self, size: int) -> None:
+		self.values = array("d", bytes(8 * size))
+		self.index = 0
+		self.count = 0
+		self.total = 0.0
+		self.total_sq = 0.0
+		self.last_value = 0.0
+		self.last_at = 0.0
+
+	def stats(self) -> tuple[float, float]:
+		if not self.count:
+			return 0.0, 0.0
+		mean = self.total / self.count
+		variance = max(self.total_sq / self.count - mean * mean, 0.0)
+		return mean, math.sqrt(variance)
+
+	def push(self, value: float, at: float) -> None:
+		size = len(self.values)
+		if self.count == size:
+			evicted = self.values[self.index]
+			self.total -= evicted
+			self.total_sq -= evicted * evicted
+		else:
+			self.count += 1
+		self.values[self.index] = value
+		self.total += value
+		self.total_sq += value * value
+		self.index = (self.index + 1) % size
+		if self.index == 0:
+			window = self.values[: self.count]
+			self.total = math.fsum(window)
+			self.total_sq = math.fsum(item * item for item in window)
+		self.last_value = value
+		self.last_at = at
+
+
+# (device, observation_type) -> window, least recently updated first.
+_series_windows: OrderedDict[tuple[str, str], _SeriesWindow] = OrderedDict()
+_series_lock = threading.Lock()
+
+
+# Dedupe key -> last sighting (monotonic seconds). Kept in last-sighting order so
+# both the LRU capacity bound and the time window evict from the front in O(1).
+_dedupe_index: OrderedDict[tuple[str, ...], float] = OrderedDict()
+_dedupe_lock = threading.Lock()
+
 
 class ObservationIngestPayload(BaseModel):
 	site: str = Field(min_length=1)
@@ -45,6 +240,102 @@ def _utc_now_iso() -> str:
 	return datetime.now(timezone.utc).isoformat()
 
 
+def _epoch_to_iso(value: float) -> str:
+	if not value:
+		return ""
+	return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+def _decayed_rate(rate_ewma: float, last_seen: float, now: float) -> float:
+	if not last_seen:
+		return 0.0
+	return rate_ewma * math.exp(-max(now - last_seen, 0.0) / DEVICE_STATE_RATE_TAU_SECONDS)
+
+
+def _get_or_create_device_state(device: str, site: str, now: float) -> _DeviceState:
+	record = _device_states.get(device)
+	if record is None:
+		record = _DeviceState(device, site, now)
+		_device_states[device] = record
+		while len(_device_states) > DEVICE_STATE_CAPACITY:
+			_device_states.popitem(last=False)
+	else:
+		_device_states.move_to_end(device)
+		if site:
+			record.site = site
+	return record
+
+
+def _update_device_state(payload: dict[str, Any], now: float | None = None) -> None:
+	device = str(payload.get("device") or "")
+	if not device:
+		return
+	now = time.time() if now is None else now
+
+	with _device_state_lock:
+		record = _get_or_create_device_state(device, str(payload.get("site") or ""), now)
+		# Exponentially decayed event rate: messages per second over ~DEVICE_STATE_RATE_TAU_SECONDS.
+		record.rate_ewma = _decayed_rate(record.rate_ewma, record.last_seen, now) + (
+			1.0 / DEVICE_STATE_RATE_TAU_SECONDS
+		)
+		record.last_seen = now
+		record.message_count += 1
+		record.last_values[str(payload.get("observation_type") or "sensor")] = (
+			float(payload.get("value") or 0),
+			str(payload.get("unit") or ""),
+			str(payload.get("observed_at") or _epoch_to_iso(now)),
+		)
+
+
+def _record_device_error(device: str, site: str, now: float | None = None) -> None:
+	if not device:
+		return
+	now = time.time() if now is None else now
+	with _device_state_lock:
+		record = _get_or_create_device_state(device, site, now)
+		record.error_count += 1
+
+
+def _write_device_state_snapshot(path: str = "") -> int:
+	target = Path(path or DEVICE_STATE_SNAPSHOT_PATH)
+	with _device_state_lock:
+		rows = [record.to_snapshot() for record in _device_states.values()]
+
+	target.parent.mkdir(parents=True, exist_ok=True)
+	tmp_path = target.with_suffix(target.suffix + ".tmp")
+	tmp_path.write_text(
+		json.dumps({"saved_at": time.time(), "devices": rows}, separators=(",", ":")),
+		encoding="utf-8",
+	)
+	os.replace(tmp_path, target)
+	return len(rows)
+
+
+def _load_device_state_snapshot(path: str = "") -> int:
+	source = Path(path or DEVICE_STATE_SNAPSHOT_PATH)
+	if not source.exists():
+		return 0
+
+	snapshot = json.loads(source.read_text(encoding="utf-8"))
+	records = [_DeviceState.from_snapshot(row) for row in snapshot.get("devices") or []]
+	records.sort(key=lambda record: record.last_seen)
+	with _device_state_lock:
+		_device_states.clear()
+		for record in records[-DEVICE_STATE_CAPACITY:]:
+			_device_states[record.device] = record
+		return len(_device_states)
+
+
+def _run_device_state_snapshot_loop() -> None:
+	while True:
+		time.sleep(max(DEVICE_STATE_SNAPSHOT_SECONDS, 5))
+		try:
+			_write_device_state_snapshot()
+		except (OSError, TypeError, ValueError) as exc:
+			with _state_lock:
+				_state["mqtt_last_error"] = f"device_state_snapshot_error={exc}"
+
+
 def _record_ingest_event(source: str, payload: dict[str, Any]) -> None:
 	with _state_lock:
 		events = _state.get("ingest_events") or []
@@ -74,16 +365,415 @@ def _transform_mqtt_message(raw: dict[str, Any]) -> dict[str, Any]:
 	}
 
 
+def _expand_batch(batch: dict[str, Any], encoding: str) -> list[dict[str, Any]]:
+	"""Expand a batched payload into transformed readings.
+
+	Batch layout (MessagePack, or JSON with a "readings" key)::
+
+		{"site": "S", "device": "D", "t0": <epoch s>, "batch_id": "b-17",
+		 "unit": "C", "types": ["temperature", "humidity"],
+		 "readings": [[dt, type, value], [dt, type, value, unit, quality_flag], ...]}
+
+	`dt` is seconds relative to `t0`. `type` is a name or an index into `types`.
+	`unit` and `quality_flag` per row are optional and default to the header.
+	"""
+	rows = batch.get("readings")
+	if not isinstance(rows, list) or not rows:
+		raise ValueError("batch has no readings")
+	if len(rows) > MAX_BATCH_READINGS:
+		raise ValueError(f"batch exceeds {MAX_BATCH_READINGS} readings")
+
+	site = str(batch.get("site") or "").strip()
+	device = str(batch.get("device") or "").strip()
+	t0 = float(batch.get("t0") or 0)
+	unit = str(batch.get("unit") or "")
+	quality_flag = str(batch.get("quality_flag") or "OK")
+	types = [str(name) for name in batch.get("types") or []]
+	batch_id = batch.get("batch_id")
+	batch_id = str(batch_id) if batch_id not in (None, "") else ""
+
+	readings: list[dict[str, Any]] = []
+	for seq, row in enumerate(rows):
+		if not isinstance(row, (list, tuple)) or len(row) < 3:
+			raise ValueError(f"batch reading {seq} must be [dt, type, value, ...]")
+		observation_type = row[1]
+		if isinstance(observation_type, bool) or (isinstance(observation_type, int) and observation_type < 0):
+			raise ValueError(f"batch reading {seq} has an invalid type index {observation_type!r}")
+		if isinstance(observation_type, int):
+			observation_type = types[observation_type]
+		raw_payload: dict[str, Any] = {"encoding": encoding, "seq": seq}
+		if batch_id:
+			raw_payload["batch_id"] = batch_id
+			raw_payload["message_id"] = f"{batch_id}:{seq}"
+		readings.append(
+			{
+				"site": site,
+				"device": device,
+				"observation_type": str(observation_type or "sensor").strip(),
+				"value": float(row[2] or 0),
+				"unit": str(row[3]) if len(row) > 3 and row[3] is not None else unit,
+				"quality_flag": str(row[4]) if len(row) > 4 and row[4] else quality_flag,
+				"observed_at": _epoch_to_iso(t0 + float(row[0] or 0)) if t0 else None,
+				"raw_payload": raw_payload,
+			}
+		)
+	return readings
+
+
+def _is_batch_topic(topic: str) -> bool:
+	return bool(MQTT_BATCH_TOPIC_SUFFIX) and topic.endswith(f"/{MQTT_BATCH_TOPIC_SUFFIX}")
+
+
+def _decode_mqtt_payload(topic: str, payload: bytes) -> tuple[Any, list[dict[str, Any]]]:
+	"""Decode an MQTT payload into transformed readings.
+
+	Returns the decoded object (for error attribution) and the readings. JSON
+	single readings, JSON batches and MessagePack batches all end up as the same
+	list fed to `_process_readings`.
+	"""
+	if _is_batch_topic(topic):
+		raw = msgpack.unpackb(payload, raw=False)
+		if not isinstance(raw, dict):
+			raise ValueError("msgpack batch must be a map")
+		return raw, _expand_batch(raw, "msgpack")
+
+	raw = json.loads(payload.decode("utf-8"))
+	if not isinstance(raw, dict):
+		raise ValueError("payload must be a JSON object")
+	if "readings" in raw:
+		return raw, _expand_batch(raw, "json")
+	return raw, [_transform_mqtt_message(raw)]
+
+
+def _fetch_device_registry() -> dict[str, dict[str, Any]]:
+	headers = {"Accept": "application/json"}
+	if FRAPPE_SITE:
+		headers["Host"] = FRAPPE_SITE
+	if FRAPPE_API_KEY and FRAPPE_API_SECRET:
+		headers["Authorization"] = f"token {FRAPPE_API_KEY}:{FRAPPE_API_SECRET}"
+
+	response = httpx.get(
+		f"{FRAPPE_URL.rstrip('/')}/api/method/{DEVICE_REGISTRY_METHOD}",
+		headers=headers,
+		timeout=10,
+	)
+	response.raise_for_status()
+	message = (response.json() or {}).get("message") or {}
+	registry: dict[str, dict[str, Any]] = {}
+	for row in message.get("devices") or []:
+		name = str(row.get("name") or "").strip()
+		if name:
+			registry[name] = {
+				"site": str(row.get("site") or ""),
+				"status": str(row.get("status") or ""),
+				"device_name": str(row.get("device_name") or ""),
+			}
+	return registry
+
+
+def _refresh_device_registry() -> None:
+	try:
+		registry = _fetch_device_registry()
+	except (httpx.HTTPError, ValueError) as exc:
+		with _device_registry_lock:
+			_device_registry_meta["last_error"] = f"registry_refresh_error={exc}"
+		return
+
+	with _device_registry_lock:
+		_device_registry.clear()
+		_device_registry.update(registry)
+		_device_registry_meta["loaded"] = True
+		_device_registry_meta["loaded_at"] = _utc_now_iso()
+		_device_registry_meta["last_error"] = ""
+
+
+def _run_device_registry_loop() -> None:
+	while True:
+		_refresh_device_registry()
+		time.sleep(max(DEVICE_REGISTRY_REFRESH_SECONDS, 10))
+
+
+def _check_device_ownership(payload: dict[str, Any]) -> str:
+	"""Return a rejection reason when the device is not registered to the payload site.
+
+	Until the registry has been loaded from Frappe every device is accepted, so the
+	gateway keeps working when Frappe is unreachable or not configured.
+	"""
+	with _device_registry_lock:
+		if not _device_registry_meta.get("loaded"):
+			return ""
+		record = _device_registry.get(str(payload.get("device") or ""))
+
+	if not record:
+		return "unknown_device"
+	if record.get("site") != payload.get("site"):
+		return "device_site_mismatch"
+	return ""
+
+
+def _record_device_rejection(reason: str, payload: dict[str, Any]) -> None:
+	with _state_lock:
+		_state["device_rejections"] = int(_state.get("device_rejections") or 0) + 1
+		_state["mqtt_last_error"] = (
+			f"device_rejected={reason}; device={payload.get('device')}; site={payload.get('site')}"
+		)
+
+
+def _parse_observed_at(raw_value: Any, default: float) -> float:
+	if isinstance(raw_value, (int, float)):
+		return float(raw_value)
+	text = str(raw_value or "").strip()
+	if not text:
+		return default
+	try:
+		parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+	except ValueError:
+		return default
+	if parsed.tzinfo is None:
+		parsed = parsed.replace(tzinfo=timezone.utc)
+	return parsed.timestamp()
+
+
+def _score_readings(readings: list[dict[str, Any]], now: float | None = None) -> list[dict[str, Any]]:
+	"""Score a batch of readings against their rolling (device, type) windows.
+
+	Each reading is scored against the window *before* it is added (quarantined
+	readings are never added), and the whole batch is processed under a single
+	lock acquisition. Returns one assessment per reading with the z-score, rate
+	of change and any flags raised.
+	"""
+	now = time.time() if now is None else now
+	assessments: list[dict[str, Any]] = []
+	with _series_lock:
+		for payload in readings:
+			value = float(payload.get("value") or 0)
+			observation_type = str(payload.get("observation_type") or "sensor")
+			at = _parse_observed_at(payload.get("observed_at"), now)
+			flags: list[str] = []
+			zscore = None
+			rate_of_change = None
+
+			if not math.isfinite(value):
+				assessments.append(
+					{"flags": ["non_finite"], "zscore": None, "rate_of_change": None, "quarantine": True}
+				)
+				continue
+
+			key = (str(payload.get("device") or ""), observation_type)
+			window = _series_windows.get(key)
+			if window is None:
+				window = _SeriesWindow(ANOMALY_WINDOW_SIZE)
+				_series_windows[key] = window
+				while len(_series_windows) > ANOMALY_SERIES_CAPACITY:
+					_series_windows.popitem(last=False)
+			else:
+				_series_windows.move_to_end(key)
+
+			if window.count >= ANOMALY_MIN_SAMPLES:
+				mean, stddev = window.stats()
+				stddev = max(stddev, ANOMALY_MIN_STDDEV, abs(mean) * ANOMALY_MIN_STDDEV_PCT / 100.0)
+				if stddev > 0:
+					zscore = (value - mean) / stddev
+					if abs(zscore) >= ANOMALY_ZSCORE_THRESHOLD:
+						flags.append("zscore")
+
+			max_rate = ANOMALY_MAX_RATE_PER_SECOND.get(observation_type)
+			if window.count and at > window.last_at:
+				rate_of_change = (value - window.last_value) / (at - window.last_at)
+				if max_rate is not None and abs(rate_of_change) > max_rate:
+					flags.append("rate_of_change")
+
+			quarantine = zscore is not None and abs(zscore) >= ANOMALY_QUARANTINE_ZSCORE
+			# Quarantined outliers stay out of the window, so a faulty sensor cannot
+			# widen the baseline and mask its own next readings.
+			if not quarantine:
+				window.push(value, at)
+			assessments.append(
+				{
+					"flags": flags,
+					"zscore": round(zscore, 4) if zscore is not None else None,
+					"rate_of_change": round(rate_of_change, 6) if rate_of_change is not None else None,
+					"quarantine": quarantine,
+				}
+			)
+	return assessments
+
+
+def _apply_edge_anomaly_stage(readings: list[dict[str, Any]]) -> list[bool]:
+	"""Attach edge anomaly flags to each payload; return which readings to forward."""
+	forward: list[bool] = []
+	flagged = quarantined = dropped = 0
+	for payload, assessment in zip(readings, _score_readings(readings), strict=True):
+		if not assessment["flags"]:
+			forward.append(True)
+			continue
+
+		flagged += 1
+		action = "flag"
+		if assessment["quarantine"] and EDGE_QUARANTINE_MODE in {"flag", "drop"}:
+			action = "drop" if EDGE_QUARANTINE_MODE == "drop" else "quarantine"
+			payload["quality_flag"] = "Quarantine"
+			quarantined += 1
+
+		raw_payload = payload.get("raw_payload")
+		if not isinstance(raw_payload, dict):
+			raw_payload = {}
+			payload["raw_payload"] = raw_payload
+		raw_payload["edge_anomaly"] = {**assessment, "action": action, "window_size": ANOMALY_WINDOW_SIZE}
+
+		if action == "drop":
+			dropped += 1
+			forward.append(False)
+		else:
+			forward.append(True)
+
+	if flagged:
+		with _state_lock:
+			_state["edge_anomalies_flagged"] = int(_state.get("edge_anomalies_flagged") or 0) + flagged
+			_state["edge_quarantined"] = int(_state.get("edge_quarantined") or 0) + quarantined
+			_state["edge_dropped"] = int(_state.get("edge_dropped") or 0) + dropped
+	return forward
+
+
+def _dedupe_key(payload: dict[str, Any]) -> tuple[str, ...] | None:
+	"""Key a reading by message id, else by (device, observed_at, observation_type).
+
+	Readings without a message id or timestamp cannot be told apart from a real
+	repeat reading, so they are never treated as duplicates.
+	"""
+	device = str(payload.get("device") or "")
+	raw_payload = payload.get("raw_payload")
+	if isinstance(raw_payload, dict):
+		message_id = raw_payload.get("message_id") or raw_payload.get("msg_id")
+		if message_id not in (None, ""):
+			return ("id", device, str(message_id))
+
+	observed_at = payload.get("observed_at")
+	if observed_at in (None, ""):
+		return None
+	return ("obs", device, str(observed_at), str(payload.get("observation_type") or ""))
+
+
+def _is_duplicate(key: tuple[str, ...] | None, now: float | None = None) -> bool:
+	if key is None:
+		return False
+	now = time.monotonic() if now is None else now
+	with _dedupe_lock:
+		while _dedupe_index:
+			oldest_key = next(iter(_dedupe_index))
+			if now - _dedupe_index[oldest_key] <= DEDUPE_WINDOW_SECONDS:
+				break
+			del _dedupe_index[oldest_key]
+
+		seen = key in _dedupe_index
+		_dedupe_index[key] = now
+		_dedupe_index.move_to_end(key)
+		while len(_dedupe_index) > DEDUPE_CAPACITY:
+			_dedupe_index.popitem(last=False)
+		return seen
+
+
+def _process_readings(source: str, readings: list[dict[str, Any]]) -> list[str]:
+	"""Run transformed readings through ownership, anomaly and state stages.
+
+	Returns one outcome per reading: "accepted", "dropped", "duplicate" or
+	"rejected:<reason>".
+	"""
+	outcomes: list[str] = [""] * len(readings)
+	owned: list[int] = []
+	duplicates = 0
+	for idx, payload in enumerate(readings):
+		if _is_duplicate(_dedupe_key(payload)):
+			duplicates += 1
+			outcomes[idx] = "duplicate"
+			continue
+		rejection = _check_device_ownership(payload)
+		if rejection:
+			_record_device_rejection(rejection, payload)
+			outcomes[idx] = f"rejected:{rejection}"
+		else:
+			owned.append(idx)
+
+	if duplicates:
+		with _state_lock:
+			_state["duplicates_suppressed"] = int(_state.get("duplicates_suppressed") or 0) + duplicates
+
+	owned_readings = [readings[idx] for idx in owned]
+	forward = _apply_edge_anomaly_stage(owned_readings)
+	for idx, payload, should_forward in zip(owned, owned_readings, forward, strict=True):
+		_update_device_state(payload)
+		if not should_forward:
+			outcomes[idx] = "dropped"
+			continue
+		_record_ingest_event(source, payload)
+		outcomes[idx] = "accepted"
+	return outcomes
+
+
+def _device_partition(device: str, partition_count: int | None = None) -> int:
+	"""Stable partition for a device; publishers must use the same function."""
+	count = MQTT_PARTITION_COUNT if partition_count is None else partition_count
+	if count <= 0:
+		return 0
+	return zlib.crc32(device.encode("utf-8")) % count
+
+
+def device_topic(device: str) -> str:
+	"""Topic a device should publish to under the current partitioning scheme."""
+	if MQTT_PARTITION_COUNT <= 0:
+		return MQTT_TOPIC
+	return f"{MQTT_TOPIC}/{_device_partition(device)}"
+
+
+def _owned_partitions() -> list[int]:
+	return [
+		partition
+		for partition in range(MQTT_PARTITION_COUNT)
+		if partition % GATEWAY_REPLICA_COUNT == GATEWAY_REPLICA_INDEX % GATEWAY_REPLICA_COUNT
+	]
+
+
+def _subscription_topics() -> list[str]:
+	"""Topic filters this replica subscribes to.
+
+	Partitioned topics get one shared group per partition: only the owning
+	replica joins it, so ordering holds, while a replacement pod with the same
+	index can join during a rolling update without double delivery.
+	"""
+	if MQTT_PARTITION_COUNT <= 0:
+		base_topics = [MQTT_TOPIC]
+		if MQTT_SHARED_GROUP:
+			base_topics = [f"$share/{MQTT_SHARED_GROUP}/{MQTT_TOPIC}"]
+	else:
+		base_topics = []
+		for partition in _owned_partitions():
+			topic = f"{MQTT_TOPIC}/{partition}"
+			if MQTT_SHARED_GROUP:
+				topic = f"$share/{MQTT_SHARED_GROUP}-p{partition}/{topic}"
+			base_topics.append(topic)
+
+	if not MQTT_BATCH_TOPIC_SUFFIX:
+		return base_topics
+	topics: list[str] = []
+	for topic in base_topics:
+		topics.extend((topic, f"{topic}/{MQTT_BATCH_TOPIC_SUFFIX}"))
+	return topics
+
+
 def _on_connect(client: mqtt.Client, _userdata: Any, _flags: Any, rc: int, _properties: Any = None) -> None:
 	with _state_lock:
 		_state["mqtt_connected"] = rc == 0
 		if rc != 0:
 			_state["mqtt_last_error"] = f"connect_rc={rc}"
 	if rc == 0:
-		client.subscribe(MQTT_TOPIC, qos=1)
+		topics = _subscription_topics()
+		if topics:
+			client.subscribe([(topic, 1) for topic in topics])
 
 
-def _on_disconnect(_client: mqtt.Client, _userdata: Any, rc: int, _properties: Any = None) -> None:
+def _on_disconnect(
+	_client: mqtt.Client, _userdata: Any, _flags: Any, rc: int, _properties: Any = None
+) -> None:
 	with _state_lock:
 		_state["mqtt_connected"] = False
 		if rc != 0:
@@ -91,22 +781,32 @@ def _on_disconnect(_client: mqtt.Client, _userdata: Any, rc: int, _properties: A
 
 
 def _on_message(_client: mqtt.Client, _userdata: Any, msg: mqtt.MQTTMessage) -> None:
-	payload_text = ""
+	raw: Any = None
 	try:
-		payload_text = msg.payload.decode("utf-8")
-		raw = json.loads(payload_text)
-		transformed = _transform_mqtt_message(raw)
-		_record_ingest_event("mqtt", transformed)
+		raw, readings = _decode_mqtt_payload(msg.topic, msg.payload)
 		with _state_lock:
 			_state["mqtt_messages_received"] = int(_state.get("mqtt_messages_received") or 0) + 1
+			_state["mqtt_readings_received"] = int(_state.get("mqtt_readings_received") or 0) + len(readings)
 			_state["mqtt_last_message_at"] = _utc_now_iso()
-	except (ValueError, TypeError) as exc:
+			if msg.dup:
+				_state["mqtt_redeliveries"] = int(_state.get("mqtt_redeliveries") or 0) + 1
+		_process_readings("mqtt", readings)
+	except (ValueError, TypeError, IndexError) as exc:
+		payload_preview = msg.payload[:200].decode("utf-8", errors="replace")
 		with _state_lock:
-			_state["mqtt_last_error"] = f"message_parse_error={exc}; payload={payload_text[:200]}"
+			_state["mqtt_last_error"] = (
+				f"message_parse_error={exc}; topic={msg.topic}; payload={payload_preview}"
+			)
+		if isinstance(raw, dict):
+			_record_device_error(str(raw.get("device") or "").strip(), str(raw.get("site") or "").strip())
 
 
 def _run_mqtt_loop() -> None:
-	client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+	client = mqtt.Client(
+		mqtt.CallbackAPIVersion.VERSION2,
+		client_id=f"yam-iot-gateway-{GATEWAY_REPLICA_ID}",
+		protocol=mqtt.MQTTv5 if MQTT_SHARED_GROUP else mqtt.MQTTv311,
+	)
 	client.on_connect = _on_connect
 	client.on_disconnect = _on_disconnect
 	client.on_message = _on_message
@@ -126,6 +826,21 @@ def _run_mqtt_loop() -> None:
 def startup_event() -> None:
 	thread = threading.Thread(target=_run_mqtt_loop, daemon=True, name="mqtt-loop")
 	thread.start()
+	if DEVICE_STATE_SNAPSHOT_PATH:
+		try:
+			_load_device_state_snapshot()
+		except (OSError, TypeError, ValueError, IndexError) as exc:
+			with _state_lock:
+				_state["mqtt_last_error"] = f"device_state_restore_error={exc}"
+		snapshot_thread = threading.Thread(
+			target=_run_device_state_snapshot_loop, daemon=True, name="device-state-snapshot"
+		)
+		snapshot_thread.start()
+	if FRAPPE_URL:
+		registry_thread = threading.Thread(
+			target=_run_device_registry_loop, daemon=True, name="device-registry-refresh"
+		)
+		registry_thread.start()
 
 
 @app.get("/health")
@@ -144,22 +859,168 @@ def health() -> dict[str, Any]:
 
 @app.get("/status")
 def status() -> dict[str, Any]:
+	with _device_registry_lock:
+		registry_status = {
+			"loaded": bool(_device_registry_meta.get("loaded")),
+			"loaded_at": _device_registry_meta.get("loaded_at") or "",
+			"device_count": len(_device_registry),
+			"last_error": _device_registry_meta.get("last_error") or "",
+		}
+	with _device_state_lock:
+		tracked_devices = len(_device_states)
+	with _dedupe_lock:
+		dedupe_index_size = len(_dedupe_index)
 	with _state_lock:
 		return {
 			"status": "ok",
+			"replica_id": GATEWAY_REPLICA_ID,
+			"subscriptions": _subscription_topics(),
 			"mqtt_connected": bool(_state.get("mqtt_connected")),
 			"mqtt_messages_received": int(_state.get("mqtt_messages_received") or 0),
+			"mqtt_readings_received": int(_state.get("mqtt_readings_received") or 0),
 			"mqtt_last_message_at": _state.get("mqtt_last_message_at") or "",
+			"device_rejections": int(_state.get("device_rejections") or 0),
+			"duplicates_suppressed": int(_state.get("duplicates_suppressed") or 0),
+			"mqtt_redeliveries": int(_state.get("mqtt_redeliveries") or 0),
+			"dedupe_index_size": dedupe_index_size,
+			"edge_anomalies_flagged": int(_state.get("edge_anomalies_flagged") or 0),
+			"edge_quarantined": int(_state.get("edge_quarantined") or 0),
+			"edge_dropped": int(_state.get("edge_dropped") or 0),
+			"device_registry": registry_status,
+			"tracked_devices": tracked_devices,
 			"recent_ingest_events": (_state.get("ingest_events") or [])[-20:],
 		}
 
 
+_AGGREGATED_COUNTERS = (
+	"mqtt_messages_received",
+	"mqtt_readings_received",
+	"device_rejections",
+	"duplicates_suppressed",
+	"mqtt_redeliveries",
+	"edge_anomalies_flagged",
+	"edge_quarantined",
+	"edge_dropped",
+	"tracked_devices",
+)
+
+
+@app.get("/metrics")
+def metrics() -> dict[str, Any]:
+	"""Per-replica counters, aggregated across replicas by /cluster/status."""
+	with _device_state_lock:
+		tracked_devices = len(_device_states)
+	with _state_lock:
+		counters = {key: int(_state.get(key) or 0) for key in _AGGREGATED_COUNTERS if key in _state}
+		connected = bool(_state.get("mqtt_connected"))
+	counters["tracked_devices"] = tracked_devices
+	return {
+		"replica_id": GATEWAY_REPLICA_ID,
+		"replica_index": GATEWAY_REPLICA_INDEX,
+		"replica_count": GATEWAY_REPLICA_COUNT,
+		"mqtt_connected": connected,
+		"subscriptions": _subscription_topics(),
+		"counters": counters,
+	}
+
+
+def _fetch_peer_metrics(url: str) -> dict[str, Any]:
+	try:
+		response = httpx.get(f"{url}/metrics", timeout=2)
+		response.raise_for_status()
+		return {"url": url, "reachable": True, **response.json()}
+	except (httpx.HTTPError, ValueError) as exc:
+		return {"url": url, "reachable": False, "error": str(exc)}
+
+
+@app.get("/cluster/status")
+def cluster_status() -> dict[str, Any]:
+	"""Sum counters from this replica and every GATEWAY_PEER_URLS replica."""
+	replicas = [{"url": "self", "reachable": True, **metrics()}]
+	replicas.extend(_fetch_peer_metrics(url) for url in GATEWAY_PEER_URLS)
+
+	totals = dict.fromkeys(_AGGREGATED_COUNTERS, 0)
+	for replica in replicas:
+		for key, value in (replica.get("counters") or {}).items():
+			if key in totals:
+				totals[key] += int(value or 0)
+
+	return {
+		"status": "ok" if all(replica.get("reachable") for replica in replicas) else "degraded",
+		"replica_count": len(replicas),
+		"replicas_reachable": sum(1 for replica in replicas if replica.get("reachable")),
+		"totals": totals,
+		"replicas": replicas,
+	}
+
+
+@app.on_event("shutdown")
+def shutdown_event() -> None:
+	if DEVICE_STATE_SNAPSHOT_PATH:
+		try:
+			_write_device_state_snapshot()
+		except (OSError, TypeError, ValueError):
+			pass
+
+
+@app.get("/devices")
+def list_devices(
+	site: str | None = None,
+	stale_after_seconds: float | None = None,
+	limit: int = 100,
+	offset: int = 0,
+) -> dict[str, Any]:
+	"""List tracked devices, most recently seen first.
+
+	`stale_after_seconds` returns only devices silent for at least that long.
+	"""
+	safe_limit = max(1, min(int(limit), MAX_DEVICE_LIST_LIMIT))
+	safe_offset = max(0, int(offset))
+	now = time.time()
+
+	rows: list[dict[str, Any]] = []
+	matched = 0
+	with _device_state_lock:
+		tracked = len(_device_states)
+		for record in reversed(_device_states.values()):
+			if site and record.site != site:
+				continue
+			if stale_after_seconds is not None and now - record.last_seen < stale_after_seconds:
+				continue
+			matched += 1
+			if matched <= safe_offset or len(rows) >= safe_limit:
+				continue
+			rows.append(record.to_dict(now))
+
+	return {
+		"status": "ok",
+		"device_count": tracked,
+		"matched": matched,
+		"limit": safe_limit,
+		"offset": safe_offset,
+		"devices": rows,
+	}
+
+
+@app.get("/devices/{device_id}")
+def get_device(device_id: str) -> dict[str, Any]:
+	with _device_state_lock:
+		record = _device_states.get(device_id)
+		if record is None:
+			raise HTTPException(status_code=404, detail=f"Device '{device_id}' has not been seen")
+		return {"status": "ok", "device": record.to_dict(time.time())}
+
+
 @app.post("/ingest/observation")
 def ingest_observation(payload: ObservationIngestPayload) -> dict[str, Any]:
 	transformed = payload.model_dump()
-	_record_ingest_event("http", transformed)
+	outcome = _process_readings("http", [transformed])[0]
+	if outcome.startswith("rejected:"):
+		raise HTTPException(status_code=422, detail=f"Device rejected: {outcome.split(':', 1)[1]}")
 	return {
-		"status": "accepted",
+		"status": {"accepted": "accepted", "duplicate": "duplicate"}.get(outcome, "quarantined_at_edge"),
+		"quality_flag": transformed.get("quality_flag"),
+		"edge_anomaly": (transformed.get("raw_payload") or {}).get("edge_anomaly"),
 		"source": "http",
 		"site": transformed.get("site"),
 		"device": transformed.get("device"),
@@ -0,0 +1,90 @@
+"""Compare JSON-per-reading and MessagePack-batch MQTT payloads.
+
+Reports bytes on the wire and gateway decode throughput (decode + transform,
+excluding the processing pipeline) for the same set of readings:
+
+	cd tools/iot_gateway
+	python benchmark_payloads.py --readings 60 --batches 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
+import msgpack
+from app import MQTT_BATCH_TOPIC_SUFFIX, MQTT_TOPIC, _decode_mqtt_payload
+
+# Rough per-PUBLISH overhead (fixed header, topic, packet id) for QoS 1 over MQTT 3.1.1.
+MQTT_PUBLISH_OVERHEAD = 4 + len(MQTT_TOPIC)
+
+
+def _build_payloads(readings_per_batch: int, batch_index: int) -> tuple[list[bytes], bytes]:
+	t0 = 1_790_000_000 + batch_index * readings_per_batch
+	types = ["temperature", "humidity"]
+	json_messages = [
+		json.dumps(
+			{
+				"message_id": f"b-{batch_index}:{seq}",
+				"site": "SITE-A",
+				"device": "DEV-0001",
+				"observation_type": types[seq % 2],
+				"value": 20.0 + seq * 0.01,
+				"unit": "C",
+				"observed_at": datetime.fromtimestamp(t0 + seq, timezone.utc).isoformat(),
+			}
+		).encode("utf-8")
+		for seq in range(readings_per_batch)
+	]
+	batch = msgpack.packb(
+		{
+			"site": "SITE-A",
+			"device": "DEV-0001",
+			"t0": t0,
+			"batch_id": f"b-{batch_index}",
+			"unit": "C",
+			"types": types,
+			"readings": [[seq, seq % 2, 20.0 + seq * 0.01] for seq in range(readings_per_batch)],
+		}
+	)
+	return json_messages, batch
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--readings", type=int, default=60, help="readings per batch")
+	parser.add_argument("--batches", type=int, default=2000)
+	args = parser.parse_args()
+
+	payloads = [_build_payloads(args.readings, idx) for idx in range(args.batches)]
+	total_readings = args.readings * args.batches
+	batch_topic = f"{MQTT_TOPIC}/{MQTT_BATCH_TOPIC_SUFFIX}"
+
+	json_bytes = sum(len(message) + MQTT_PUBLISH_OVERHEAD for messages, _ in payloads for message in messages)
+	batch_bytes = sum(
+		len(batch) + MQTT_PUBLISH_OVERHEAD + len(MQTT_BATCH_TOPIC_SUFFIX) + 1 for _, batch in payloads
+	)
+
+	started = time.perf_counter()
+	for messages, _ in payloads:
+		for message in messages:
+			_decode_mqtt_payload(MQTT_TOPIC, message)
+	json_seconds = time.perf_counter() - started
+
+	started = time.perf_counter()
+	for _, batch in payloads:
+		_decode_mqtt_payload(batch_topic, batch)
+	batch_seconds = time.perf_counter() - started
+
+	print(f"{total_readings} readings, {args.readings} per batch")
+	print(f"{'format':<16}{'bytes/reading':>15}{'readings/s':>14}")
+	print(f"{'json single':<16}{json_bytes / total_readings:>15.1f}{total_readings / json_seconds:>14,.0f}")
+	print(
+		f"{'msgpack batch':<16}{batch_bytes / total_readings:>15.1f}{total_readings / batch_seconds:>14,.0f}"
+	)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,121 @@
+"""MQTT load test for one or more IoT gateway replicas.
+
+Start a local broker with the gateway's Mosquitto config, then two partitioned
+replicas sharing the load:
+
+	docker run --rm -p 1883:1883 \\
+		-v "$PWD/tools/iot_gateway/mosquitto.conf:/mosquitto/config/mosquitto.conf:ro" \\
+		eclipse-mosquitto:2.0
+
+	cd tools/iot_gateway
+	MQTT_HOST=localhost MQTT_SHARED_GROUP=yam-gw MQTT_PARTITION_COUNT=8 \\
+		GATEWAY_REPLICA_COUNT=2 GATEWAY_REPLICA_INDEX=0 GATEWAY_PEER_URLS=http://localhost:8089 \\
+		DEVICE_STATE_SNAPSHOT_PATH= uvicorn app:app --port 8088
+	MQTT_HOST=localhost MQTT_SHARED_GROUP=yam-gw MQTT_PARTITION_COUNT=8 \\
+		GATEWAY_REPLICA_COUNT=2 GATEWAY_REPLICA_INDEX=1 \\
+		DEVICE_STATE_SNAPSHOT_PATH= uvicorn app:app --port 8089
+
+	MQTT_PARTITION_COUNT=8 python load_test.py --messages 100000 --gateway-url http://localhost:8088
+
+Publishing uses the same device -> partition mapping as the gateway, so the
+MQTT_PARTITION_COUNT environment variable must match the replicas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+import paho.mqtt.client as mqtt
+from app import MQTT_TOPIC, device_topic
+
+
+def _cluster_totals(gateway_url: str) -> dict:
+	with urllib.request.urlopen(f"{gateway_url.rstrip('/')}/cluster/status", timeout=5) as response:
+		return json.loads(response.read().decode("utf-8"))
+
+
+def _publish(args: argparse.Namespace) -> float:
+	client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, protocol=mqtt.MQTTv5)
+	client.max_inflight_messages_set(1000)
+	client.connect(args.host, args.port, keepalive=30)
+	client.loop_start()
+
+	devices = [f"LOAD-DEV-{idx:05d}" for idx in range(args.devices)]
+	topics = {device: device_topic(device) for device in devices}
+	interval = 1.0 / args.rate if args.rate > 0 else 0.0
+
+	started = time.perf_counter()
+	pending = None
+	for seq in range(args.messages):
+		device = devices[seq % len(devices)]
+		payload = {
+			"message_id": f"load-{seq}",
+			"site": args.site,
+			"device": device,
+			"observation_type": "temperature",
+			"value": 20.0 + (seq % 10) * 0.1,
+			"unit": "C",
+			"observed_at": datetime.now(timezone.utc).isoformat(),
+			"seq": seq,
+		}
+		pending = client.publish(topics[device], json.dumps(payload), qos=1)
+		if interval:
+			time.sleep(interval)
+	if pending is not None:
+		pending.wait_for_publish(timeout=60)
+	elapsed = time.perf_counter() - started
+
+	client.loop_stop()
+	client.disconnect()
+	return elapsed
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--host", default="localhost")
+	parser.add_argument("--port", type=int, default=1883)
+	parser.add_argument("--site", default="LOAD-SITE")
+	parser.add_argument("--devices", type=int, default=1000)
+	parser.add_argument("--messages", type=int, default=50000)
+	parser.add_argument(
+		"--rate", type=float, default=0, help="messages/second; 0 publishes as fast as possible"
+	)
+	parser.add_argument("--gateway-url", default="http://localhost:8088")
+	parser.add_argument("--drain-timeout", type=float, default=120)
+	args = parser.parse_args()
+
+	before = _cluster_totals(args.gateway_url)["totals"]["mqtt_messages_received"]
+	print(f"Publishing {args.messages} messages from {args.devices} devices under {MQTT_TOPIC}")
+	publish_seconds = _publish(args)
+	print(f"published in {publish_seconds:.2f}s ({args.messages / publish_seconds:,.0f} msg/s)")
+
+	started = time.perf_counter()
+	status: dict = {}
+	received = 0
+	while time.perf_counter() - started < args.drain_timeout:
+		status = _cluster_totals(args.gateway_url)
+		received = status["totals"]["mqtt_messages_received"] - before
+		if received >= args.messages:
+			break
+		time.sleep(0.5)
+	drain_seconds = publish_seconds + (time.perf_counter() - started)
+
+	print(
+		f"received {received}/{args.messages} in {drain_seconds:.2f}s ({received / drain_seconds:,.0f} msg/s)"
+	)
+	for replica in status.get("replicas") or []:
+		counters = replica.get("counters") or {}
+		print(
+			f"  {replica.get('replica_id') or replica.get('url')}: "
+			f"received={counters.get('mqtt_messages_received', 0)} "
+			f"duplicates={counters.get('duplicates_suppressed', 0)} "
+			f"reachable={replica.get('reachable')}"
+		)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+
+import msgpack
+import pytest
+
+from tools.iot_gateway import app as gateway
+
+
+@pytest.fixture(autouse=True)
+def _reset_gateway_state():
+	with gateway._dedupe_lock:
+		gateway._dedupe_index.clear()
+	with gateway._series_lock:
+		gateway._series_windows.clear()
+	with gateway._device_state_lock:
+		gateway._device_states.clear()
+	yield
+	with gateway._dedupe_lock:
+		gateway._dedupe_index.clear()
+
+
+def _batch() -> dict:
+	return {
+		"site": "SITE-A",
+		"device": "DEV-1",
+		"t0": 1_790_000_000,
+		"batch_id": "b-1",
+		"unit": "C",
+		"types": ["temperature", "humidity"],
+		"readings": [[0, 0, 21.5], [0, 1, 40.0, "%"], [30, "temperature", 21.7, None, "Suspect"]],
+	}
+
+
+def test_msgpack_batch_expands_into_readings():
+	raw, readings = gateway._decode_mqtt_payload("yam/iot/observation/msgpack", msgpack.packb(_batch()))
+
+	assert raw["device"] == "DEV-1"
+	assert [reading["observation_type"] for reading in readings] == ["temperature", "humidity", "temperature"]
+	assert [reading["unit"] for reading in readings] == ["C", "%", "C"]
+	assert readings[2]["quality_flag"] == "Suspect"
+	assert readings[2]["observed_at"] == gateway._epoch_to_iso(1_790_000_030)
+	assert readings[1]["raw_payload"] == {
+		"encoding": "msgpack",
+		"seq": 1,
+		"batch_id": "b-1",
+		"message_id": "b-1:1",
+	}
+
+
+def test_json_single_and_batch_share_the_decode_path():
+	_raw, single = gateway._decode_mqtt_payload(
+		"yam/iot/observation", json.dumps({"site": "SITE-A", "device": "DEV-1", "value": 3}).encode()
+	)
+	_raw, batch = gateway._decode_mqtt_payload("yam/iot/observation", json.dumps(_batch()).encode())
+
+	assert len(single) == 1 and single[0]["value"] == 3.0
+	assert len(batch) == 3 and batch[0]["raw_payload"]["encoding"] == "json"
+
+
+def test_malformed_batches_are_rejected():
+	with pytest.raises(ValueError):
+		gateway._expand_batch({"site": "SITE-A", "device": "DEV-1", "readings": []}, "msgpack")
+	with pytest.raises(ValueError):
+		gateway._expand_batch({"site": "SITE-A", "device": "DEV-1", "readings": [[0, "t"]]}, "msgpack")
+	with pytest.raises(IndexError):
+		gateway._expand_batch({"site": "SITE-A", "device": "DEV-1", "readings": [[0, 3, 1.0]]}, "msgpack")
+
+
+def test_negative_and_bool_type_indexes_are_rejected():
+	batch = _batch()
+	for type_index in (-1, True, False):
+		batch["readings"] = [[0, type_index, 21.5]]
+		with pytest.raises(ValueError, match="invalid type index"):
+			gateway._expand_batch(batch, "msgpack")
+
+
+def test_redelivered_batch_is_suppressed_per_reading():
+	readings = gateway._decode_mqtt_payload("yam/iot/observation/msgpack", msgpack.packb(_batch()))[1]
+	assert gateway._process_readings("mqtt", readings) == ["accepted"] * 3
+
+	readings = gateway._decode_mqtt_payload("yam/iot/observation/msgpack", msgpack.packb(_batch()))[1]
+	assert gateway._process_readings("mqtt", readings) == ["duplicate"] * 3
+
+
+def test_batch_topics_are_subscribed_alongside_json(monkeypatch):
+	monkeypatch.setattr(gateway, "MQTT_PARTITION_COUNT", 0)
+	monkeypatch.setattr(gateway, "MQTT_SHARED_GROUP", "yam-gw")
+
+	assert gateway._subscription_topics() == [
+		f"$share/yam-gw/{gateway.MQTT_TOPIC}",
+		f"$share/yam-gw/{gateway.MQTT_TOPIC}/msgpack",
+	]
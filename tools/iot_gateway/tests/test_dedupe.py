@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from tools.iot_gateway import app as gateway
+
+
+@pytest.fixture(autouse=True)
+def _reset_dedupe_index():
+	with gateway._dedupe_lock:
+		gateway._dedupe_index.clear()
+	yield
+	with gateway._dedupe_lock:
+		gateway._dedupe_index.clear()
+
+
+def _reading(observed_at: str | None = "2026-10-01T10:00:00Z", message_id: str | None = None) -> dict:
+	raw_payload = {"message_id": message_id} if message_id else {}
+	return {
+		"site": "SITE-A",
+		"device": "DEV-1",
+		"observation_type": "temperature",
+		"value": 20.0,
+		"observed_at": observed_at,
+		"raw_payload": raw_payload,
+	}
+
+
+def test_dedupe_key_prefers_message_id_and_skips_untimed_readings():
+	assert gateway._dedupe_key(_reading(message_id="m-1")) == ("id", "DEV-1", "m-1")
+	assert gateway._dedupe_key(_reading())[0] == "obs"
+	assert gateway._dedupe_key(_reading(observed_at=None)) is None
+
+
+def test_duplicates_within_window_are_suppressed_and_expire():
+	key = gateway._dedupe_key(_reading())
+
+	assert gateway._is_duplicate(key, now=0.0) is False
+	assert gateway._is_duplicate(key, now=10.0) is True
+	assert gateway._is_duplicate(key, now=10.0 + gateway.DEDUPE_WINDOW_SECONDS + 1) is False
+
+
+def test_dedupe_index_is_bounded(monkeypatch):
+	monkeypatch.setattr(gateway, "DEDUPE_CAPACITY", 3)
+	for idx in range(10):
+		gateway._is_duplicate(("id", "DEV-1", str(idx)), now=float(idx))
+
+	assert list(gateway._dedupe_index) == [("id", "DEV-1", "7"), ("id", "DEV-1", "8"), ("id", "DEV-1", "9")]
+
+
+def test_process_readings_counts_duplicates(monkeypatch):
+	monkeypatch.setattr(gateway, "_check_device_ownership", lambda _payload: "")
+	before = gateway._state["duplicates_suppressed"]
+
+	outcomes = gateway._process_readings("mqtt", [_reading(message_id="m-7"), _reading(message_id="m-7")])
+
+	assert outcomes[1] == "duplicate"
+	assert gateway._state["duplicates_suppressed"] == before + 1
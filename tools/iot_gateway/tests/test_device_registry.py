@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import HTTPException
+
+from tools.iot_gateway import app as gateway
+
+
+@pytest.fixture(autouse=True)
+def _reset_registry():
+	with gateway._device_registry_lock:
+		gateway._device_registry.clear()
+		gateway._device_registry_meta.update({"loaded": False, "loaded_at": "", "last_error": ""})
+	yield
+	with gateway._device_registry_lock:
+		gateway._device_registry.clear()
+		gateway._device_registry_meta["loaded"] = False
+
+
+def _payload(device: str = "DEV-1", site: str = "SITE-A") -> gateway.ObservationIngestPayload:
+	return gateway.ObservationIngestPayload(
+		site=site, device=device, observation_type="temperature", value=21.5, unit="C"
+	)
+
+
+def test_devices_are_accepted_until_registry_is_loaded():
+	assert gateway._check_device_ownership({"device": "DEV-X", "site": "SITE-A"}) == ""
+
+
+def test_refresh_loads_registry_and_rejects_foreign_devices(monkeypatch):
+	monkeypatch.setattr(
+		gateway,
+		"_fetch_device_registry",
+		lambda: {"DEV-1": {"site": "SITE-A", "status": "Active", "device_name": "Probe"}},
+	)
+	gateway._refresh_device_registry()
+
+	assert gateway._check_device_ownership({"device": "DEV-1", "site": "SITE-A"}) == ""
+	assert gateway._check_device_ownership({"device": "DEV-1", "site": "SITE-B"}) == "device_site_mismatch"
+	assert gateway._check_device_ownership({"device": "DEV-2", "site": "SITE-A"}) == "unknown_device"
+
+	with pytest.raises(HTTPException):
+		gateway.ingest_observation(_payload(site="SITE-B"))
+	assert gateway.ingest_observation(_payload())["status"] == "accepted"
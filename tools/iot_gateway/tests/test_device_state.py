@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import HTTPException
+
+from tools.iot_gateway import app as gateway
+
+
+@pytest.fixture(autouse=True)
+def _reset_device_states():
+	with gateway._device_state_lock:
+		gateway._device_states.clear()
+	yield
+	with gateway._device_state_lock:
+		gateway._device_states.clear()
+
+
+def _reading(device: str, value: float, observation_type: str = "temperature") -> dict:
+	return {
+		"site": "SITE-A",
+		"device": device,
+		"observation_type": observation_type,
+		"value": value,
+		"unit": "C",
+	}
+
+
+def test_device_state_tracks_last_values_rate_and_errors():
+	gateway._update_device_state(_reading("DEV-1", 20.0), now=1000.0)
+	gateway._update_device_state(_reading("DEV-1", 21.0), now=1001.0)
+	gateway._update_device_state(_reading("DEV-1", 55.0, "humidity"), now=1002.0)
+	gateway._record_device_error("DEV-1", "SITE-A", now=1003.0)
+
+	record = gateway._device_states["DEV-1"].to_dict(now=1002.0)
+
+	assert record["message_count"] == 3
+	assert record["error_count"] == 1
+	assert record["last_values"]["temperature"]["value"] == 21.0
+	assert record["last_values"]["humidity"]["value"] == 55.0
+	assert record["messages_per_second"] > 0
+
+
+def test_device_state_evicts_least_recently_seen(monkeypatch):
+	monkeypatch.setattr(gateway, "DEVICE_STATE_CAPACITY", 2)
+	gateway._update_device_state(_reading("DEV-1", 1.0), now=1.0)
+	gateway._update_device_state(_reading("DEV-2", 1.0), now=2.0)
+	gateway._update_device_state(_reading("DEV-1", 1.0), now=3.0)
+	gateway._update_device_state(_reading("DEV-3", 1.0), now=4.0)
+
+	assert list(gateway._device_states) == ["DEV-1", "DEV-3"]
+
+
+def test_devices_endpoints_list_most_recent_first_and_404_unknown():
+	gateway._update_device_state(_reading("DEV-1", 1.0))
+	gateway._update_device_state(_reading("DEV-2", 2.0))
+
+	listing = gateway.list_devices(site="SITE-A", limit=1)
+
+	assert listing["matched"] == 2
+	assert [row["device"] for row in listing["devices"]] == ["DEV-2"]
+	assert gateway.get_device("DEV-1")["device"]["device"] == "DEV-1"
+	with pytest.raises(HTTPException):
+		gateway.get_device("DEV-404")
+
+
+def test_device_state_snapshot_round_trip(tmp_path):
+	snapshot = tmp_path / "device_state.json"
+	gateway._update_device_state(_reading("DEV-1", 20.0), now=1000.0)
+	gateway._update_device_state(_reading("DEV-2", 30.0), now=1001.0)
+
+	assert gateway._write_device_state_snapshot(str(snapshot)) == 2
+	with gateway._device_state_lock:
+		gateway._device_states.clear()
+
+	assert gateway._load_device_state_snapshot(str(snapshot)) == 2
+	assert list(gateway._device_states) == ["DEV-1", "DEV-2"]
+	assert gateway._device_states["DEV-2"].last_values["temperature"][0] == 30.0
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import pytest
+
+from tools.iot_gateway import app as gateway
+
+
+@pytest.fixture(autouse=True)
+def _reset_series():
+	with gateway._series_lock:
+		gateway._series_windows.clear()
+	yield
+	with gateway._series_lock:
+		gateway._series_windows.clear()
+
+
+def _reading(value: float, observed_at: float, observation_type: str = "temperature") -> dict:
+	return {
+		"site": "SITE-A",
+		"device": "DEV-1",
+		"observation_type": observation_type,
+		"value": value,
+		"observed_at": observed_at,
+		"quality_flag": "OK",
+		"raw_payload": {},
+	}
+
+
+def _warm_up(count: int = 20) -> None:
+	gateway._score_readings([_reading(20.0 + (idx % 2) * 0.2, 1000.0 + idx) for idx in range(count)])
+
+
+def test_series_window_running_stats_match_buffer():
+	window = gateway._SeriesWindow(4)
+	for idx, value in enumerate([1.0, 2.0, 3.0, 4.0, 5.0, 6.0]):
+		window.push(value, float(idx))
+
+	mean, stddev = window.stats()
+
+	assert window.count == 4
+	assert mean == pytest.approx(4.5)
+	assert stddev == pytest.approx(1.118034, rel=1e-5)
+
+
+def test_normal_readings_are_not_flagged():
+	_warm_up()
+
+	assessment = gateway._score_readings([_reading(20.1, 2000.0)])[0]
+
+	assert assessment["flags"] == []
+	assert assessment["quarantine"] is False
+
+
+def test_outlier_is_quarantined_and_annotated(monkeypatch):
+	monkeypatch.setattr(gateway, "EDGE_QUARANTINE_MODE", "flag")
+	_warm_up()
+	payload = _reading(500.0, 2000.0)
+
+	forward = gateway._apply_edge_anomaly_stage([payload])
+
+	assert forward == [True]
+	assert payload["quality_flag"] == "Quarantine"
+	assert "zscore" in payload["raw_payload"]["edge_anomaly"]["flags"]
+	assert payload["raw_payload"]["edge_anomaly"]["action"] == "quarantine"
+
+
+def test_drop_mode_does_not_forward_quarantined_readings(monkeypatch):
+	monkeypatch.setattr(gateway, "EDGE_QUARANTINE_MODE", "drop")
+	_warm_up()
+
+	forward = gateway._apply_edge_anomaly_stage([_reading(500.0, 2000.0), _reading(float("nan"), 2001.0)])
+
+	assert forward == [False, False]
+
+
+def test_quarantined_spike_does_not_widen_the_window_for_the_next_spike(monkeypatch):
+	monkeypatch.setattr(gateway, "EDGE_QUARANTINE_MODE", "drop")
+	_warm_up()
+	window = gateway._series_windows[("DEV-1", "temperature")]
+	baseline = window.stats()
+
+	first, second = gateway._score_readings([_reading(500.0, 2000.0), _reading(480.0, 2001.0)])
+
+	assert first["quarantine"] is True
+	assert second["quarantine"] is True
+	assert window.stats() == baseline
+	assert window.last_value == pytest.approx(20.2)
+
+
+def test_flat_lined_series_still_quarantines_a_spike(monkeypatch):
+	monkeypatch.setattr(gateway, "EDGE_QUARANTINE_MODE", "drop")
+	gateway._score_readings([_reading(20.0, 1000.0 + idx) for idx in range(20)])
+	window = gateway._series_windows[("DEV-1", "temperature")]
+
+	steady, spike, next_spike = gateway._score_readings(
+		[_reading(20.0, 2000.0), _reading(5000.0, 2001.0), _reading(4000.0, 2002.0)]
+	)
+
+	assert steady["flags"] == [] and steady["zscore"] == 0
+	assert spike["flags"] == ["zscore"] and spike["quarantine"] is True
+	assert next_spike["quarantine"] is True
+	assert window.stats() == (20.0, 0.0)
+
+
+def test_rate_of_change_limit_is_per_observation_type(monkeypatch):
+	monkeypatch.setattr(gateway, "ANOMALY_MAX_RATE_PER_SECOND", {"temperature": 0.5})
+
+	first, second = gateway._score_readings([_reading(20.0, 1000.0), _reading(25.0, 1001.0)])
+
+	assert first["flags"] == []
+	assert second["flags"] == ["rate_of_change"]
+	assert second["rate_of_change"] == pytest.approx(5.0)
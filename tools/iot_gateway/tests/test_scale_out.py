@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from tools.iot_gateway import app as gateway
+
+
+def test_device_partition_is_stable_and_in_range():
+	partitions = {gateway._device_partition(f"DEV-{idx}", 8) for idx in range(200)}
+
+	assert partitions <= set(range(8))
+	assert len(partitions) == 8
+	assert gateway._device_partition("DEV-1", 8) == gateway._device_partition("DEV-1", 8)
+
+
+def test_subscription_topics_without_partitions(monkeypatch):
+	monkeypatch.setattr(gateway, "MQTT_BATCH_TOPIC_SUFFIX", "")
+	monkeypatch.setattr(gateway, "MQTT_PARTITION_COUNT", 0)
+	monkeypatch.setattr(gateway, "MQTT_SHARED_GROUP", "")
+	assert gateway._subscription_topics() == [gateway.MQTT_TOPIC]
+
+	monkeypatch.setattr(gateway, "MQTT_SHARED_GROUP", "yam-gw")
+	assert gateway._subscription_topics() == [f"$share/yam-gw/{gateway.MQTT_TOPIC}"]
+
+
+def test_partitioned_replicas_split_partitions_without_overlap(monkeypatch):
+	monkeypatch.setattr(gateway, "MQTT_BATCH_TOPIC_SUFFIX", "")
+	monkeypatch.setattr(gateway, "MQTT_PARTITION_COUNT", 4)
+	monkeypatch.setattr(gateway, "MQTT_SHARED_GROUP", "yam-gw")
+	monkeypatch.setattr(gateway, "GATEWAY_REPLICA_COUNT", 2)
+
+	monkeypatch.setattr(gateway, "GATEWAY_REPLICA_INDEX", 0)
+	first = gateway._subscription_topics()
+	monkeypatch.setattr(gateway, "GATEWAY_REPLICA_INDEX", 1)
+	second = gateway._subscription_topics()
+
+	assert first == [
+		f"$share/yam-gw-p0/{gateway.MQTT_TOPIC}/0",
+		f"$share/yam-gw-p2/{gateway.MQTT_TOPIC}/2",
+	]
+	assert second == [
+		f"$share/yam-gw-p1/{gateway.MQTT_TOPIC}/1",
+		f"$share/yam-gw-p3/{gateway.MQTT_TOPIC}/3",
+	]
+	assert gateway.device_topic("DEV-1") == f"{gateway.MQTT_TOPIC}/{gateway._device_partition('DEV-1', 4)}"
+
+
+def test_cluster_status_sums_peer_counters(monkeypatch):
+	monkeypatch.setattr(gateway, "GATEWAY_PEER_URLS", ["http://peer-a", "http://peer-b"])
+	monkeypatch.setitem(gateway._state, "mqtt_messages_received", 5)
+
+	def fake_fetch(url):
+		if url == "http://peer-b":
+			return {"url": url, "reachable": False, "error": "timeout"}
+		return {"url": url, "reachable": True, "counters": {"mqtt_messages_received": 7}}
+
+	monkeypatch.setattr(gateway, "_fetch_peer_metrics", fake_fetch)
+
+	result = gateway.cluster_status()
+
+	assert result["status"] == "degraded"
+	assert result["replica_count"] == 3
+	assert result["replicas_reachable"] == 2
+	assert result["totals"]["mqtt_messages_received"] == 12